@@ -0,0 +1,104 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# 한국어 금액 표기 -> 원(KRW) float
+#   "150000000", "150,000,000원", "3.5억", "10억원", "1억 5천만원", "1억5,000만원", "5천만원", "2백만원"
+# =========================
+NUM = r"\d+(?:\.\d+)?"
+
+# 큰 단위(조/억/만/일) 마다 천/백/십 자리 묶음이 붙는 구조: (a천 b백 c십 d) × 큰 단위
+BIG_UNITS = [("jo", "조", 1e12), ("eok", "억", 1e8), ("man", "만", 1e4), ("one", "", 1.0)]
+SMALL_UNITS = [("k", "천", 1000.0), ("h", "백", 100.0), ("t", "십", 10.0)]
+
+# 1단계: 큰 단위로 자르기 ("1억5천만" -> eok="1", man="5천")
+BIG_PATTERN = r"^(?:(?P<jo>[^조억만]*)조)?(?:(?P<eok>[^조억만]*)억)?(?:(?P<man>[^조억만]*)만)?(?P<one>[^조억만]*)$"
+# 2단계: 자리 묶음 해석 ("5천" -> k="5", "천" -> k="")
+SMALL_PATTERN = (
+    "^" + "".join(rf"(?:(?P<{key}>{NUM})?(?P<{key}_unit>{unit}))?" for key, unit, _ in SMALL_UNITS)
+    + rf"(?P<n>{NUM})?$"
+)
+
+# 금액 앞뒤 표기 정리: 공백/쉼표, 괄호 설명("(부가세 포함)"), 앞의 "금/약", 뒤의 "원/정"
+NOISE_PATTERN = r"[,\s]|\([^)]*\)"
+PREFIX_PATTERN = r"^(?:금|약)"
+SUFFIX_PATTERN = r"(?:원정?|정)$"
+
+
+def parse_krw(value) -> Optional[float]:
+    """금액 하나 -> 원 단위 float (해석 불가 시 None)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+
+    result = parse_krw_series(pd.Series([str(value)], dtype=object)).iloc[0]
+    return None if pd.isna(result) else float(result)
+
+
+def _parse_small_groups(groups: pd.Series) -> np.ndarray:
+    """천/백/십 자리 묶음 문자열 -> 값 (빈 문자열은 단위만 있는 경우이므로 1, 해석 불가는 NaN)"""
+    values = pd.to_numeric(groups, errors="coerce").to_numpy(dtype=float, copy=True)
+    values[(groups == "").to_numpy()] = 1.0
+
+    pending = np.isnan(values)
+    if pending.any():
+        parts = groups[pending].str.extract(SMALL_PATTERN)
+        total = pd.to_numeric(parts["n"], errors="coerce").fillna(0.0).to_numpy(dtype=float, copy=True)
+        for key, _, small in SMALL_UNITS:
+            present = parts[f"{key}_unit"].notna().to_numpy()
+            digits = pd.to_numeric(parts[key], errors="coerce").fillna(1.0).to_numpy(dtype=float)
+            total += np.where(present, digits * small, 0.0)
+        matched = parts.notna().any(axis=1).to_numpy()
+        values[pending] = np.where(matched, total, np.nan)
+    return values
+
+
+def _parse_unique(s: pd.Series) -> np.ndarray:
+    # 1) 단순 숫자 (대부분의 값)
+    result = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float, copy=True)
+
+    # 2) 단위 표기 -> 큰 단위별로 자른 뒤 자리 묶음 합산
+    pending = np.isnan(result) & s.str.contains(r"\d|[조억만천백십]", regex=True).to_numpy() & (s != "").to_numpy()
+    if not pending.any():
+        return result
+
+    parts = s[pending].str.extract(BIG_PATTERN)
+    total = np.zeros(len(parts))
+    valid = parts.notna().any(axis=1).to_numpy()
+    for key, unit, big in BIG_UNITS:
+        col = parts[key]
+        present = col.notna().to_numpy()
+        if unit:
+            # "억원" 처럼 숫자 없이 큰 단위만 있으면 1
+            values = _parse_small_groups(col.fillna(""))
+        else:
+            # 끝자리 (단위 없음): 빈 문자열은 0
+            values = _parse_small_groups(col.fillna("").replace("", "0"))
+        valid = valid & ~(present & np.isnan(values))
+        total += np.where(present, np.nan_to_num(values), 0.0) * big
+
+    result[pending] = np.where(valid, total, np.nan)
+    return result
+
+
+def parse_krw_series(values: pd.Series) -> pd.Series:
+    """
+    금액 컬럼 전체 -> 원 단위 float Series (해석 불가 / 결측은 NaN).
+    숫자형 컬럼은 그대로 변환하고, 문자열은 고유값만 컬럼 단위(str 메서드 + numpy)로 해석한 뒤 다시 펼침.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    s = values.astype(str).where(values.notna(), "")
+    codes, uniques = pd.factorize(s)
+    uniques = (
+        pd.Series(uniques, dtype=object).astype(str)
+        .str.replace(NOISE_PATTERN, "", regex=True)
+        .str.replace(PREFIX_PATTERN, "", regex=True)
+        .str.replace(SUFFIX_PATTERN, "", regex=True)
+    )
+    parsed = _parse_unique(uniques)
+    return pd.Series(parsed[codes], index=values.index, dtype=float)
@@ -9,52 +9,13 @@ import pickle
 
 
 
-def clean_amount(value):
-    if pd.isna(value):
-        return 0
-    
-    str_val = str(value).strip().replace(',', '')
-    
-    # Unit handling
-    multiplier = 1
-    if '억' in str_val:
-        multiplier *= 100000000
-        str_val = str_val.replace('억', '')
-    if '만' in str_val: # Only '만' after '억' usually means addition, but simple case: "5천만원" -> this logic is complex. 
-                       # Let's assume simpler case or just handle "억" as main unit for now if it appears alone e.g. "10억"
-                       # If mixed like "1억 5천", simple replace won't work perfectly without splitting.
-                       # Given the fast pace, let's try a regex or simple split.
-        pass 
-
-    # Better logic:
-    # 1. Try pure numeric first
-    try:
-        return int(float(str_val))
-    except ValueError:
-        pass
+# 금액 파서: 상위 프로젝트 src/currency.py 의 사본 (수정 시 함께 갱신, tests/test_currency.py 에서 동일성 확인)
+from src import currency
 
-    # 2. Handle simple "10억" or "10억원"
-    try:
-        temp_val = str_val.replace('원', '').replace(' ', '')
-        if '억' in temp_val:
-            parts = temp_val.split('억')
-            billion_part = float(parts[0]) if parts[0] else 0
-            
-            rest = parts[1] if len(parts) > 1 else ""
-            million_part = 0
-            
-            if '천' in rest:
-                rest = rest.replace('천', '').replace('만', '') # 5천 -> 5000
-                million_part = float(rest) * 1000 if rest else 1000
-            elif '만' in rest:
-                rest = rest.replace('만', '')
-                million_part = float(rest) if rest else 0
-                
-            return int(billion_part * 100000000 + million_part * 10000)
-    except Exception:
-        pass
-        
-    return 0
+
+def clean_amount(value):
+    amount = currency.parse_krw(value)
+    return int(amount) if amount is not None else 0
 
 import pickle
 
@@ -93,7 +54,7 @@ def load_data(use_cache=True):
     
     # Basic cleaning
     print("Cleaning metadata...")
-    df['cleaned_amount'] = df['사업 금액'].apply(clean_amount)
+    df['cleaned_amount'] = currency.parse_krw_series(df['사업 금액']).fillna(0).astype('int64')
     df['cleaned_agency'] = df['발주 기관'].fillna('Unknown').astype(str).str.strip()
     df['cleaned_title'] = df['사업명'].fillna('').astype(str).str.strip() # Ensure Title exists
     
@@ -0,0 +1,59 @@
+import json
+import time
+import argparse
+from pathlib import Path
+
+from src.pipeline.chunker import load_pages, iter_chunks, chunk_to_record
+from src.pipeline.page_store import list_parsed_files, parsed_stem
+
+def bench_chunker(parsed_dir: str, clean_dir: str, repeat: int, check: bool):
+    files = list_parsed_files(parsed_dir)
+    print(f"Loading {len(files)} parsed files from {parsed_dir}...")
+
+    # 파일 I/O / JSON 파싱은 측정에서 제외 (청킹 엔진만 측정)
+    docs = []
+    for f in files:
+        pages = load_pages(f)
+        source_pdf = (pages[0].metadata.get("source_pdf") if pages else None) \
+            or (parsed_stem(f) + ".pdf")
+        docs.append((f, pages, source_pdf))
+
+    total_chars = sum(len(p.content or "") for _, pages, _ in docs for p in pages)
+    best = None
+    for r in range(repeat):
+        t0 = time.perf_counter()
+        n_chunks = sum(1 for _, pages, src in docs for _ in iter_chunks(pages, src))
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+        print(f"  run {r+1}: {n_chunks} chunks in {elapsed:.3f}s")
+
+    print(f"\n[Result] {n_chunks} chunks / {total_chars:,} chars")
+    print(f"  - best: {best:.3f}s -> {n_chunks / best:,.0f} chunks/sec, {total_chars / best / 1e6:.2f} M chars/sec")
+
+    if check:
+        # 기존 _clean.jsonl 과 바이트 단위 비교
+        mismatched = []
+        for f, pages, src in docs:
+            expected_path = Path(clean_dir) / f"{parsed_stem(f)}_clean.jsonl"
+            if not expected_path.exists():
+                continue
+            produced = "".join(
+                json.dumps(chunk_to_record(c), ensure_ascii=False) + "\n"
+                for c in iter_chunks(pages, src)
+            )
+            if produced != expected_path.read_text(encoding="utf-8"):
+                mismatched.append(expected_path.name)
+
+        print(f"  - check vs {clean_dir}: {len(docs) - len(mismatched)}/{len(docs)} identical")
+        for name in mismatched:
+            print(f"    ! {name}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunking engine benchmark")
+    parser.add_argument("--parsed", default="data/parsed_json")
+    parser.add_argument("--clean", default="data/clean_json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="Compare output with existing _clean.jsonl files")
+    args = parser.parse_args()
+
+    bench_chunker(args.parsed, args.clean, args.repeat, args.check)
@@ -0,0 +1,101 @@
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.currency import parse_krw_series
+
+# 기존 행 단위 파서 (src/loader.py parse_budget, RAG_LLM/src/loader.py clean_amount) - 비교용 사본
+def legacy_parse_budget(value):
+    if pd.isna(value) or value == '': return 0.0
+    s = str(value).replace(',', '').strip()
+    if not s: return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        for unit, mul in (('억원', 100_000_000), ('천만원', 10_000_000), ('만원', 10_000)):
+            if unit in s:
+                try: return float(s.replace(unit, '')) * mul
+                except: pass
+        return 0.0
+
+def legacy_clean_amount(value):
+    if pd.isna(value): return 0
+    str_val = str(value).strip().replace(',', '')
+    try:
+        return int(float(str_val))
+    except ValueError:
+        pass
+    try:
+        temp_val = str_val.replace('원', '').replace(' ', '')
+        if '억' in temp_val:
+            parts = temp_val.split('억')
+            billion_part = float(parts[0]) if parts[0] else 0
+            rest = parts[1] if len(parts) > 1 else ""
+            million_part = 0
+            if '천' in rest:
+                rest = rest.replace('천', '').replace('만', '')
+                million_part = float(rest) * 1000 if rest else 1000
+            elif '만' in rest:
+                rest = rest.replace('만', '')
+                million_part = float(rest) if rest else 0
+            return int(billion_part * 100000000 + million_part * 10000)
+    except Exception:
+        pass
+    return 0
+
+def korean_formats(amount: float):
+    """원 단위 금액 -> [(한국어 표기, 표기가 나타내는 금액), ...]"""
+    won = int(amount)
+    eok, rest = divmod(won, 100_000_000)
+    man = rest // 10_000
+    rounded = eok * 100_000_000 + man * 10_000   # 만원 단위 표기는 만원 미만 절사
+    forms = [(f"{won}", won), (f"{won:,}원", won)]
+    if eok and man:
+        forms.append((f"{eok}억 {man:,}만원", rounded))
+        if man % 1000 == 0:
+            forms.append((f"{eok}억 {man // 1000}천만원", rounded))
+    elif eok:
+        forms.append((f"{eok}억원", rounded))
+    elif man:
+        forms.append((f"{man:,}만원", rounded))
+    return forms
+
+def bench_currency(csv_path: str, scale: int):
+    amounts = pd.read_csv(csv_path)['사업 금액']
+    samples, expected = [], []
+    for value in amounts.dropna():
+        for form, won in korean_formats(value):
+            samples.append(form)
+            expected.append(float(won))
+    samples = pd.Series(samples * scale, dtype=object)
+    expected = np.array(expected * scale)
+    print(f"[Currency] {len(samples):,} amount strings ({len(amounts)} CSV rows x formats x {scale})")
+
+    results = {}
+    t0 = time.perf_counter()
+    results["parse_krw_series"] = parse_krw_series(samples).fillna(0.0).to_numpy()
+    timings = {"parse_krw_series": time.perf_counter() - t0}
+
+    for name, fn in (("legacy parse_budget", legacy_parse_budget), ("legacy clean_amount", legacy_clean_amount)):
+        t0 = time.perf_counter()
+        results[name] = samples.map(fn).to_numpy(dtype=float)
+        timings[name] = time.perf_counter() - t0
+
+    for name, values in results.items():
+        correct = np.isclose(values, expected).mean() * 100
+        print(f"  - {name:<22}: {timings[name]:.3f}s ({len(samples) / timings[name]:,.0f} rows/sec) | correct {correct:.1f}%")
+
+    # 기존 두 파서가 서로 다르게 해석하는 예시
+    disagree = samples[results["legacy parse_budget"] != results["legacy clean_amount"]].drop_duplicates().head(3)
+    for text in disagree:
+        print(f"    ! '{text}': parse_budget={legacy_parse_budget(text):,.0f} / clean_amount={legacy_clean_amount(text):,} / parse_krw_series={parse_krw_series(pd.Series([text], dtype=object)).iloc[0]:,.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Korean currency parser benchmark")
+    parser.add_argument("--csv", default="data/data_list.csv")
+    parser.add_argument("--scale", type=int, default=200, help="Repeat the sample set N times")
+    args = parser.parse_args()
+
+    bench_currency(args.csv, args.scale)
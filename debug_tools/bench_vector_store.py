@@ -0,0 +1,290 @@
+"""
+벡터 저장소 백엔드 벤치마크: Chroma vs FAISS (flat / hnsw / ivfpq)
+
+    python debug_tools/bench_vector_store.py                   # 오프라인: 청크 텍스트의 hashed char-bigram 랜덤 투영 벡터
+    python debug_tools/bench_vector_store.py --source chroma   # path.vector_db Chroma 컬렉션의 실제 임베딩 + 평가 질문 임베딩 (OpenAI)
+    python debug_tools/bench_vector_store.py --replicate 10    # 벡터에 잡음을 더한 복제본으로 코퍼스를 10배로 확대
+
+측정 항목: 구축 시간, 질의 지연 (p50 / p95), 디스크 크기, 메모리 (RSS / 익명 메모리 증가분), recall@k
+(정답: numpy 정확 검색, 필터 조건을 만족하는 청크 중 상위 k).
+백엔드마다 구축 / 조회를 별도 프로세스에서 실행하므로 메모리 측정이 서로 섞이지 않음 (Linux /proc 기준).
+"""
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import shutil
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import io
+
+import numpy as np
+import yaml
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sparse_index import tokenize
+from src.metadata_index import MetadataIndex
+
+BACKENDS = ("chroma", "faiss-flat", "faiss-hnsw", "faiss-ivfpq")
+HASH_BUCKETS = 2 ** 15
+UPSERT_BATCH = 5000   # Chroma 최대 배치 크기(5461) 이내
+
+
+def load_config():
+    with open("config/config.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def memory_kb() -> dict:
+    """현재 프로세스 VmRSS / RssAnon / RssFile (kB)"""
+    stats = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                stats[key] = int(value.split()[0])
+    return stats
+
+
+def dir_size_mb(path: str) -> float:
+    total = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return total / 1024 / 1024
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def hashed_vectors(texts, query_texts, dim: int):
+    """오프라인 임베딩 대용: char bigram TF-IDF (해시 버킷) -> 가우시안 랜덤 투영 -> L2 정규화"""
+    rng = np.random.default_rng(0)
+    projection = (rng.standard_normal((HASH_BUCKETS, dim)) / math.sqrt(dim)).astype(np.float32)
+
+    def bucket_counts(text):
+        grams = tokenize(text)
+        if not grams:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        buckets = np.fromiter((zlib.crc32(g.encode("utf-8")) % HASH_BUCKETS for g in grams), dtype=np.int64, count=len(grams))
+        return np.unique(buckets, return_counts=True)
+
+    counted = [bucket_counts(t) for t in texts]
+    df = np.zeros(HASH_BUCKETS, dtype=np.float32)
+    for buckets, _ in counted:
+        df[buckets] += 1
+    idf = np.log((len(texts) + 1) / (df + 1)).astype(np.float32) + 1
+
+    def embed(buckets, counts):
+        if len(buckets) == 0:
+            return np.zeros(dim, dtype=np.float32)
+        weights = (1 + np.log(counts)).astype(np.float32) * idf[buckets]
+        return weights @ projection[buckets]
+
+    doc_vectors = np.stack([embed(*c) for c in counted])
+    query_vectors = np.stack([embed(*bucket_counts(q)) for q in query_texts])
+    return normalize(doc_vectors).astype(np.float32), normalize(query_vectors).astype(np.float32)
+
+
+def prepare(args, config, workdir: str):
+    """벡터 / 문서 / 질의 / 필터 시나리오 / 정답 -> workdir 에 저장"""
+    questions = [item["question"] for item in json.load(open(args.eval_set, "r", encoding="utf-8"))]
+
+    if args.source == "chroma":
+        from langchain_chroma import Chroma
+        from langchain_openai import OpenAIEmbeddings
+        data = Chroma(persist_directory=config["path"]["vector_db"])._collection.get(include=["embeddings", "documents", "metadatas"])
+        ids, texts, metadatas = data["ids"], data["documents"], data["metadatas"]
+        vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        queries = np.asarray(OpenAIEmbeddings(model=config["model"]["embedding"]).embed_documents(questions), dtype=np.float32)
+    else:
+        from src.loader import load_rfp_documents
+        with contextlib.redirect_stdout(io.StringIO()):
+            docs = load_rfp_documents(config)
+        ids = [d.metadata["chunk_id"] for d in docs]
+        texts = [d.page_content for d in docs]
+        metadatas = [d.metadata for d in docs]
+        t0 = time.perf_counter()
+        vectors, queries = hashed_vectors(texts, questions, args.dim)
+        print(f"[Bench] hashed bigram vectors: {len(ids)} x {args.dim} ({time.perf_counter() - t0:.1f}s)")
+
+    # 코퍼스 확대: 원본 벡터 + 가우시안 잡음 (같은 메타데이터, chunk_id 접미사)
+    rng = np.random.default_rng(1)
+    base_ids, base_texts, base_meta, base_vectors = list(ids), list(texts), list(metadatas), vectors
+    all_vectors = [base_vectors]
+    for r in range(1, args.replicate):
+        noise = rng.standard_normal(base_vectors.shape).astype(np.float32) * args.noise / math.sqrt(base_vectors.shape[1])
+        all_vectors.append(normalize(base_vectors + noise).astype(np.float32))
+        ids += [f"{cid}#r{r}" for cid in base_ids]
+        texts += base_texts
+        metadatas += [{**m, "chunk_id": f"{m['chunk_id']}#r{r}"} for m in base_meta]
+    vectors = np.concatenate(all_vectors)
+
+    # 필터 시나리오: 없음 / 예산 중앙값 이상 (~50%) / 최다 청크 발주 기관 (수 %)
+    budgets = np.array([m.get("budget") or 0 for m in metadatas], dtype=np.float64)
+    orgs, counts = np.unique([str(m.get("organization", "")) for m in metadatas], return_counts=True)
+    scenarios = {
+        "none": None,
+        "budget>=median": {"budget": {"$gte": float(np.median(budgets))}},
+        "organization": {"organization": {"$eq": str(orgs[np.argmax(counts)])}},
+    }
+
+    meta_index = MetadataIndex()
+    for m in metadatas:
+        meta_index.add(Document(page_content="", metadata=m))
+    truth = {}
+    for name, where in scenarios.items():
+        rows = np.flatnonzero(meta_index.mask(where)) if where else np.arange(len(ids))
+        # 제곱 L2 = |v|^2 - 2 q.v + |q|^2 (질의 x 청크 행렬 한 번에)
+        candidates = vectors[rows]
+        dists = (candidates ** 2).sum(axis=1)[None, :] - 2 * queries @ candidates.T + (queries ** 2).sum(axis=1)[:, None]
+        truth[name] = rows[np.argsort(dists, axis=1, kind="stable")[:, :args.k]]
+        print(f"[Bench] scenario {name:<15} {len(rows):>7}/{len(ids)} chunks pass filter")
+
+    np.save(os.path.join(workdir, "vectors.npy"), vectors)
+    np.save(os.path.join(workdir, "queries.npy"), queries)
+    np.savez(os.path.join(workdir, "truth.npz"), **truth)
+    with open(os.path.join(workdir, "docs.jsonl"), "w", encoding="utf-8") as f:
+        for cid, text, m in zip(ids, texts, metadatas):
+            f.write(json.dumps({"id": cid, "text": text, "metadata": m}, ensure_ascii=False) + "\n")
+    with open(os.path.join(workdir, "scenarios.json"), "w", encoding="utf-8") as f:
+        json.dump(scenarios, f, ensure_ascii=False)
+    return len(ids), vectors.shape[1]
+
+
+def open_store(backend: str, path: str, settings: dict = None):
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+        return Chroma(persist_directory=path)
+    from src.faiss_store import FaissVectorStore
+    return FaissVectorStore(path, None, {**(settings or {}), "index_type": backend.split("-", 1)[1]})
+
+
+def worker_build(backend: str, workdir: str, settings: dict):
+    from src.vector_store import upsert_vectors, persist_vector_store
+    vectors = np.load(os.path.join(workdir, "vectors.npy"), mmap_mode="r")
+    with open(os.path.join(workdir, "docs.jsonl"), "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+
+    path = os.path.join(workdir, backend)
+    t0 = time.perf_counter()
+    store = open_store(backend, path, settings)
+    for start in range(0, len(records), UPSERT_BATCH):
+        part = records[start:start + UPSERT_BATCH]
+        upsert_vectors(
+            store,
+            ids=[r["id"] for r in part],
+            embeddings=np.asarray(vectors[start:start + len(part)]),
+            metadatas=[r["metadata"] for r in part],
+            documents=[r["text"] for r in part],
+        )
+    persist_vector_store(store)
+    return {"build_s": time.perf_counter() - t0, "disk_mb": dir_size_mb(path)}
+
+
+def worker_query(backend: str, workdir: str, k: int, repeat: int, settings: dict):
+    queries = np.load(os.path.join(workdir, "queries.npy"))
+    truth = dict(np.load(os.path.join(workdir, "truth.npz")))
+    with open(os.path.join(workdir, "scenarios.json"), "r", encoding="utf-8") as f:
+        scenarios = json.load(f)
+    row_of = {}
+    with open(os.path.join(workdir, "docs.jsonl"), "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            row_of[json.loads(line)["id"]] = i
+
+    before = memory_kb()
+    t0 = time.perf_counter()
+    store = open_store(backend, os.path.join(workdir, backend), settings)
+    result = {"load_s": time.perf_counter() - t0}
+    search = store.similarity_search_by_vector_with_relevance_scores
+    for q in queries[:5]:
+        search(q.tolist(), k=k)   # warm-up
+
+    for name, where in scenarios.items():
+        latencies, recalls = [], []
+        for _ in range(repeat):
+            for q, expected in zip(queries, truth[name]):
+                t0 = time.perf_counter()
+                docs = search(q.tolist(), k=k, filter=where)
+                latencies.append(time.perf_counter() - t0)
+                got = {row_of.get(doc.id or doc.metadata.get("chunk_id")) for doc, _ in docs}
+                recalls.append(len(got & set(expected.tolist())) / max(len(expected), 1))
+        result[name] = {
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p95_ms": float(np.percentile(latencies, 95) * 1000),
+            "recall": float(np.mean(recalls)),
+        }
+    after = memory_kb()
+    result["rss_mb"] = (after["VmRSS"] - before["VmRSS"]) / 1024
+    result["anon_mb"] = (after["RssAnon"] - before["RssAnon"]) / 1024
+    return result
+
+
+def run_worker(mode: str, backend: str, args) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode, "--backend", backend,
+           "--workdir", args.workdir, "--k", str(args.k), "--repeat", str(args.repeat)]
+    cmd += [item for pair in args.set for item in ("--set", pair)]
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+    if out.returncode != 0:
+        raise RuntimeError(f"{backend} {mode} failed:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_vector_store(args):
+    config = load_config()
+    n, dim = prepare(args, config, args.workdir)
+    print(f"\n[Bench] {n} vectors x {dim} dims, {len(np.load(os.path.join(args.workdir, 'queries.npy')))} queries, k={args.k}\n")
+
+    header = f"{'backend':<12} {'build':>7} {'disk':>8} {'load':>6} {'RSS+':>7} {'anon+':>7} | " + \
+             " | ".join(f"{name:^26}" for name in ("none", "budget>=median", "organization"))
+    print(header)
+    print(f"{'':<12} {'(s)':>7} {'(MB)':>8} {'(s)':>6} {'(MB)':>7} {'(MB)':>7} | " + " | ".join(f"{'p50/p95 ms':>13} {'recall':>12}" for _ in range(3)))
+    for backend in args.backends.split(","):
+        built = run_worker("build", backend, args)
+        queried = run_worker("query", backend, args)
+        cells = " | ".join(
+            f"{queried[name]['p50_ms']:>6.2f}/{queried[name]['p95_ms']:<6.2f} {queried[name]['recall']:>12.3f}"
+            for name in ("none", "budget>=median", "organization")
+        )
+        print(f"{backend:<12} {built['build_s']:>7.1f} {built['disk_mb']:>8.1f} {queried['load_s']:>6.2f} "
+              f"{queried['rss_mb']:>7.1f} {queried['anon_mb']:>7.1f} | {cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vector store backend benchmark (Chroma vs FAISS)")
+    parser.add_argument("--source", choices=["hashed", "chroma"], default="hashed",
+                        help="hashed: offline char-bigram projection vectors / chroma: embeddings from path.vector_db")
+    parser.add_argument("--dim", type=int, default=384, help="hashed source vector dimension")
+    parser.add_argument("--replicate", type=int, default=1, help="Grow the corpus with noisy copies of every vector")
+    parser.add_argument("--noise", type=float, default=0.3, help="Noise scale for replicated vectors")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--eval-set", default="data/eval_set_100.json")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="FAISS setting override, e.g. --set nprobe=32 --set ef_search=64 (see src/faiss_store.FAISS_SETTINGS)")
+    parser.add_argument("--workdir", default=None, help="Scratch directory (default: temp dir, removed afterwards)")
+    parser.add_argument("--worker", choices=["build", "query"], help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        settings = {key: yaml.safe_load(value) for key, _, value in (pair.partition("=") for pair in args.set)}
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.worker == "build":
+                result = worker_build(args.backend, args.workdir, settings)
+            else:
+                result = worker_query(args.backend, args.workdir, args.k, args.repeat, settings)
+        print(json.dumps(result))
+    else:
+        cleanup = args.workdir is None
+        args.workdir = args.workdir or tempfile.mkdtemp(prefix="bench_vector_store_")
+        try:
+            bench_vector_store(args)
+        finally:
+            if cleanup:
+                shutil.rmtree(args.workdir, ignore_errors=True)
@@ -2,6 +2,8 @@ import pandas as pd
 import os
 from pathlib import Path
 
+from src.pipeline.page_store import list_parsed_files, parsed_stem
+
 def check_missing_files():
     # 1. Load CSV
     csv_path = "data/data_list.csv"
@@ -32,15 +34,15 @@ def check_missing_files():
     # Check for raw vs parsed mismatch
     raw_dir = Path("data/raw_data")
     raw_files = set([f.name for f in raw_dir.glob("*.pdf")] + [f.name for f in raw_dir.glob("*.hwp")])
-    # Note: raw files might be .hwp or .pdf. Parser outputs .json
+    # Note: raw files might be .hwp or .pdf. Parser outputs _parsed.pages (or legacy _parsed.json)
     
     # 4. Check Parsed
     parsed_dir = Path("data/parsed_json")
-    parsed_files = set([f.name for f in parsed_dir.glob("*.json")])
+    parsed_files = list_parsed_files(parsed_dir)
     
     # Simple check: parsed file stems vs raw file stems
     raw_stems = set([f.stem for f in raw_dir.glob("*.*")])
-    parsed_stems = set([f.stem.replace("_parsed", "") for f in parsed_dir.glob("*.json")])
+    parsed_stems = set([parsed_stem(f) for f in parsed_files])
     
     missing_parsed = raw_stems - parsed_stems
     print(f"\n[Raw but not Parsed] ({len(missing_parsed)})")
@@ -0,0 +1,103 @@
+"""
+Upstage Document Parse API 로컬 stub 서버 (파싱 단계 테스트용)
+
+    python debug_tools/stub_upstage_server.py --port 8765 --rate-limit 0.2
+    UPSTAGE_API_URL=http://127.0.0.1:8765 UPSTAGE_API_KEY=dummy python pipeline.py --step parse
+
+업로드된 PDF의 텍스트 레이어(PyMuPDF)를 페이지별 element로 돌려주며,
+--rate-limit 비율만큼 429 + Retry-After 응답을 섞어서 재시도/일시정지 동작을 확인할 수 있음.
+"""
+import json
+import random
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz  # PyMuPDF
+
+stats = {"requests": 0, "ok": 0, "rate_limited": 0, "pages": 0}
+stats_lock = threading.Lock()
+
+
+def extract_document(headers, body: bytes) -> bytes:
+    """multipart/form-data 본문에서 'document' 파트의 바이트 추출"""
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode("latin-1") + body
+    )
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "document":
+            return part.get_payload(decode=True)
+    raise ValueError("'document' part not found")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    rate_limit = 0.0
+    retry_after = 1
+    latency = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with stats_lock:
+            stats["requests"] += 1
+
+        if random.random() < self.rate_limit:
+            with stats_lock:
+                stats["rate_limited"] += 1
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.retry_after))
+            self.end_headers()
+            self.wfile.write(b'{"error": "too_many_requests"}')
+            return
+
+        try:
+            doc = fitz.open(stream=extract_document(self.headers, body), filetype="pdf")
+        except Exception as e:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+
+        if self.latency:
+            threading.Event().wait(self.latency)
+
+        elements = []
+        for i, page in enumerate(doc, start=1):
+            text = page.get_text("text").strip()
+            elements.append({
+                "id": i - 1,
+                "page": i,
+                "category": "paragraph",
+                "content": {"markdown": text, "text": text, "html": f"<p>{text}</p>"},
+            })
+        with stats_lock:
+            stats["ok"] += 1
+            stats["pages"] += len(doc)
+
+        payload = json.dumps({"elements": elements, "usage": {"pages": len(doc)}}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        print(f"[Stub] {self.address_string()} {fmt % args} | {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub for the Upstage Document Parse API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds for 429 responses")
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial latency per request (seconds)")
+    args = parser.parse_args()
+
+    StubHandler.rate_limit = args.rate_limit
+    StubHandler.retry_after = args.retry_after
+    StubHandler.latency = args.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"[Stub] Upstage Document Parse stub on http://127.0.0.1:{args.port} (429 rate={args.rate_limit})")
+    server.serve_forever()
@@ -30,7 +30,7 @@ def verify_retrieval_config():
     print(f"Configured k: {config['process']['retrieval_k']}")
     
     # The chain structure in src/retriever.py is:
-    # llm.with_structured_output(SearchQuery) | RunnableLambda(retriever_func)
+    # query analyzer (cache -> rule-based -> llm.with_structured_output(SearchQuery)) | RunnableLambda(retriever_func)
     # So the input to the chain should be the input to the LLM (string or messages).
     
     # Invoke
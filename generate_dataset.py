@@ -1,5 +1,4 @@
 import json
-import glob
 import os
 import asyncio
 from tqdm.asyncio import tqdm_asyncio
@@ -8,19 +7,23 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from dotenv import load_dotenv
 
+from src.pipeline.page_store import open_pages, list_parsed_files
+
 load_dotenv()
 
 async def process_file(file_path, chain, semaphore):
     async with semaphore:
         try:
-            # Read file (sync io in threaded executor if needed, but small files ok)
-            # Actually for strict async we should use aiofiles, but simple open is fast enough for 100 json files
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Combine text content
+            # Combine text content (앞쪽 페이지부터 MAX_CTX_LEN 만큼만 읽음)
             MAX_CTX_LEN = 8000 # Reduce to speed up
-            full_text = "\n".join([item.get('content', '') for item in data])
+            texts, total_len = [], 0
+            with open_pages(file_path) as reader:
+                for item in reader.iter_pages():
+                    texts.append(item.get('content', ''))
+                    total_len += len(texts[-1]) + 1
+                    if total_len > MAX_CTX_LEN:
+                        break
+            full_text = "\n".join(texts)
             if len(full_text) > MAX_CTX_LEN:
                 full_text = full_text[:MAX_CTX_LEN]
             
@@ -71,7 +74,7 @@ async def generate_qa_dataset_async():
     chain = prompt | llm | JsonOutputParser()
     
     # 2. Load Files
-    files = glob.glob("data/parsed_json/*.json")
+    files = [str(f) for f in list_parsed_files("data/parsed_json")]
     print(f"Found {len(files)} files. Generating 1 QA pair per file (Async, Optimized)...")
     
     # Semaphore to limit concurrency
@@ -5,19 +5,54 @@ from dotenv import load_dotenv
 from pathlib import Path
 
 # Pipelines
-from src.pipeline.hwp_converter import run_hwp_conversion
+# (HWP COM 변환기는 Windows + 한글 설치 환경에서만 동작하므로 backend: com 일 때만 import)
+from src.pipeline.hwp_reader import run_hwp_extraction
 from src.pipeline.pdf_parser import run_pdf_parsing
 from src.pipeline.chunker import run_chunking
-from src.loader import load_rfp_documents
-from src.indexer import build_vector_db
+from src.loader import iter_rfp_documents
+from src.indexer import (
+    build_vector_db, get_cached_embeddings, load_manifest, save_manifest, manifest_diff, SIDE_MANIFEST_NAME,
+)
+from src.sparse_index import build_sparse_index, update_sparse_index, load_sparse_index
+from src.project_table import ProjectTable, save_project_table
+from src.section_index import SectionIndex, save_section_index, load_section_index
+from src.metadata_index import MetadataIndex, save_metadata_index, load_metadata_index
+from src.agency_index import build_agency_index
+from src.project_index import build_project_index, load_project_index
 
 def load_config():
     with open("config/config.yaml", "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+def load_side_indexes(config):
+    """증분 색인용 기존 사이드 인덱스 (섹션, 메타데이터, BM25). 하나라도 없으면 None -> 전체 구축"""
+    indexes = (load_section_index(config), load_metadata_index(config), load_sparse_index(config))
+    return None if any(index is None for index in indexes) else indexes
+
+def update_side_indexes(config, indexes, changed, stale_ids):
+    """manifest 변경분만 사이드 인덱스에 반영: 이전 청크 제거 -> 바뀐 소스만 다시 읽어 추가"""
+    sections, metadata_index, sparse_index = indexes
+    print(f"[Info] 사이드 인덱스 증분 갱신: 변경 소스 {len(changed)}건, 제거 청크 {len(stale_ids)}건")
+    if not changed and not stale_ids:
+        return
+    sections.remove(stale_ids)
+    metadata_index.remove(stale_ids)
+
+    def collect(docs):
+        for doc in docs:
+            sections.add(doc)
+            metadata_index.add(doc)
+            yield doc
+
+    docs = iter_rfp_documents(config, sources=changed) if changed else ()
+    update_sparse_index(sparse_index, stale_ids, collect(docs), config)
+    save_section_index(sections, config)
+    save_metadata_index(metadata_index, config)
+
 def main():
     parser = argparse.ArgumentParser(description="Integrated RAG Pipeline")
     parser.add_argument("--step", type=str, default="all", choices=["convert", "parse", "clean", "index", "all"], help="Step to run")
+    parser.add_argument("--incremental", action="store_true", help="Index step: upsert changed sources only (keep existing Vector DB)")
     args = parser.parse_args()
     
     load_dotenv()
@@ -25,9 +60,19 @@ def main():
     
     # 0. HWP Conversion
     if args.step in ["convert", "all"]:
-        print("\n[Step 0] Converting HWP to PDF...")
         raw_data_path = config['path']['raw_data']
-        run_hwp_conversion(raw_data_path)
+        hwp_config = config.get('hwp', {})
+
+        if hwp_config.get('backend', 'native') == 'com':
+            print("\n[Step 0] Converting HWP to PDF (Hancom COM)...")
+            from src.pipeline.hwp_converter import run_hwp_conversion
+            run_hwp_conversion(raw_data_path)
+        else:
+            print("\n[Step 0] Extracting HWP text (native HWP 5.x reader)...")
+            failed = run_hwp_extraction(raw_data_path, config['path']['raw_json'], workers=hwp_config.get('workers'))
+            if failed:
+                print(f"⚠️ {len(failed)} HWP files could not be read natively. "
+                      f"Convert them to PDF (hwp.backend: com) and run the parse step.")
 
     # 1. Parsing (PDF -> JSON)
     if args.step in ["parse", "all"]:
@@ -40,7 +85,7 @@ def main():
             print("Error: UPSTAGE_API_KEY not found in env.")
             return
 
-        run_pdf_parsing(raw_data_path, raw_json_path, api_key)
+        run_pdf_parsing(raw_data_path, raw_json_path, api_key, parse_config=config.get('parse', {}))
 
     # 2. Cleaning & Chunking (JSON -> JSONL)
     if args.step in ["clean", "all"]:
@@ -48,7 +93,7 @@ def main():
         raw_json_path = config['path']['raw_json']
         clean_json_path = config['path']['clean_json']
         
-        run_chunking(raw_json_path, clean_json_path)
+        run_chunking(raw_json_path, clean_json_path, workers=config['process'].get('chunk_workers'))
 
     # 3. Indexing (JSONL -> Chroma)
     if args.step in ["index", "all"]:
@@ -56,19 +101,51 @@ def main():
         # Ensure folders exist
         Path(config['path']['clean_json']).mkdir(parents=True, exist_ok=True)
         
-        # [Reset] Delete existing DB for clean build
+        # [Reset] Delete existing DB for clean build (incremental 모드에서는 유지)
         import shutil
         db_path = config['path']['vector_db']
-        if os.path.exists(db_path):
+        if os.path.exists(db_path) and not args.incremental:
             print(f"[Info] Deleting existing Vector DB at {db_path}...")
             shutil.rmtree(db_path)
         
-        # Load docs using refactored loader
-        docs = load_rfp_documents(config)
-        
-        if docs:
-            build_vector_db(docs, config)
+        # Stream docs from the loader straight into the vector DB (bounded batches, no full docs list).
+        # Project table + section/metadata indexes are collected from the same stream (chunk ids / column arrays only, no chunk text).
+        # --incremental: 섹션/메타데이터/BM25 인덱스는 manifest 변경분만 반영 (이전 기록이나 인덱스가 없으면 전체 구축)
+        side_manifest = load_manifest(db_path, SIDE_MANIFEST_NAME) if args.incremental else {}
+        side_indexes = load_side_indexes(config) if side_manifest else None
+        projects = ProjectTable()
+        sections = SectionIndex()
+        metadata_index = MetadataIndex()
+        streamed = {"chunks": 0}
+
+        def collect(docs):
+            for doc in docs:
+                if side_indexes is None:
+                    sections.add(doc)
+                    metadata_index.add(doc)
+                streamed["chunks"] += 1
+                yield doc
+
+        build_vector_db(collect(iter_rfp_documents(config, projects)), config, incremental=args.incremental)
+
+        if streamed["chunks"]:
             print("✅ Vector DB built successfully.")
+            manifest = load_manifest(db_path)
+            save_project_table(projects, config)
+            build_agency_index(config)
+            build_project_index(
+                projects, get_cached_embeddings(config), config,
+                previous=load_project_index(config) if args.incremental else None,
+            )
+
+            if side_indexes is not None:
+                update_side_indexes(config, side_indexes, *manifest_diff(side_manifest, manifest))
+            else:
+                save_section_index(sections, config)
+                save_metadata_index(metadata_index, config)
+                # Corpus-wide BM25 index (loaded by retriever at startup): second pass over the stream
+                build_sparse_index(iter_rfp_documents(config), config)
+            save_manifest(db_path, manifest, SIDE_MANIFEST_NAME)
         else:
             print("⚠️ No documents loaded. Skipping indexing.")
 
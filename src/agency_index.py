@@ -0,0 +1,232 @@
+import os
+import re
+import json
+import unicodedata
+from collections import defaultdict
+from typing import List
+
+import pandas as pd
+
+# =========================
+# 발주 기관명 정규화 / 별칭
+#   "경기도 평택시" <- "평택시", "평택", "경기도평택시"
+#   "한국철도공사 (용역)" <- "철도공사", "코레일"
+# =========================
+# 법인 형태 / 공고 부가 표기 (비교 시 제거)
+LEGAL_PREFIX_RE = re.compile(r"^(?:재단법인|사단법인|학교법인|주식회사|\(재\)|\(사\)|\(주\)|\(학\))")
+LEGAL_SUFFIX_RE = re.compile(r"(?:\(주\)|주식회사|\(재\)|\(사\))$")
+NOTICE_SUFFIX_RE = re.compile(r"(?:입찰공고|전자조달|\([^)]*\))$")
+PUNCT_RE = re.compile(r"[\s\-_.,·・'\"()\[\]]")
+
+# 광역자치단체 정식 명칭 -> 통용 약칭
+REGION_ABBREVIATIONS = {
+    "서울특별시": ("서울시", "서울"), "부산광역시": ("부산시", "부산"), "대구광역시": ("대구시", "대구"),
+    "인천광역시": ("인천시", "인천"), "광주광역시": ("광주시", "광주"), "대전광역시": ("대전시", "대전"),
+    "울산광역시": ("울산시", "울산"), "세종특별자치시": ("세종시", "세종"), "경기도": ("경기",),
+    "강원특별자치도": ("강원도", "강원"), "충청북도": ("충북",), "충청남도": ("충남",),
+    "전북특별자치도": ("전라북도", "전북"), "전라남도": ("전남",), "경상북도": ("경북",),
+    "경상남도": ("경남",), "제주특별자치도": ("제주도", "제주"),
+}
+# 기관명 앞의 일반 수식어 ("한국수자원공사" -> "수자원공사")
+GENERIC_PREFIXES = ("한국", "국립", "국가", "대한", "중앙")
+# 규칙으로 만들 수 없는 통용 약칭 (정규화된 기관명 기준)
+KNOWN_ABBREVIATIONS = {
+    "한국철도공사": ("코레일", "korail"),
+    "한국수자원공사": ("수공", "kwater"),
+    "한국농수산식품유통공사": ("at",),
+    "국민연금공단": ("국민연금", "nps"),
+    "중앙선거관리위원회": ("선관위", "중앙선관위"),
+    "koica": ("코이카", "한국국제협력단"),
+    "한국가스공사": ("가스공사", "kogas"),
+    "한국산업인력공단": ("산업인력공단", "hrdkorea"),
+    "한국연구재단": ("nrf",),
+    "기초과학연구원": ("ibs",),
+    "한국원자력연구원": ("원자력연구원", "kaeri"),
+    "국방과학연구소": ("국과연",),
+    "광주과학기술원": ("gist", "지스트"),
+    "한국수출입은행": ("수출입은행", "수은"),
+}
+MIN_TEXT_ALIAS_LEN = 3     # 질의 본문에서 직접 찾을 때 최소 별칭 길이 (짧은 별칭 오탐 방지)
+FUZZY_THRESHOLD = 0.5      # char bigram Dice 유사도 하한
+MAX_MATCHES = 5            # 이보다 많은 기관이 걸리면 모호한 질의로 보고 필터 생략
+
+
+def normalize_agency(name: str) -> str:
+    """NFKC -> 공고 부가 표기/법인 형태 제거 -> 공백·기호 제거 -> 소문자"""
+    text = unicodedata.normalize("NFKC", str(name)).strip()
+    for _ in range(2):
+        text = NOTICE_SUFFIX_RE.sub("", text).strip()
+        text = LEGAL_PREFIX_RE.sub("", text).strip()
+        text = LEGAL_SUFFIX_RE.sub("", text).strip()
+    return PUNCT_RE.sub("", text).lower()
+
+
+def token_key(text: str):
+    """공백 단위로 정규화해 이어 붙인 키 + 각 토큰의 시작/끝 위치 (부분 문자열이 토큰 경계에 맞는지 확인용)"""
+    tokens = [normalize_agency(t) for t in unicodedata.normalize("NFKC", str(text)).split()]
+    key, starts, ends = "", set(), set()
+    for token in tokens:
+        if token:
+            starts.add(len(key))
+            key += token
+            ends.add(len(key))
+    return key, starts, ends
+
+
+def bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)} if len(text) > 1 else {text}
+
+
+def agency_aliases(name: str) -> set:
+    """발주 기관명 하나 -> 정규화된 별칭 집합"""
+    full = normalize_agency(name)
+    aliases = {full}
+
+    # 공백 단위 마지막 토큰 ("경기도 평택시" -> "평택시"), 광역 약칭 + 나머지 ("서울특별시 여성가족재단" -> "서울여성가족재단")
+    tokens = [normalize_agency(t) for t in unicodedata.normalize("NFKC", str(name)).split()]
+    tokens = [t for t in tokens if t]
+    if len(tokens) > 1:
+        aliases.add(tokens[-1])
+        aliases.add("".join(tokens[1:]))
+        for short in REGION_ABBREVIATIONS.get(tokens[0], ()):
+            aliases.add(short + "".join(tokens[1:]))
+
+    for alias in list(aliases):
+        # 광역자치단체 약칭
+        for region, shorts in REGION_ABBREVIATIONS.items():
+            if alias.startswith(region):
+                aliases.update(short + alias[len(region):] for short in shorts)
+        # 기초자치단체: "평택시" -> "평택", 대학: "고려대학교" -> "고려대"
+        if re.fullmatch(r"\w{2,}[시군구]", alias):
+            aliases.add(alias[:-1])
+        if alias.endswith("대학교"):
+            aliases.add(alias[:-2])
+        # 일반 수식어 제거: "한국수자원공사" -> "수자원공사"
+        for prefix in GENERIC_PREFIXES:
+            if alias.startswith(prefix) and len(alias) - len(prefix) >= 3:
+                aliases.add(alias[len(prefix):])
+
+    for alias in list(aliases):
+        aliases.update(KNOWN_ABBREVIATIONS.get(alias, ()))
+    return {alias for alias in aliases if alias}
+
+
+class AgencyIndex:
+    """
+    발주 기관 별칭 -> 기관 id (agencies 리스트 위치, 값은 CSV '발주 기관' 원문 = 청크 organization 메타데이터)
+    조회 순서: 정확 일치 -> 토큰 단위 부분 일치 -> char bigram 유사도
+    필터로 쓰는 것은 정확 일치뿐 ("서울대학교" -> "남서울대학교" 같은 추정 결과로 다른 기관만 남기지 않도록)
+    """
+
+    def __init__(self, agencies: List[str], aliases: dict):
+        self.agencies = agencies
+        self.aliases = aliases   # 정규화 별칭 -> [agency id, ...]
+        self._bigram_index = defaultdict(set)
+        for alias in aliases:
+            for gram in bigrams(alias):
+                self._bigram_index[gram].add(alias)
+        # 기관명 원문의 토큰 경계 ("경기도 평택시" -> "경기도" | "평택시")
+        self._token_keys = [token_key(name) for name in agencies]
+
+    def __len__(self):
+        return len(self.agencies)
+
+    def resolve_ids(self, name: str):
+        """기관명 -> (agency id 목록, 정확 일치 여부)"""
+        key = normalize_agency(name)
+        if not key:
+            return [], False
+
+        # 1) 정확 일치 (정식 명칭 / 약칭)
+        if key in self.aliases:
+            return list(self.aliases[key]), True
+
+        # 2) 부분 일치: 질의가 기관명의 토큰 경계에 딱 맞을 때만 ("경기도" -> "경기도 평택시", "서울대학교" -/-> "남서울대학교")
+        query_key, query_starts, query_ends = token_key(name)
+        ids = set()
+        for agency_id, (agency_key, starts, ends) in enumerate(self._token_keys):
+            pos = agency_key.find(key)
+            while pos >= 0:
+                if pos in starts and pos + len(key) in ends:
+                    ids.add(agency_id)
+                    break
+                pos = agency_key.find(key, pos + 1)
+            # 기관명이 질의 안에 토큰 단위로 들어 있는 경우 ("평택시 버스정보시스템" 같은 긴 표기)
+            pos = query_key.find(agency_key) if len(agency_key) >= MIN_TEXT_ALIAS_LEN else -1
+            if pos in query_starts and pos + len(agency_key) in query_ends:
+                ids.add(agency_id)
+        if ids:
+            return sorted(ids), False
+
+        # 3) char bigram Dice 유사도 (오타/띄어쓰기 차이). 임계값과 같은 점수는 채택하지 않음
+        query_grams = bigrams(key)
+        candidates = set()
+        for gram in query_grams:
+            candidates |= self._bigram_index.get(gram, set())
+        best, best_score = set(), 0.0
+        for alias in candidates:
+            alias_grams = bigrams(alias)
+            score = 2 * len(query_grams & alias_grams) / (len(query_grams) + len(alias_grams))
+            if score <= FUZZY_THRESHOLD:
+                continue
+            if score > best_score:
+                best, best_score = set(self.aliases[alias]), score
+            elif score == best_score:
+                best |= set(self.aliases[alias])
+        return sorted(best), False
+
+    def resolve(self, name: str, exact_only: bool = True) -> List[str]:
+        """기관명 -> 청크 organization 값 목록 (모호하거나 없으면 빈 리스트). exact_only: 정확 일치만 (필터용)"""
+        ids, exact = self.resolve_ids(name)
+        if (exact_only and not exact) or len(ids) > MAX_MATCHES:
+            return []
+        return [self.agencies[i] for i in ids]
+
+    def find_in_text(self, text: str) -> List[str]:
+        """
+        질의 본문에 기관 별칭(MIN_TEXT_ALIAS_LEN 이상)이 어절 시작 위치에 그대로 들어 있으면 해당 기관 (가장 긴 별칭 기준).
+        끝 경계는 보지 않음 ("평택시의" 같은 조사 허용), 어절 중간에서 시작하는 일치("남서울대학교" 안의 "서울대학교")는 제외
+        """
+        key, starts, _ = token_key(text)
+        hits = [
+            alias for alias in self.aliases
+            if len(alias) >= MIN_TEXT_ALIAS_LEN and any(key.startswith(alias, pos) for pos in starts)
+        ]
+        if not hits:
+            return []
+        longest = max(len(alias) for alias in hits)
+        ids = sorted({i for alias in hits if len(alias) == longest for i in self.aliases[alias]})
+        return [self.agencies[i] for i in ids] if len(ids) <= MAX_MATCHES else []
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"agencies": self.agencies, "aliases": self.aliases}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def build_agency_index(config) -> AgencyIndex:
+    """data_list.csv '발주 기관' -> 별칭 인덱스 (path.agency_index 에 저장)"""
+    df = pd.read_csv(config['path']['csv_file'])
+    agencies = sorted(df['발주 기관'].dropna().astype(str).unique().tolist())
+
+    aliases = defaultdict(list)
+    for agency_id, name in enumerate(agencies):
+        for alias in sorted(agency_aliases(name)):
+            aliases[alias].append(agency_id)
+
+    index = AgencyIndex(agencies, dict(aliases))
+    path = config['path']['agency_index']
+    index.save(path)
+    print(f"[Agency Index] saved: {path} ({len(agencies)} agencies, {len(aliases)} aliases)")
+    return index
+
+
+def load_agency_index(config):
+    path = config.get('path', {}).get('agency_index')
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return AgencyIndex(data["agencies"], data["aliases"])
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+
+def embedding_key(model: str, text: str) -> str:
+    """(임베딩 모델, 청크 텍스트) 기준 content-addressed 키"""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 API 호출 전에 로컬 SQLite 캐시를 확인하는 Embeddings 래퍼.
+    - 키: sha256(model + text), 값: float32 벡터 (Chroma 내부 저장 정밀도와 동일)
+    - 텍스트가 바뀌지 않은 청크는 재색인 시 API를 호출하지 않음
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_path: str, model: str):
+        self.embeddings = embeddings
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            # SQLite 바인딩 변수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec.tolist()
+        return found
+
+    def _store(self, items: dict):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vec).tobytes()) for key, vec in items.items()],
+            )
+            self._conn.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model, t) for t in texts]
+        cached = self._lookup(list(set(keys)))
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) API 호출
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        with self._lock:
+            # 색인 시 여러 스레드가 동시에 호출하므로 카운터도 lock 안에서 갱신
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            # 캐시 적중 시와 같은 값을 돌려주도록 float32 로 맞춤
+            new_items = {key: array("f", vec).tolist() for key, vec in zip(missing.keys(), vectors)}
+            self._store(new_items)
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"hit {self.hits} / miss {self.misses} (hit rate {rate:.1f}%)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
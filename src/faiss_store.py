@@ -0,0 +1,355 @@
+"""
+FAISS 벡터 저장소 (vector_store.backend: faiss)
+
+    {persist_directory}/
+      faiss.index        ANN 인덱스 (hnsw / ivfpq / flat, 행 번호 = FAISS id) -> 검색 시 mmap 으로 로드
+      faiss_vectors.npy  원본 float32 벡터 (n x d) -> 재구축 / 허용 ID 목록 정확 검색 / IVF-PQ 재정렬에 사용 (mmap)
+      faiss_docs.jsonl   행마다 {"id", "text", "metadata"} 한 줄 -> 결과 문서만 offset 으로 잘라 파싱 (mmap)
+      faiss_offsets.npy  faiss_docs.jsonl 행 시작 위치 (n + 1)
+      faiss_meta.npz     MetadataIndex 컬럼 (budget, 날짜 epoch, 차수, 기관/프로젝트 코드) -> where 필터 -> ID selector
+
+쓰기(upsert_vectors / add_texts / delete)는 staging 파일에 이어 쓰고 persist() 에서 한 번에 반영
+(삭제 행 정리 + ANN 인덱스 재구축). persist() 전까지는 검색 결과에 반영되지 않음.
+"""
+import os
+import json
+import mmap
+import time
+import uuid
+import itertools
+from typing import List, Optional
+
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from src.metadata_index import MetadataIndex
+from src.sparse_index import match_filter
+
+INDEX_FILE = "faiss.index"
+VECTORS_FILE = "faiss_vectors.npy"
+DOCS_FILE = "faiss_docs.jsonl"
+OFFSETS_FILE = "faiss_offsets.npy"
+META_FILE = "faiss_meta.npz"
+STAGE_VECTORS_FILE = "faiss_staging.f32"   # persist() 전까지 추가된 벡터 / 문서를 디스크에 흘려 둠 (메모리 상한)
+STAGE_DOCS_FILE = "faiss_staging.jsonl"
+
+# =========================
+# FAISS 인덱스 설정 (config vector_store: 섹션으로 덮어쓰기)
+# =========================
+FAISS_SETTINGS = {
+    "index_type": "hnsw",      # hnsw | ivfpq | flat
+    "hnsw_m": 32,              # HNSW 이웃 수 (메모리 ~ n * m * 8B)
+    "ef_construction": 200,
+    "ef_search": 128,          # 검색 시 후보 리스트 크기 (k 보다 작으면 k 사용)
+    "ivf_nlist": 0,            # IVF 클러스터 수 (0: 4 * sqrt(n), 학습 데이터가 부족하면 n / 39 로 축소)
+    "pq_m": 64,                # PQ 서브벡터 수 (차원의 약수로 조정)
+    "nprobe": 32,              # 검색 시 조회할 IVF 클러스터 수
+    "ivfpq_refine": 8,         # IVF-PQ: k * refine 개를 가져와 원본 벡터로 정확한 거리 재계산 (1: 재정렬 안 함)
+    "exact_search_max": 5000,  # 필터 통과 행이 이 이하이면 ANN 대신 해당 행만 정확 검색
+    "mmap": True,              # 인덱스 / 벡터 / 문서 파일을 메모리 맵으로 로드
+}
+EXACT_SEARCH_MAX_RATIO = 0.1   # 통과 비율이 이보다 높으면 정확 검색 대신 selector + ANN (mmap 행 수집 비용 > 탐색 비용)
+MAX_EF_SEARCH = 4096           # 필터 검색 시 HNSW efSearch 상한
+ADD_CHUNK = 10_000             # ANN 인덱스에 벡터를 나눠서 추가하는 단위
+TRAIN_SAMPLE_MAX = 100_000     # IVF-PQ 학습 샘플 최대 수
+
+
+def build_ann_index(vectors: np.ndarray, settings: dict):
+    """float32 (n x d) 벡터 -> 설정에 맞는 FAISS 인덱스 (행 번호가 id)"""
+    n, d = vectors.shape
+    index_type = settings["index_type"]
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, settings["hnsw_m"])
+        index.hnsw.efConstruction = settings["ef_construction"]
+    elif index_type == "ivfpq" and n > 0:
+        # 학습 데이터가 적으면 nlist / 코드 비트 수를 줄임 (FAISS 권장: 클러스터당 39개 이상)
+        nlist = settings["ivf_nlist"] or int(4 * np.sqrt(n))
+        nlist = max(1, min(nlist, n // 39))
+        nbits = int(max(4, min(8, np.floor(np.log2(max(n // 39, 16))))))
+        pq_m = max(m for m in range(1, min(settings["pq_m"], d) + 1) if d % m == 0)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(d), d, nlist, pq_m, nbits)
+        sample = np.sort(np.random.default_rng(0).choice(n, size=min(n, TRAIN_SAMPLE_MAX), replace=False))
+        index.train(np.ascontiguousarray(vectors[sample]))
+    elif index_type in ("flat", "ivfpq"):
+        index = faiss.IndexFlatL2(d)
+    else:
+        raise ValueError(f"[FAISS] 알 수 없는 index_type: {index_type} (hnsw | ivfpq | flat)")
+
+    for start in range(0, n, ADD_CHUNK):
+        index.add(np.ascontiguousarray(vectors[start:start + ADD_CHUNK]))
+    return index
+
+
+class FaissVectorStore(VectorStore):
+    """
+    Chroma 대신 쓰는 프로세스 내 FAISS 저장소.
+    retriever / main / evaluate 가 쓰는 Chroma API (similarity_search_by_vector_with_relevance_scores,
+    get_by_ids, as_retriever, embeddings) 를 같은 의미로 제공. 거리는 Chroma 기본값과 같은 제곱 L2.
+    """
+
+    def __init__(self, persist_directory: str, embedding_function, settings: dict = None):
+        self.persist_directory = persist_directory
+        self._embeddings = embedding_function
+        self.settings = {**FAISS_SETTINGS, **{k: v for k, v in (settings or {}).items() if k in FAISS_SETTINGS}}
+
+        self._staged = {}     # id -> staging 파일 내 위치 (같은 id 를 다시 쓰면 마지막 위치)
+        self._deleted = set() # 삭제할 기존 행 번호
+        self._stage_files = None
+        self._stage_offsets = [0]
+        self._stage_dim = 0
+        # 이전 실행이 persist() 전에 끝났다면 staging 파일은 의미가 없음 (manifest 에도 기록되지 않음)
+        for name in (STAGE_VECTORS_FILE, STAGE_DOCS_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        self._open()
+
+    # ---------- 로드 ----------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, name)
+
+    def exists(self) -> bool:
+        return all(os.path.exists(self._path(name)) for name in (INDEX_FILE, VECTORS_FILE, DOCS_FILE, OFFSETS_FILE, META_FILE))
+
+    def _open(self):
+        self.index, self._vectors, self._docs_file, self._docs = None, None, None, None
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._meta = MetadataIndex()
+        self._row_of = {}
+        if not self.exists():
+            return
+
+        use_mmap = self.settings["mmap"]
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if use_mmap else 0
+        self.index = faiss.read_index(self._path(INDEX_FILE), flags)
+        self._vectors = np.load(self._path(VECTORS_FILE), mmap_mode="r" if use_mmap else None)
+        self._offsets = np.load(self._path(OFFSETS_FILE))
+        with np.load(self._path(META_FILE), allow_pickle=False) as data:
+            columns = {key[len("col__"):]: data[key] for key in data.files if key.startswith("col__")}
+            categories = {key[len("cat__"):]: data[key] for key in data.files if key.startswith("cat__")}
+            self._meta = MetadataIndex(data["chunk_ids"], columns, categories)
+
+        n = len(self._offsets) - 1
+        if not (self.index.ntotal == len(self._vectors) == len(self._meta.chunk_ids) == n):
+            raise RuntimeError(
+                f"[FAISS] {self.persist_directory} 파일 간 행 수가 다릅니다 (index {self.index.ntotal}, vectors {len(self._vectors)}, "
+                f"docs {n}). 저장 중 중단된 것으로 보이니 --step index 로 다시 구축하세요."
+            )
+        if n:
+            self._docs_file = open(self._path(DOCS_FILE), "rb")
+            self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._row_of = {cid: i for i, cid in enumerate(self._meta.chunk_ids.tolist())}
+
+    def _close(self):
+        if self._docs is not None:
+            self._docs.close()
+            self._docs_file.close()
+        self.index, self._vectors, self._docs_file, self._docs = None, None, None, None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @property
+    def embeddings(self):
+        return self._embeddings
+
+    def _record(self, row: int) -> dict:
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(self._docs[start:end])
+
+    def _document(self, row: int) -> Document:
+        record = self._record(row)
+        return Document(page_content=record["text"], metadata=record["metadata"], id=record["id"])
+
+    # ---------- 쓰기 ----------
+    def upsert_vectors(self, ids, embeddings, metadatas, documents):
+        """이미 계산된 임베딩을 id 기준으로 추가/교체 (persist() 시 반영)"""
+        if self._stage_files is None:
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self._stage_files = (open(self._path(STAGE_VECTORS_FILE), "wb"), open(self._path(STAGE_DOCS_FILE), "wb"))
+        vector_file, docs_file = self._stage_files
+
+        for cid, vector, metadata, text in zip(ids, embeddings, metadatas, documents):
+            row = self._row_of.get(cid)
+            if row is not None:
+                self._deleted.add(row)
+            vector = np.asarray(vector, dtype=np.float32)
+            self._stage_dim = len(vector)
+            vector_file.write(vector.tobytes())
+            line = (json.dumps({"id": cid, "text": text, "metadata": metadata or {}}, ensure_ascii=False) + "\n").encode("utf-8")
+            docs_file.write(line)
+            self._stage_offsets.append(self._stage_offsets[-1] + len(line))
+            self._staged[cid] = len(self._stage_offsets) - 2
+
+    def add_texts(self, texts, metadatas=None, *, ids=None, **kwargs) -> List[str]:
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        self.upsert_vectors(ids, self._embeddings.embed_documents(texts), metadatas, texts)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs):
+        for cid in ids or []:
+            self._staged.pop(cid, None)
+            row = self._row_of.get(cid)
+            if row is not None:
+                self._deleted.add(row)
+        return True
+
+    def persist(self):
+        """기존 행(삭제 제외) + staging 행 -> 파일 재작성 + ANN 인덱스 재구축"""
+        if not self._staged and not self._deleted and (self.exists() or self._stage_files is None):
+            return
+        t0 = time.perf_counter()
+        os.makedirs(self.persist_directory, exist_ok=True)
+        live = np.array([row for row in range(len(self)) if row not in self._deleted], dtype=np.int64)
+        staged_ids = list(self._staged)
+        staged_pos = np.array([self._staged[cid] for cid in staged_ids], dtype=np.int64)
+        dim = self._vectors.shape[1] if self._vectors is not None else self._stage_dim
+        total = len(live) + len(staged_ids)
+
+        stage_vectors = stage_docs = None
+        if self._stage_files is not None:
+            for f in self._stage_files:
+                f.close()
+            self._stage_files = None
+            if len(self._stage_offsets) > 1:
+                stage_vectors = np.memmap(self._path(STAGE_VECTORS_FILE), dtype=np.float32, mode="r",
+                                          shape=(len(self._stage_offsets) - 1, dim))
+                stage_docs = np.memmap(self._path(STAGE_DOCS_FILE), dtype=np.uint8, mode="r")
+        stage_offsets = np.asarray(self._stage_offsets, dtype=np.int64)
+
+        tmp = lambda name: self._path(name) + ".tmp"
+        # 1) 원본 벡터
+        vectors = np.lib.format.open_memmap(tmp(VECTORS_FILE), mode="w+", dtype=np.float32, shape=(total, dim))
+        for start in range(0, len(live), ADD_CHUNK):
+            part = live[start:start + ADD_CHUNK]
+            vectors[start:start + len(part)] = self._vectors[part]
+        for start in range(0, len(staged_pos), ADD_CHUNK):
+            part = staged_pos[start:start + ADD_CHUNK]
+            vectors[len(live) + start:len(live) + start + len(part)] = stage_vectors[part]
+        vectors.flush()
+
+        # 2) 문서 + 메타데이터 (행 바이트를 그대로 복사)
+        lines = itertools.chain(
+            (self._docs[int(self._offsets[row]):int(self._offsets[row + 1])] for row in live.tolist()),
+            (stage_docs[stage_offsets[pos]:stage_offsets[pos + 1]].tobytes() for pos in staged_pos.tolist()),
+        )
+        offsets = np.zeros(total + 1, dtype=np.int64)
+        meta = MetadataIndex()
+        with open(tmp(DOCS_FILE), "wb") as f:
+            for i, line in enumerate(lines):
+                f.write(line)
+                offsets[i + 1] = offsets[i] + len(line)
+                record = json.loads(line)
+                meta.add(Document(page_content="", metadata={**record["metadata"], "chunk_id": record["id"]}))
+        with open(tmp(OFFSETS_FILE), "wb") as f:
+            np.save(f, offsets)
+        meta.save(tmp(META_FILE))
+
+        # 3) ANN 인덱스
+        index = build_ann_index(vectors, self.settings)
+        faiss.write_index(index, tmp(INDEX_FILE))
+        del vectors, index, stage_vectors, stage_docs
+
+        # 인덱스 파일을 마지막에 교체 (중간에 끊기면 로드 시 행 수 검사에서 걸림)
+        self._close()
+        for name in (VECTORS_FILE, DOCS_FILE, OFFSETS_FILE, META_FILE, INDEX_FILE):
+            os.replace(tmp(name), self._path(name))
+        for name in (STAGE_VECTORS_FILE, STAGE_DOCS_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        self._staged, self._deleted, self._stage_offsets = {}, set(), [0]
+        self._open()
+        print(f"[FAISS] {self.settings['index_type']} index saved: {self.persist_directory} "
+              f"({len(self)} vectors, dim {dim}, {time.perf_counter() - t0:.1f}s)")
+
+    # ---------- 검색 ----------
+    def _filter_mask(self, where) -> np.ndarray:
+        mask = self._meta.mask(where)
+        if mask is None:
+            # 메타데이터 인덱스에 없는 필드 (source, section_title 등): 문서 메타데이터를 직접 검사 (느림)
+            mask = np.array([match_filter(self._record(row)["metadata"], where) for row in range(len(self))], dtype=bool)
+        return mask
+
+    def _search_params(self, k: int, selector=None, selectivity: float = 1.0):
+        # 필터(selector)가 걸리면 탐색 후보 중 통과 비율만큼만 결과가 되므로 탐색 폭을 1 / 선택도 만큼 넓힘
+        widen = 1.0 / max(selectivity, 1e-6)
+        if isinstance(self.index, faiss.IndexHNSW):
+            ef = int(min(max(self.settings["ef_search"], k) * widen, MAX_EF_SEARCH))
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=max(ef, k))
+        if isinstance(self.index, faiss.IndexIVF):
+            nprobe = int(min(np.ceil(self.settings["nprobe"] * widen), self.index.nlist))
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+        return faiss.SearchParameters(sel=selector) if selector is not None else None
+
+    def _exact(self, query: np.ndarray, rows: np.ndarray, k: int):
+        rows = np.sort(rows)
+        dists = ((np.asarray(self._vectors[rows]) - query) ** 2).sum(axis=1)
+        order = np.argsort(dists, kind="stable")[:k]
+        return rows[order], dists[order]
+
+    def search_rows(self, embedding, k: int, filter=None, ids=None):
+        """질의 벡터 -> (행 번호 배열, 제곱 L2 거리 배열). filter(where) / ids 는 ID selector 로 적용"""
+        if self.index is None or len(self) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+
+        mask = None
+        if filter:
+            mask = self._filter_mask(filter)
+        if ids is not None:
+            id_mask = np.zeros(len(self), dtype=bool)
+            id_mask[[self._row_of[cid] for cid in ids if cid in self._row_of]] = True
+            mask = id_mask if mask is None else mask & id_mask
+
+        selector = bits = None
+        selectivity = 1.0
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return rows, np.empty(0, dtype=np.float32)
+            # 통과 행이 적으면 ANN 그래프/클러스터 탐색보다 해당 행만 정확 계산하는 편이 빠르고 재현율 100%
+            selectivity = len(rows) / len(mask)
+            if len(rows) <= self.settings["exact_search_max"] and selectivity <= EXACT_SEARCH_MAX_RATIO:
+                return self._exact(query[0], rows, k)
+            bits = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+
+        fetch = k * max(self.settings["ivfpq_refine"] if isinstance(self.index, faiss.IndexIVFPQ) else 1, 1)
+        dists, rows = self.index.search(query, fetch, params=self._search_params(fetch, selector, selectivity))
+        rows = rows[0][rows[0] >= 0]
+        if fetch > k and self._vectors is not None:
+            # PQ 근사 거리 -> 원본 벡터로 정확한 거리 재계산 후 상위 k
+            return self._exact(query[0], rows, k)
+        return rows[:k], dists[0][:len(rows)][:k]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k: int = 4, filter=None, ids=None, **kwargs):
+        rows, dists = self.search_rows(embedding, k, filter=filter, ids=ids)
+        return [(self._document(int(row)), float(dist)) for row, dist in zip(rows, dists)]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter=None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter=filter, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter=None, **kwargs):
+        return self.similarity_search_by_vector_with_relevance_scores(self._embeddings.embed_query(query), k, filter=filter, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter=filter, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def get_by_ids(self, ids, /) -> List[Document]:
+        return [self._document(self._row_of[cid]) for cid in ids if cid in self._row_of]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, *, ids=None, persist_directory: str = None, settings: dict = None, **kwargs):
+        if not persist_directory:
+            raise ValueError("[FAISS] persist_directory 가 필요합니다.")
+        store = cls(persist_directory, embedding, settings)
+        store.add_texts(texts, metadatas, ids=ids)
+        store.persist()
+        return store
@@ -1,39 +1,276 @@
 import os
+import json
+import time
+import queue
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-def build_vector_db(docs, config):
-    embeddings = OpenAIEmbeddings(model=config['model']['embedding'])
+from src.embedding_cache import CachedEmbeddings
+from src.vector_store import (
+    vector_backend, open_vector_store, load_vector_store,
+    upsert_vectors, count_vectors, writes_are_durable, persist_vector_store,
+)
+
+def get_cached_embeddings(config):
+    """임베딩 캐시(path.embedding_cache)를 거치는 색인용 임베딩"""
+    model = config['model']['embedding']
+    return CachedEmbeddings(
+        OpenAIEmbeddings(model=model),
+        cache_path=config['path']['embedding_cache'],
+        model=model,
+    )
+
+MANIFEST_NAME = "index_manifest.json"
+# 사이드 인덱스(섹션/메타데이터/BM25)가 반영한 시점의 manifest 사본 -> 다음 증분 실행에서 변경분 계산
+SIDE_MANIFEST_NAME = "side_index_manifest.json"
+
+def doc_id(doc) -> str:
+    """벡터 DB 문서 ID = chunker가 만든 chunk_id"""
+    return doc.metadata['chunk_id']
+
+def source_hash(docs) -> str:
+    """
+    소스(RFP 파일) 단위 해시.
+    _clean.jsonl 내용과 CSV 메타데이터가 모두 반영된 Document 기준으로 계산
+    """
+    h = hashlib.sha256()
+    for doc in docs:
+        h.update(doc_id(doc).encode("utf-8"))
+        h.update(doc.page_content.encode("utf-8"))
+        h.update(json.dumps(doc.metadata, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+def load_manifest(db_path, name=MANIFEST_NAME):
+    manifest_path = os.path.join(db_path, name)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(db_path, manifest, name=MANIFEST_NAME):
+    # 원자적 저장: 중간에 실패해도 이전 manifest가 깨지지 않도록
+    os.makedirs(db_path, exist_ok=True)
+    manifest_path = os.path.join(db_path, name)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def manifest_diff(old, new):
+    """
+    두 manifest 비교 -> (변경/신규 소스 집합, 제거할 이전 chunk_id 목록)
+    변경된 소스의 이전 청크는 모두 제거 대상 (새 청크는 변경 소스를 다시 읽어 추가)
+    """
+    changed = {src for src, entry in new.items() if old.get(src, {}).get('hash') != entry['hash']}
+    stale_ids = [cid for src, entry in old.items() if src not in new or src in changed for cid in entry['chunk_ids']]
+    return changed, stale_ids
+
+# =========================
+# 임베딩 배치 설정 (config index: 섹션으로 덮어쓰기)
+# =========================
+EMBED_WORKERS = 4             # 동시에 진행하는 임베딩 요청 수
+EMBED_BATCH_TOKENS = 100_000  # 요청 1건당 최대 토큰 수 (API 한도 300k 이내)
+EMBED_BATCH_SIZE = 1000       # 요청 1건당 최대 청크 수 (OpenAIEmbeddings 내부 chunk_size 와 동일)
+MAX_INFLIGHT_BATCHES = 8      # 임베딩 완료 후 Chroma 쓰기를 기다리는 배치까지 포함한 최대 보유 배치 수
+
+
+def token_counter(model: str):
+    """텍스트 -> 토큰 수. tiktoken 인코딩을 받을 수 없는 환경(오프라인)에서는 문자 수 기반 추정"""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        print(f"[Indexer] ⚠️ tiktoken 인코딩 로드 실패 ({type(e).__name__}) -> 문자 수로 토큰 추정")
+        return lambda text: len(text)
+
+
+def pack_batches(docs, count_tokens, max_tokens=EMBED_BATCH_TOKENS, max_size=EMBED_BATCH_SIZE):
+    """
+    Document iterable -> (docs, 토큰 수) 제너레이터
+    순서를 유지한 채 토큰 합계/청크 수 한도 안에서 배치를 채움 (한도를 넘는 단일 청크는 단독 배치)
+    """
+    current, current_tokens = [], 0
+    for doc in docs:
+        n_tokens = count_tokens(doc.page_content)
+        if current and (current_tokens + n_tokens > max_tokens or len(current) >= max_size):
+            yield current, current_tokens
+            current, current_tokens = [], 0
+        current.append(doc)
+        current_tokens += n_tokens
+    if current:
+        yield current, current_tokens
+
+
+def iter_source_groups(docs):
+    """소스별로 연속된 Document 스트림 -> (source, [docs]) (한 번에 소스 하나만 메모리에 유지)"""
+    seen = set()
+    for src, group in itertools.groupby(docs, key=lambda doc: doc.metadata['source']):
+        if src in seen:
+            raise ValueError(f"[Indexer] 소스 '{src}'의 청크가 연속되지 않습니다. 소스 단위로 정렬된 스트림이 필요합니다.")
+        seen.add(src)
+        yield src, list(group)
+
+
+def build_vector_db(docs, config, incremental=False):
+    """
+    chunk_id를 문서 ID로 벡터 저장소(vector_store.backend: chroma | faiss)에 upsert.
+    - docs: Document iterable (리스트 또는 iter_rfp_documents 제너레이터, 같은 소스의 청크는 연속)
+      스트림을 소스 단위로 읽으면서 바로 임베딩하므로, 메모리에는 소스 하나 + 진행 중인 배치만 유지
+    - 소스별 해시를 manifest(index_manifest.json)에 기록하고, 소스 하나가 끝날 때마다 저장
+    - incremental=True: 해시가 같은 소스는 건너뛰고, 삭제된 소스/사라진 청크는 DB에서 제거
+    - 배치 실패 후 재실행하면 manifest에 기록되지 않은 소스만 다시 처리 (upsert라 중복 없음)
+    - 임베딩 요청은 토큰 수 기준으로 묶어 여러 건을 동시에 보내고, Chroma 쓰기는 별도 스레드에서 겹쳐 실행
+    - faiss 백엔드는 쓰기를 모아 두었다가 스트림이 끝나면 인덱스를 한 번에 재구축하고, 그때 manifest 를 저장
+      (재구축 시 바뀌지 않은 소스는 기존 벡터 파일에서 그대로 복사하므로 임베딩 API 를 다시 호출하지 않음)
+    """
+    embeddings = get_cached_embeddings(config)
     db_path = config['path']['vector_db']
 
     # DB 구축 (Batch processing with progress bar)
     # 기존 DB가 있으면 로드, 없으면 생성
-    vectorstore = Chroma(
-        persist_directory=db_path,
-        embedding_function=embeddings
-    )
+    vectorstore = open_vector_store(config, embeddings)
+    durable = writes_are_durable(vectorstore)
     
     from tqdm import tqdm
-    
-    batch_size = 100
-    print(f"[Indexer] Total chunks to index: {len(docs)}")
-    
-    for i in tqdm(range(0, len(docs), batch_size), desc="Indexing"):
-        batch = docs[i : i + batch_size]
-        vectorstore.add_documents(batch)
-        
+
+    index_config = config.get('index', {})
+    workers = index_config.get('embed_workers') or EMBED_WORKERS
+    max_tokens = index_config.get('batch_tokens') or EMBED_BATCH_TOKENS
+    max_size = index_config.get('batch_size') or EMBED_BATCH_SIZE
+    max_inflight = max(index_config.get('max_inflight_batches') or MAX_INFLIGHT_BATCHES, workers)
+    manifest = load_manifest(db_path) if incremental else {}
+    if manifest and count_vectors(vectorstore) == 0:
+        # 백엔드를 바꾼 뒤 --incremental 로 실행한 경우: 기록은 있지만 저장소가 비어 있음 -> 전체 색인
+        print(f"[Indexer] ⚠️ manifest 는 있지만 {vector_backend(config)} 저장소가 비어 있습니다. 전체를 다시 색인합니다.")
+        manifest = {}
+    print(f"[Indexer] Vector store: {vector_backend(config)}")
+    print(f"[Indexer] Streaming chunks -> embedding (workers={workers}, max {max_tokens:,} tokens/batch, {max_inflight} batches in flight)")
+
+    seen = {"chunks": 0, "sources": []}
+    skipped = 0
+    pending_entries = {}   # source -> manifest entry (모든 청크가 쓰이면 manifest에 기록)
+    remaining = {}         # source -> 아직 Chroma에 쓰이지 않은 청크 수
+
+    def changed_docs():
+        # 변경/신규 소스의 청크만 흘려보냄 (해시가 같은 소스는 건너뜀)
+        nonlocal skipped
+        for src, group in iter_source_groups(docs):
+            seen["chunks"] += len(group)
+            seen["sources"].append(src)
+            digest = source_hash(group)
+            entry = manifest.get(src)
+            if entry and entry['hash'] == digest:
+                skipped += 1
+                continue
+
+            new_ids = [doc_id(doc) for doc in group]
+            if entry:
+                # 재청킹 등으로 사라진 청크 제거
+                stale_ids = sorted(set(entry['chunk_ids']) - set(new_ids))
+                if stale_ids:
+                    vectorstore.delete(ids=stale_ids)
+
+            pending_entries[src] = {"hash": digest, "chunk_ids": new_ids}
+            remaining[src] = len(group)
+            yield from group
+
+    # 토큰 기준 배치 -> 임베딩(동시 workers건) -> Chroma upsert(writer 스레드)
+    write_queue = queue.Queue()
+    slots = threading.BoundedSemaphore(max_inflight)  # 임베딩 중 + 쓰기 대기 배치 수 제한 (메모리 상한)
+    errors = []
+    written = {"chunks": 0, "tokens": 0, "sources": 0, "first": None}
+    progress = tqdm(desc="Indexing", unit="chunk")
+
+    def write_loop():
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            batch, n_tokens, future = item
+            try:
+                vectors = future.result()
+                upsert_vectors(
+                    vectorstore,
+                    ids=[doc_id(doc) for doc in batch],
+                    embeddings=vectors,
+                    metadatas=[doc.metadata for doc in batch],
+                    documents=[doc.page_content for doc in batch],
+                )
+            except Exception as e:
+                errors.append(e)
+                continue
+            finally:
+                slots.release()
+
+            # 소스의 마지막 청크까지 쓰였으면 manifest 기록
+            for doc in batch:
+                src = doc.metadata['source']
+                remaining[src] -= 1
+                if remaining[src] == 0:
+                    manifest[src] = pending_entries.pop(src)
+                    if durable:
+                        save_manifest(db_path, manifest)
+                    written["sources"] += 1
+            if written["first"] is None:
+                written["first"] = time.perf_counter() - t0
+            written["chunks"] += len(batch)
+            written["tokens"] += n_tokens
+            progress.update(len(batch))
+
+    t0 = time.perf_counter()
+    writer = threading.Thread(target=write_loop, daemon=True)
+    writer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batches = pack_batches(changed_docs(), token_counter(config['model']['embedding']), max_tokens, max_size)
+            for batch, n_tokens in batches:
+                slots.acquire()
+                if errors:
+                    slots.release()
+                    break
+                texts = [doc.page_content for doc in batch]
+                future = executor.submit(embeddings.embed_documents, texts)
+                future.add_done_callback(lambda f, b=batch, n=n_tokens: write_queue.put((b, n, f)))
+    finally:
+        write_queue.put(None)
+        writer.join()
+        progress.close()
+    elapsed = time.perf_counter() - t0
+
+    # 스트림을 끝까지 읽은 경우에만: 제거된 소스 삭제
+    removed = []
+    if not errors:
+        current = set(seen["sources"])
+        removed = [src for src in manifest if src not in current]
+        for src in removed:
+            stale_ids = manifest.pop(src)['chunk_ids']
+            if stale_ids:
+                vectorstore.delete(ids=stale_ids)
+            if durable:
+                save_manifest(db_path, manifest)
+
+    if not durable:
+        # 실패가 있어도 끝까지 쓰인 소스는 반영 (manifest 에 없는 소스는 재실행 시 다시 처리)
+        persist_vector_store(vectorstore)
+        save_manifest(db_path, manifest)
+
+    rate = lambda n: n / elapsed if elapsed > 0 else 0.0
+    print(f"[Indexer] Total chunks: {seen['chunks']} ({len(seen['sources'])} sources)")
+    print(f"[Indexer] Sources: updated {written['sources']}, unchanged {skipped}, removed {len(removed)} / Chunks upserted: {written['chunks']}")
+    if written["chunks"]:
+        print(f"[Indexer] Throughput: {elapsed:.1f}s (first write {written['first']:.1f}s) | "
+              f"{rate(written['chunks']):,.1f} chunks/sec | {rate(written['tokens']):,.0f} tokens/sec")
+    print(f"[Indexer] Embedding cache: {embeddings.stats()}")
+    if errors:
+        print(f"[Indexer] ❌ {len(errors)} batch(es) failed. 재실행하면 manifest에 없는 소스만 다시 처리합니다.")
+        raise errors[0]
     return vectorstore
 
 def load_vector_db(config):
     embeddings = OpenAIEmbeddings(model=config['model']['embedding'])
-    db_path = config['path']['vector_db']
-    
-    if not os.path.exists(db_path):
-        return None
-        
-    vectorstore = Chroma(
-        persist_directory=db_path,
-        embedding_function=embeddings
-    )
-    return vectorstore
\ No newline at end of file
+    return load_vector_store(config, embeddings)
\ No newline at end of file
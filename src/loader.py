@@ -1,114 +1,192 @@
 import os
 import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from langchain_core.documents import Document
 
-def load_rfp_documents(config: dict):
+from src.currency import parse_krw_series
+from src.metadata_index import epoch_series
+from src.project_table import ProjectTable, assign_project_ids, compact_metadata
+
+LOAD_WORKERS = 8   # JSONL 동시 읽기 스레드 수 (파일 I/O 위주)
+CHUNK_SECTION_FIELDS = ("section_title", "clause_key", "page_start", "page_end")
+
+# --- [안전한 타입 변환 로직 (컬럼 단위)] ---
+def str_column(df: pd.DataFrame, name: str, default="") -> pd.Series:
+    """str(row.get(name, default)) 와 같은 결과 (결측값은 'nan')"""
+    if name not in df:
+        return pd.Series([str(default)] * len(df), index=df.index, dtype=object)
+    return df[name].astype(str).fillna("nan").astype(object)
+
+
+def build_base_metadata(df: pd.DataFrame) -> pd.DataFrame:
+    """CSV 전체를 컬럼 단위로 정규화 -> 문서별 base metadata"""
+    def raw_column(name, default="Unknown"):
+        return df[name] if name in df else pd.Series([default] * len(df), index=df.index)
+
+    # 공고 차수: 1.0 -> 1 로 변환 (변환 불가 시 0)
+    round_col = raw_column('공고 차수', 0)
+    rounds = pd.to_numeric(round_col, errors="coerce").fillna(0).astype(int)
+
+    return pd.DataFrame({
+        "source": df['파일명'].astype(str),
+        "announcement_id": str_column(df, '공고 번호', "Unknown"),
+        "round": rounds,  # [추가] 공고 차수
+        "project_name": raw_column('사업명'),
+        "organization": raw_column('발주 기관'),
+        "budget": parse_krw_series(raw_column('사업 금액', 0)).fillna(0.0),  # 해석 불가 금액은 0.0
+        "pub_date": str_column(df, '공개 일자'),      # [추가] 공개 일자
+        "start_date": str_column(df, '입찰 참여 시작일'), # [추가] 시작일
+        "deadline": str_column(df, '입찰 참여 마감일'),
+        # 날짜 필터($gte/$lte)용 숫자 필드 (epoch 초, 결측 0)
+        "pub_date_ts": epoch_series(raw_column('공개 일자', "")),
+        "deadline_ts": epoch_series(raw_column('입찰 참여 마감일', "")),
+        "summary": str_column(df, '사업 요약'),
+    }, index=df.index)
+
+
+def read_clean_jsonl(json_path: str):
+    """_clean.jsonl -> 레코드 리스트. 파일이 없으면 None, 파싱 실패 시 Exception 객체"""
+    if not os.path.exists(json_path):
+        return None
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    except Exception as e:
+        return e
+
+
+def iter_clean_jsonl(json_paths, workers: int):
+    """
+    JSONL 파일을 workers개 앞서 읽으면서 순서대로 read_clean_jsonl 결과를 반환.
+    메모리에 동시에 올라오는 파일 수는 workers + 1 개 이하.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for json_path in json_paths:
+            window.append(executor.submit(read_clean_jsonl, json_path))
+            if len(window) > workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def iter_rfp_documents(config: dict, projects: ProjectTable = None, sources=None):
+    """
+    청크 Document 제너레이터 (CSV 행 순서, 파일 하나를 읽을 때마다 해당 청크를 바로 반환).
+    같은 소스의 청크는 연속으로 나오며, projects 가 주어지면 프로젝트 메타데이터를 채움.
+    청크 메타데이터에는 project_id + 필터 필드만 두고, 프로젝트 단위 정보(사업명/요약/일정)는 ProjectTable에 한 번만 보관.
+    sources: 주어지면 해당 소스(CSV 파일명)만 읽음 (증분 색인에서 바뀐 소스만 다시 읽을 때)
+    _clean.jsonl 이 없는 소스는 청크를 내지 않음 (삭제된 RFP -> 증분 색인 시 벡터 DB/사이드 인덱스에서 제거)
+    """
     csv_path = config['path']['csv_file']
     # Change: Load from Clean JSON folder
-    json_folder = config['path']['clean_json'] 
-    
+    json_folder = config['path']['clean_json']
+    workers = config.get('process', {}).get('load_workers') or LOAD_WORKERS
+    timings = {}
+
+    # 1. CSV
+    t0 = time.perf_counter()
     print(f"[Loader] 메타데이터 로드: {csv_path}")
     df = pd.read_csv(csv_path)
-    
-    all_docs = []
+    timings['csv'] = time.perf_counter() - t0
+
+    # 2. 메타데이터 정규화 (컬럼 단위)
+    t0 = time.perf_counter()
+    base_names = df['파일명'].astype(str).map(lambda name: os.path.splitext(name)[0]).tolist()
+    # Change: File naming convention uses _clean.jsonl
+    json_paths = [os.path.join(json_folder, f"{base_name}_clean.jsonl") for base_name in base_names]
+    base_metadata_df = build_base_metadata(df)
+    base_metadata_df.insert(0, "project_id", assign_project_ids(base_metadata_df['announcement_id'].tolist(), base_names))
+    project_rows = base_metadata_df.to_dict("records")
+    fallback_texts = str_column(df, '텍스트').tolist()
+    if sources is not None:
+        # project_id 는 CSV 전체 기준(공고 번호 중복 여부)으로 계산한 뒤 선택
+        selected = [i for i, source in enumerate(base_metadata_df['source'].tolist()) if source in sources]
+        base_names, json_paths, project_rows, fallback_texts = (
+            [values[i] for i in selected] for values in (base_names, json_paths, project_rows, fallback_texts)
+        )
+    timings['metadata'] = time.perf_counter() - t0
+
+    # 3. JSONL 미리 읽기(workers개) -> 파일 단위 Document 생성 후 바로 반환
+    print(f"[Loader] JSON 데이터 스트리밍 시작... (대상 폴더: {json_folder}, workers={workers})")
+    timings['jsonl'] = 0.0
+    timings['documents'] = 0.0
     success_count = 0
     fallback_count = 0
+    missing_count = 0
+    chunk_count = 0
+    records_iter = iter_clean_jsonl(json_paths, workers)
+
+    for base_name, json_path, project, fallback_text in zip(base_names, json_paths, project_rows, fallback_texts):
+        t0 = time.perf_counter()
+        records = next(records_iter)
+        timings['jsonl'] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        base_metadata = compact_metadata(project)
+        file_docs = []
+
+        if records is None:
+            # 정제 파일 없음 -> 색인하지 않음 (CSV 텍스트로 대체하면 삭제가 반영되지 않음)
+            missing_count += 1
+        elif isinstance(records, Exception):
+            print(f"[Warning] 파싱 실패 ({os.path.basename(json_path)}): {records}")
+
+        # 1) JSONL 청크
+        if isinstance(records, list):
+            # [Context Injection] Prepend Organization and Project Name
+            context_header = f"[{project.get('organization', 'Unknown')}] {project.get('project_name', 'Unknown')}\n"
+            for page_item in records:
+                content = page_item.get('content', '')
+                page_num = page_item.get('page', 0)
+
+                if not content.strip(): continue
+
+                chunk_metadata = page_item.get('metadata', {})
+                page_metadata = base_metadata.copy()
+                page_metadata['page'] = page_num
+                # 안정적인 청크 ID (벡터 DB 문서 ID로 사용 -> 증분 upsert/delete)
+                page_metadata['chunk_id'] = chunk_metadata.get('chunk_id') or f"{base_name}__p{page_num:04d}"
+                # chunker 섹션/조항 정보 (Chroma 메타데이터는 None 불가 -> "")
+                for key in CHUNK_SECTION_FIELDS:
+                    value = chunk_metadata.get(key)
+                    page_metadata[key] = "" if value is None else value
+
+                file_docs.append(Document(page_content=context_header + content, metadata=page_metadata))
+            success_count += 1
 
-    print(f"[Loader] JSON 데이터 로딩 시작... (대상 폴더: {json_folder})")
-
-    for _, row in df.iterrows():
-        original_name = str(row['파일명'])
-        base_name = os.path.splitext(original_name)[0]
-        # Change: File naming convention uses _clean.jsonl
-        json_file_name = f"{base_name}_clean.jsonl"
-        json_path = os.path.join(json_folder, json_file_name)
-        
-        # --- [안전한 타입 변환 로직] ---
-        def parse_budget(value):
-            if pd.isna(value) or value == '': return 0.0
-            s = str(value).replace(',', '').strip()
-            if not s: return 0.0
-            
-            try:
-                # 단순 숫자
-                return float(s)
-            except ValueError:
-                # "3억원", "3.5억원" 처리
-                if '억원' in s:
-                    try:
-                        val = float(s.replace('억원', ''))
-                        return val * 100_000_000
-                    except: pass
-                # "3000만원" 처리
-                if '천만원' in s:  # "3천만원" -> 30,000,000
-                    try: 
-                        val = float(s.replace('천만원', ''))
-                        return val * 10_000_000
-                    except: pass
-                if '만원' in s:    # "3000만원" -> 30,000,000 (위에서 걸러지지 않은 경우)
-                    try: 
-                        val = float(s.replace('만원', ''))
-                        return val * 10_000
-                    except: pass
-                    
-                return 0.0
-
-        budget_val = parse_budget(row.get('사업 금액', 0))
-
-        # 공고 차수: 1.0 -> 1 로 변환
-        try:
-            round_val = int(float(row.get('공고 차수', 0)))
-        except:
-            round_val = 0
-            
-        base_metadata = {
-            "source": original_name,
-            "announcement_id": str(row.get('공고 번호', "Unknown")),
-            "round": round_val,  # [추가] 공고 차수
-            "project_name": row.get('사업명', "Unknown"),
-            "organization": row.get('발주 기관', "Unknown"),
-            "budget": budget_val,
-            "pub_date": str(row.get('공개 일자', "")),      # [추가] 공개 일자
-            "start_date": str(row.get('입찰 참여 시작일', "")), # [추가] 시작일
-            "deadline": str(row.get('입찰 참여 마감일', "")),
-            "summary": str(row.get('사업 요약', "")),
-        }
-        # -----------------------------
-
-        # 1. JSONL 로드
-        loaded = False
-        if os.path.exists(json_path):
-            try:
-                # Change: Read line by line for JSONL
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        page_item = json.loads(line)
-                        content = page_item.get('content', '')
-                        page_num = page_item.get('page', 0)
-                        
-                        if not content.strip(): continue
-                            
-                        page_metadata = base_metadata.copy()
-                        page_metadata['page'] = page_num
-                        
-                        # [Context Injection] Prepend Organization and Project Name
-                        context_header = f"[{page_metadata.get('organization', 'Unknown')}] {page_metadata.get('project_name', 'Unknown')}\n"
-                        full_content = context_header + content
-                        
-                        all_docs.append(Document(page_content=full_content, metadata=page_metadata))
-                
-                success_count += 1
-                loaded = True
-            except Exception as e:
-                print(f"[Warning] 파싱 실패 ({json_file_name}): {e}")
-
-        # 2. Fallback
-        if not loaded:
-            content = str(row.get('텍스트', ''))
-            if content.strip():
-                all_docs.append(Document(page_content=content, metadata=base_metadata))
-                fallback_count += 1
-
-    print(f"[Loader] 완료: 성공 {success_count}건, CSV 대체 {fallback_count}건")
-    return all_docs
\ No newline at end of file
+        # 2) Fallback (정제 파일을 읽지 못한 경우)
+        elif records is not None and fallback_text.strip():
+            fallback_metadata = base_metadata.copy()
+            fallback_metadata['chunk_id'] = f"{base_name}__csv"
+            file_docs.append(Document(page_content=fallback_text, metadata=fallback_metadata))
+            fallback_count += 1
+
+        # 청크가 있는 소스의 사업만 프로젝트 테이블에 등록
+        if projects is not None and file_docs:
+            projects.add(project['project_id'], project)
+        chunk_count += len(file_docs)
+        timings['documents'] += time.perf_counter() - t0
+        yield from file_docs
+
+    # CSV 행(파일) 수와 사업 수는 다름 (재공고 등은 같은 project_id 로 묶임)
+    n_projects = len(projects) if projects is not None else len({project['project_id'] for project in project_rows})
+    print(f"[Loader] 완료: 성공 {success_count}건, CSV 대체 {fallback_count}건, 정제 파일 없음 {missing_count}건 "
+          f"({chunk_count} chunks, {len(base_names)} files, {n_projects} projects)")
+    print("[Loader] 단계별 소요: " + " | ".join(f"{stage} {secs:.2f}s" for stage, secs in timings.items()))
+
+
+def load_rfp_corpus(config: dict):
+    """(청크 Document 리스트, ProjectTable) 반환 - iter_rfp_documents 를 한 번에 모은 것"""
+    projects = ProjectTable()
+    docs = list(iter_rfp_documents(config, projects))
+    return docs, projects
+
+
+def load_rfp_documents(config: dict):
+    docs, _ = load_rfp_corpus(config)
+    return docs
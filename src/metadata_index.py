@@ -0,0 +1,242 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# 날짜 -> epoch 초 (Chroma $gte/$lte 는 숫자 필드에서만 동작)
+#   "2024-10-15 17:00:00" -> 1729011600, "2024-10-15" -> 1728950400 / 결측·해석 불가 -> 0 (색인), None (질의)
+# =========================
+DATE_FIELDS = {"pub_date": "pub_date_ts", "deadline": "deadline_ts"}
+MISSING_TS = 0
+
+
+def epoch_series(values: pd.Series) -> pd.Series:
+    """날짜 문자열 컬럼 -> epoch 초 int64 Series (타임존 없는 현지 시각 그대로 환산)"""
+    dt = pd.to_datetime(values.astype(str), errors="coerce", format="mixed")
+    secs = (dt - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    return secs.fillna(MISSING_TS).astype("int64")
+
+
+def to_epoch(value) -> Optional[int]:
+    """질의 필터용 단일 값 변환. 해석할 수 없으면 None (MISSING_TS 로 비교하면 모든 문서가 통과)"""
+    dt = pd.to_datetime(str(value), errors="coerce", format="mixed")
+    if pd.isna(dt):
+        return None
+    return int((dt - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+
+# =========================
+# 컬럼형 메타데이터 인덱스 (청크 단위 numpy 배열)
+# =========================
+NUMERIC_FIELDS = {"budget": np.float64, "round": np.int32, "pub_date_ts": np.int64, "deadline_ts": np.int64}
+CATEGORY_FIELDS = ("organization", "project_id")   # 문자열 -> 정수 코드 (organization id)
+
+ALLOW_LIST_MAX = 2000        # 허용 ID 목록을 벡터 검색에 넘길 최대 청크 수
+POST_FILTER_MIN_RATIO = 0.2  # 선택도가 이 이상이면 필터 없이 검색 후 사후 필터
+POST_FILTER_MAX_FETCH = 1000 # 사후 필터 시 벡터 검색 최대 후보 수
+PENDING_MAX = 10000          # add() 로 모은 메타데이터 dict 를 이 개수마다 컬럼 배열로 변환 (색인 중 메모리 상한)
+
+
+@dataclass
+class FilterPlan:
+    """
+    mode
+    - none: 필터 없음
+    - empty: 조건을 만족하는 청크 없음 (검색 생략)
+    - allow_list: 통과 청크 ID 목록을 벡터 검색에 직접 전달 (선택도 낮음)
+    - post_filter: 필터 없이 fetch_k 만큼 검색 후 마스크로 거름 (선택도 높음)
+    - chroma: 인덱스가 처리하지 못하는 조건 -> where 를 그대로 Chroma 에 전달
+    """
+    mode: str
+    fetch_k: int
+    ids: List[str] = field(default_factory=list)
+    mask: Optional[np.ndarray] = None
+    matches: int = 0
+    selectivity: float = 1.0
+    filter_ms: float = 0.0
+
+
+class MetadataIndex:
+    """chunk_id 순서의 numpy 컬럼 (budget, 날짜 epoch, 공고 차수, 기관/프로젝트 코드)"""
+
+    def __init__(self, chunk_ids=None, columns: dict = None, categories: dict = None):
+        self._pending = []
+        self._set_arrays(chunk_ids if chunk_ids is not None else [], columns or {}, categories or {})
+
+    def _set_arrays(self, chunk_ids, columns: dict, categories: dict):
+        self.chunk_ids = np.asarray(chunk_ids, dtype=str)
+        self.columns = columns
+        self.categories = categories   # field -> 코드 순서의 라벨 배열
+        self._codes = {name: {label: code for code, label in enumerate(labels.tolist())} for name, labels in categories.items()}
+        self._row_of = None
+
+    def __len__(self):
+        return len(self.chunk_ids) + len(self._pending)
+
+    def add(self, doc):
+        self._pending.append(doc.metadata)
+        if len(self._pending) >= PENDING_MAX:
+            self._freeze()
+
+    def _freeze(self):
+        """대기 중인 메타데이터 dict -> 기존 컬럼 배열 뒤에 이어 붙임 (문자열 필드는 기존 코드표를 이어서 사용)"""
+        if not self._pending:
+            return
+        rows = self._pending
+        self._pending = []
+        n_old = len(self.chunk_ids)
+        chunk_ids = np.concatenate([self.chunk_ids, np.asarray([m["chunk_id"] for m in rows], dtype=str)])
+
+        columns = {}
+        for name, dtype in NUMERIC_FIELDS.items():
+            old = self.columns.get(name, np.zeros(n_old, dtype=dtype))
+            columns[name] = np.concatenate([old.astype(dtype), np.array([m.get(name) or 0 for m in rows], dtype=dtype)])
+        categories = {}
+        for name in CATEGORY_FIELDS:
+            lookup = dict(self._codes.get(name, {}))
+            labels = self.categories[name].tolist() if name in self.categories else []
+            codes = np.empty(len(rows), dtype=np.int32)
+            for i, m in enumerate(rows):
+                label = str(m.get(name, ""))
+                code = lookup.get(label)
+                if code is None:
+                    code = lookup[label] = len(labels)
+                    labels.append(label)
+                codes[i] = code
+            old = self.columns.get(name, np.full(n_old, -1, dtype=np.int32))
+            columns[name] = np.concatenate([old.astype(np.int32), codes])
+            categories[name] = np.asarray(labels, dtype=str)
+        self._set_arrays(chunk_ids, columns, categories)
+
+    def remove(self, chunk_ids) -> np.ndarray:
+        """chunk_id 행 삭제 (증분 색인) -> 삭제 전 행 순서의 남은 행 마스크"""
+        self._freeze()
+        keep = ~np.isin(self.chunk_ids, np.asarray(list(chunk_ids), dtype=str))
+        self._set_arrays(self.chunk_ids[keep], {name: col[keep] for name, col in self.columns.items()}, self.categories)
+        return keep
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        self._freeze()
+        if self._row_of is None:
+            self._row_of = {cid: i for i, cid in enumerate(self.chunk_ids.tolist())}
+        return self._row_of.get(chunk_id)
+
+    def _compare(self, name: str, op: str, target) -> Optional[np.ndarray]:
+        col = self.columns.get(name)
+        if col is None:
+            return None
+        if name in self._codes:
+            # 문자열 필드: 라벨 -> 코드 (없는 라벨은 -1 -> 아무것도 일치하지 않음)
+            if op not in ("$eq", "$ne", "$in", "$nin"):
+                return None
+            lookup = self._codes[name]
+            target = [lookup.get(t, -1) for t in target] if op in ("$in", "$nin") else lookup.get(target, -1)
+
+        if op == "$eq": return col == target
+        if op == "$ne": return col != target
+        if op == "$gt": return col > target
+        if op == "$gte": return col >= target
+        if op == "$lt": return col < target
+        if op == "$lte": return col <= target
+        if op == "$in": return np.isin(col, target)
+        if op == "$nin": return ~np.isin(col, target)
+        return None
+
+    def mask(self, where) -> Optional[np.ndarray]:
+        """Chroma where 필터 -> bool 마스크. 인덱스에 없는 필드/연산자가 있으면 None"""
+        self._freeze()
+        if "$and" in where or "$or" in where:
+            parts = [self.mask(w) for w in where.get("$and", where.get("$or"))]
+            if any(part is None for part in parts):
+                return None
+            return np.logical_and.reduce(parts) if "$and" in where else np.logical_or.reduce(parts)
+
+        result = np.ones(len(self.chunk_ids), dtype=bool)
+        for name, cond in where.items():
+            if not isinstance(cond, dict):
+                cond = {"$eq": cond}
+            for op, target in cond.items():
+                part = self._compare(name, op, target)
+                if part is None:
+                    return None
+                result &= part
+        return result
+
+    def plan(self, where, k: int, config: dict = None) -> FilterPlan:
+        """선택도 추정 -> 허용 ID 목록 전달 / 사후 필터 / Chroma where 중 선택"""
+        if not where:
+            return FilterPlan(mode="none", fetch_k=k)
+
+        cfg = (config or {}).get('process', {})
+        t0 = time.perf_counter()
+        mask = self.mask(where)
+        if mask is None:
+            return FilterPlan(mode="chroma", fetch_k=k, filter_ms=(time.perf_counter() - t0) * 1000)
+
+        matches = int(mask.sum())
+        selectivity = matches / len(mask) if len(mask) else 0.0
+        plan = FilterPlan(mode="empty", fetch_k=0, mask=mask, matches=matches, selectivity=selectivity)
+        if matches == 0:
+            pass
+        elif selectivity >= cfg.get('post_filter_min_ratio', POST_FILTER_MIN_RATIO):
+            # 대부분 통과 -> 필터 없이 (k / 선택도) 만큼 넉넉히 가져와 사후 필터
+            plan.mode = "post_filter"
+            plan.fetch_k = min(int(np.ceil(k / selectivity * 1.2)), cfg.get('post_filter_max_fetch', POST_FILTER_MAX_FETCH))
+        elif matches <= cfg.get('allow_list_max', ALLOW_LIST_MAX):
+            plan.mode = "allow_list"
+            plan.fetch_k = min(k, matches)
+            plan.ids = self.chunk_ids[mask].tolist()
+        else:
+            plan.mode = "chroma"
+            plan.fetch_k = k
+        plan.filter_ms = (time.perf_counter() - t0) * 1000
+        return plan
+
+    def distinct(self, name: str, where) -> Optional[set]:
+        """where 를 통과한 청크들의 문자열 필드 값 집합 (예: 필터 조건을 만족하는 project_id). 처리 불가 시 None"""
+        self._freeze()
+        if name not in self.categories:
+            return None
+        mask = self.mask(where) if where else np.ones(len(self.chunk_ids), dtype=bool)
+        if mask is None:
+            return None
+        return set(self.categories[name][np.unique(self.columns[name][mask])].tolist())
+
+    def keep(self, plan: FilterPlan, docs_with_scores):
+        """사후 필터: 마스크를 통과한 (doc, score) 만 남김"""
+        kept = []
+        for doc, score in docs_with_scores:
+            row = self.row_of(doc.metadata.get("chunk_id"))
+            if row is not None and plan.mask[row]:
+                kept.append((doc, score))
+        return kept
+
+    def save(self, path: str):
+        self._freeze()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {"chunk_ids": self.chunk_ids}
+        arrays.update({f"col__{name}": col for name, col in self.columns.items()})
+        arrays.update({f"cat__{name}": labels for name, labels in self.categories.items()})
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+
+def save_metadata_index(index: MetadataIndex, config):
+    path = config['path']['metadata_index']
+    index.save(path)
+    print(f"[Metadata Index] saved: {path} ({len(index)} chunks, fields: {', '.join(index.columns)})")
+
+
+def load_metadata_index(config):
+    path = config.get('path', {}).get('metadata_index')
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        columns = {key[len("col__"):]: data[key] for key in data.files if key.startswith("col__")}
+        categories = {key[len("cat__"):]: data[key] for key in data.files if key.startswith("cat__")}
+        return MetadataIndex(data["chunk_ids"], columns, categories)
@@ -1,8 +1,13 @@
+import os
 import json
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
+
+from src.pipeline.page_store import open_pages, list_parsed_files, parsed_stem, page_number
 
 # =========================
 # 설정(필요시 조정)
@@ -36,7 +41,7 @@ def is_toc_chunk(text: str) -> bool:
     if any("목 차" in l or "목차" in l for l in lines[:3]): return True
 
     dot_lines = sum(1 for l in lines if "·" in l)
-    digit_lines = sum(1 for l in lines if any(c.isdigit() for c in l))
+    digit_lines = sum(1 for l in lines if any(map(str.isdigit, l)))
     long_text_lines = sum(1 for l in lines if len(l) >= 25 and "·" not in l)
 
     if dot_lines / len(lines) > DOT_RATIO_TH and long_text_lines < 3: return True
@@ -87,6 +92,17 @@ NUMBERED_RE = re.compile(
 )
 APPENDIX_RE = re.compile(r"^(?P<key>(?:부록|별첨|첨부|붙임))\b.*$")
 
+# 위 4개 패턴을 우선순위(섹션 > 조항 > 부록 > 번호) 순서의 alternation 하나로 결합
+# -> 라인당 정규식 1회 실행으로 detect_boundary와 동일한 결과
+BOUNDARY_RE = re.compile(
+    r"^(?:"
+    r"(?:(?:#+\s*)?(?P<title>(" + "|".join(SECTION_TITLE_PATTERNS) + r"))\s*.*$)"
+    r"|(?:(?P<clause>제\s*\d+\s*조)\b.*$)"
+    r"|(?:(?P<appendix>(?:부록|별첨|첨부|붙임))\b.*$)"
+    r"|(?:(?:#+\s*)?(?P<numbered>(?:(?:\d+(?:\.\d+)+[.)]?)|(?:\(?\d+\)?[.)])|(?:\d+\s*-\s*\d+)|[①②③④⑤⑥⑦⑧⑨⑩]))\s+.*$)"
+    r")"
+)
+
 @dataclass
 class Page:
     page: int
@@ -103,19 +119,14 @@ class Chunk:
     page_end: int
     text: str # content
 
-def load_pages(parsed_json_path: Path) -> List[Page]:
-    with parsed_json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    pages: List[Page] = []
-    for item in data:
-        # page: global page (top-level) 를 우선 사용
-        p = int(item.get("page") or item.get("metadata", {}).get("global_page") or 0)
-        content = item.get("content") or ""
-        md = item.get("metadata") or {}
-        pages.append(Page(page=p, content=content, metadata=md))
-    pages.sort(key=lambda x: x.page)
-    return pages
+def to_page(item: Dict) -> Page:
+    # page: global page (top-level) 를 우선 사용
+    return Page(page=page_number(item), content=item.get("content") or "", metadata=item.get("metadata") or {})
+
+def load_pages(parsed_path: Path) -> List[Page]:
+    """파싱 결과(_parsed.pages / 기존 _parsed.json) -> page 순 정렬된 Page 리스트"""
+    with open_pages(parsed_path) as reader:
+        return [to_page(item) for item in reader.iter_pages()]
 
 def normalize_line(line: str) -> str:
     return line.rstrip()
@@ -141,6 +152,18 @@ def detect_boundary(line: str) -> Tuple[Optional[str], Optional[str]]:
 
     return None, None
 
+def detect_boundary_fast(line: str) -> Tuple[Optional[str], Optional[str]]:
+    """detect_boundary와 동일한 결과를 결합 정규식 1회로 계산"""
+    l = line.strip()
+    if not l: return None, None
+
+    m = BOUNDARY_RE.match(l)
+    if not m: return None, None
+    if m.group("title") is not None: return m.group("title"), None
+    if m.group("clause") is not None: return None, m.group("clause").replace(" ", "")
+    if m.group("appendix") is not None: return None, m.group("appendix")
+    return None, m.group("numbered").replace(" ", "")
+
 def soft_split_text(text: str, max_chars: int = SOFT_SPLIT_MAX_CHARS) -> List[str]:
     if len(text) <= max_chars:
         return [text]
@@ -179,57 +202,82 @@ def soft_split_text(text: str, max_chars: int = SOFT_SPLIT_MAX_CHARS) -> List[st
     flush()
     return out
 
-def split_pages_into_chunks(pages: List[Page], source_pdf: str) -> List[Chunk]:
-    chunks: List[Chunk] = []
+def _soft_split_chunk(c: Chunk) -> Iterator[Chunk]:
+    """Final Size Check & Soft Split"""
+    if len(c.text) <= MAX_CHARS_PER_CHUNK:
+        yield c
+        return
+
+    parts = soft_split_text(c.text, max_chars=SOFT_SPLIT_MAX_CHARS)
+    for idx, part in enumerate(parts, start=1):
+        cid = f"{c.chunk_id}__s{idx:02d}"
+        # content key for loader
+        yield Chunk(
+            source_pdf=c.source_pdf,
+            chunk_id=cid,
+            section_title=c.section_title,
+            clause_key=c.clause_key,
+            page_start=c.page_start,
+            page_end=c.page_end,
+            text=part
+        )
+
+def iter_chunks(pages: Iterable[Page], source_pdf: str) -> Iterator[Chunk]:
+    """
+    스트리밍 청킹 엔진. 완성된 Chunk를 순서대로 yield.
+    - 버퍼 길이는 누적 카운터로 관리 (라인마다 전체 버퍼 길이를 다시 합산하지 않음)
+    - 경계 판별은 결합 정규식 1회 (detect_boundary_fast)
+    - 짧은 조각은 직전 chunk에 합쳐질 수 있으므로 마지막 chunk 하나만 보류했다가 다음 chunk가 생기면 내보냄
+    """
+    stem = Path(source_pdf).stem
 
     current_section: Optional[str] = None
     current_clause: Optional[str] = None
 
     buf_lines: List[str] = []
+    buf_len = 0
     buf_page_start: Optional[int] = None
     buf_page_end: Optional[int] = None
 
-    def start_buffer(page_no: int):
-        nonlocal buf_page_start, buf_page_end
-        if buf_page_start is None:
-            buf_page_start = page_no
-        buf_page_end = page_no
+    pending: Optional[Chunk] = None   # 아직 병합 가능성이 있는 마지막 chunk
+    n_chunks = 0                      # soft split 이전 chunk 수 (chunk_id 번호)
+
+    def flush_buffer(force: bool = False) -> Optional[Chunk]:
+        """버퍼를 chunk로 만들고, 확정된 이전 chunk(있으면)를 반환"""
+        nonlocal buf_lines, buf_len, buf_page_start, buf_page_end, pending, n_chunks
 
-    def flush_buffer(force: bool = False):
-        nonlocal buf_lines, buf_page_start, buf_page_end, chunks
-        
         # 🟢 Apply cleaning before making chunk
         raw_text = "\n".join(buf_lines).strip()
         cleaned_text = clean_text_block(raw_text) # can be None if empty/garbage
-        
-        if not cleaned_text:
-            # Reset buffer only
-            buf_lines = []
-            buf_page_start = None
-            buf_page_end = None
-            return
-
-        # 너무 짧으면 이전 chunk에 합치기(가능할 때)
-        if len(cleaned_text) < MIN_CHARS_PER_CHUNK and chunks and not force:
-            prev = chunks[-1]
-            prev.text = (prev.text.rstrip() + "\n\n" + cleaned_text).strip()
-            prev.page_end = max(prev.page_end, buf_page_end or prev.page_end)
-        else:
-            chunk_id = f"{Path(source_pdf).stem}__p{buf_page_start:04d}-{buf_page_end:04d}__{len(chunks)+1:05d}"
-            chunks.append(Chunk(
-                source_pdf=source_pdf,
-                chunk_id=chunk_id,
-                section_title=current_section,
-                clause_key=current_clause,
-                page_start=buf_page_start or 0,
-                page_end=buf_page_end or (buf_page_start or 0),
-                text=cleaned_text # Use cleaned Text
-            ))
+        page_start, page_end = buf_page_start, buf_page_end
 
+        # Reset buffer
         buf_lines = []
+        buf_len = 0
         buf_page_start = None
         buf_page_end = None
 
+        if not cleaned_text:
+            return None
+
+        # 너무 짧으면 이전 chunk에 합치기(가능할 때)
+        if len(cleaned_text) < MIN_CHARS_PER_CHUNK and pending is not None and not force:
+            pending.text = (pending.text.rstrip() + "\n\n" + cleaned_text).strip()
+            pending.page_end = max(pending.page_end, page_end or pending.page_end)
+            return None
+
+        n_chunks += 1
+        done, pending = pending, Chunk(
+            source_pdf=source_pdf,
+            chunk_id=f"{stem}__p{page_start:04d}-{page_end:04d}__{n_chunks:05d}",
+            section_title=current_section,
+            clause_key=current_clause,
+            page_start=page_start or 0,
+            page_end=page_end or (page_start or 0),
+            text=cleaned_text # Use cleaned Text
+        )
+        return done
+
     for page in pages:
         page_no = page.page
         content = page.content or ""
@@ -239,7 +287,7 @@ def split_pages_into_chunks(pages: List[Page], source_pdf: str) -> List[Chunk]:
         if not any(l.strip() for l in lines): continue
 
         for line in lines:
-            sec, clause = detect_boundary(line)
+            sec, clause = detect_boundary_fast(line)
 
             if sec or clause:
                 in_table_context = (
@@ -248,7 +296,8 @@ def split_pages_into_chunks(pages: List[Page], source_pdf: str) -> List[Chunk]:
                     and is_markdown_table_line(buf_lines[-2])
                 )
                 if not in_table_context:
-                    flush_buffer()
+                    done = flush_buffer()
+                    if done: yield from _soft_split_chunk(done)
 
                 if sec:
                     current_section = sec
@@ -256,83 +305,107 @@ def split_pages_into_chunks(pages: List[Page], source_pdf: str) -> List[Chunk]:
                 if clause:
                     current_clause = clause
 
-            start_buffer(page_no)
+            if buf_page_start is None:
+                buf_page_start = page_no
+            buf_page_end = page_no
             buf_lines.append(line)
+            buf_len += len(line)
 
-            if sum(len(x) for x in buf_lines) > MAX_CHARS_PER_CHUNK:
-                flush_buffer(force=True)
+            if buf_len > MAX_CHARS_PER_CHUNK:
+                done = flush_buffer(force=True)
+                if done: yield from _soft_split_chunk(done)
 
-    flush_buffer(force=True)
-    
-    # Final Size Check & Soft Split
-    final_chunks: List[Chunk] = []
-    for c in chunks:
-        if len(c.text) <= MAX_CHARS_PER_CHUNK:
-            final_chunks.append(c)
-        else:
-            parts = soft_split_text(c.text, max_chars=SOFT_SPLIT_MAX_CHARS)
-            for idx, part in enumerate(parts, start=1):
-                cid = f"{c.chunk_id}__s{idx:02d}"
-                # content key for loader
-                final_chunks.append(Chunk(
-                    source_pdf=c.source_pdf,
-                    chunk_id=cid,
-                    section_title=c.section_title,
-                    clause_key=c.clause_key,
-                    page_start=c.page_start,
-                    page_end=c.page_end,
-                    text=part
-                ))
-    return final_chunks
+    done = flush_buffer(force=True)
+    if done: yield from _soft_split_chunk(done)
+    if pending is not None:
+        yield from _soft_split_chunk(pending)
+
+def split_pages_into_chunks(pages: List[Page], source_pdf: str) -> List[Chunk]:
+    return list(iter_chunks(pages, source_pdf))
+
+def chunk_to_record(c: Chunk) -> Dict:
+    # Map Chunk -> Loader Compatible Dict
+    return {
+        "content": c.text,
+        "page": c.page_start, # Representative page
+        "metadata": {
+            "source_pdf": c.source_pdf,
+            "chunk_id": c.chunk_id,
+            "section_title": c.section_title,
+            "clause_key": c.clause_key,
+            "page_start": c.page_start,
+            "page_end": c.page_end
+        }
+    }
 
 # =========================
 # Main Execution
 # =========================
-def process_file(parsed_json_path: Path, out_path: Path):
+def process_file(parsed_json_path: Path, out_path: Path) -> Tuple[str, int, float]:
+    """파일 하나를 청킹하여 저장. (파일명, 청크 수, 소요 시간) 반환"""
+    t0 = time.perf_counter()
     try:
-        pages = load_pages(parsed_json_path)
+        reader = open_pages(parsed_json_path)
     except Exception as e:
         print(f"Error loading {parsed_json_path}: {e}")
-        return
-
-    # source_pdf 추론
-    source_pdf = None
-    if pages:
-        source_pdf = pages[0].metadata.get("source_pdf")
-    source_pdf = source_pdf or (parsed_json_path.stem.replace("_parsed", "") + ".pdf")
-
-    chunks = split_pages_into_chunks(pages, source_pdf=source_pdf)
-    
-    # Save as JSONL
-    # Loader expects: content, page, metadata
-    with out_path.open("w", encoding="utf-8") as f:
-        for c in chunks:
-            # Map Chunk -> Loader Compatible Dict
-            out_obj = {
-                "content": c.text,
-                "page": c.page_start, # Representative page
-                "metadata": {
-                    "source_pdf": c.source_pdf,
-                    "chunk_id": c.chunk_id,
-                    "section_title": c.section_title,
-                    "clause_key": c.clause_key,
-                    "page_start": c.page_start,
-                    "page_end": c.page_end
-                }
-            }
-            f.write(json.dumps(out_obj, ensure_ascii=False) + "\n")
+        return parsed_json_path.name, -1, time.perf_counter() - t0
+
+    with reader:
+        # source_pdf 추론 (첫 페이지만 읽음)
+        source_pdf = None
+        if len(reader):
+            source_pdf = to_page(reader.read_page(reader.page_numbers[0])).metadata.get("source_pdf")
+        source_pdf = source_pdf or (parsed_stem(parsed_json_path) + ".pdf")
+
+        # Save as JSONL (페이지를 하나씩 읽으면서 chunk가 확정되는 대로 기록)
+        # Loader expects: content, page, metadata
+        n_chunks = 0
+        pages = map(to_page, reader.iter_pages())
+        with out_path.open("w", encoding="utf-8") as f:
+            for c in iter_chunks(pages, source_pdf=source_pdf):
+                f.write(json.dumps(chunk_to_record(c), ensure_ascii=False) + "\n")
+                n_chunks += 1
             
-    print(f"✅ Chunked: {parsed_json_path.name} -> {len(chunks)} chunks")
+    print(f"✅ Chunked: {parsed_json_path.name} -> {n_chunks} chunks")
+    return parsed_json_path.name, n_chunks, time.perf_counter() - t0
 
-def run_chunking(input_dir: str, output_dir: str):
+def _process_file_task(args: Tuple[Path, Path]) -> Tuple[str, int, float]:
+    return process_file(*args)
+
+def run_chunking(input_dir: str, output_dir: str, workers: Optional[int] = None):
+    """
+    *_parsed.pages (또는 기존 *_parsed.json) -> *_clean.jsonl 청킹.
+    workers: 프로세스 수 (None/0 -> CPU 코어 수, 1 -> 단일 프로세스).
+    파일별로 독립된 출력 파일을 쓰므로 병렬 여부와 관계없이 결과는 동일.
+    """
     in_dir = Path(input_dir)
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    files = sorted(in_dir.glob("*_parsed.json"))
-    print(f"[Chunker] Found {len(files)} parsed files in {in_dir}")
-
-    for f in files:
-        out_name = f.stem.replace("_parsed", "_clean") + ".jsonl"
-        out_path = out_dir / out_name
-        process_file(f, out_path)
+    files = list_parsed_files(in_dir)
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    print(f"[Chunker] Found {len(files)} parsed files in {in_dir} (workers={workers})")
+
+    tasks = [
+        (f, out_dir / f"{parsed_stem(f)}_clean.jsonl")
+        for f in files
+    ]
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [_process_file_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map은 입력 순서대로 결과를 돌려줌
+            results = list(executor.map(_process_file_task, tasks))
+    elapsed = time.perf_counter() - t0
+
+    # 파일별 소요 시간 요약
+    ok = [r for r in results if r[1] >= 0]
+    total_chunks = sum(n for _, n, _ in ok)
+    cpu_time = sum(t for _, _, t in results)
+    print(f"[Chunker] Done: {len(ok)}/{len(results)} files, {total_chunks} chunks in {elapsed:.2f}s "
+          f"(sum of per-file time {cpu_time:.2f}s)")
+    for name, n, t in sorted(results, key=lambda r: r[2], reverse=True)[:5]:
+        print(f"  - {t:6.2f}s | {n:5d} chunks | {name}")
+    return results
@@ -0,0 +1,222 @@
+import os
+import time
+import zlib
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Iterator
+
+import olefile
+
+from src.pipeline.page_store import write_page_store, page_store_path, find_parsed_file
+
+# =========================
+# HWP 5.x 포맷 상수 (한글문서파일형식 5.0 공개 문서 기준)
+# =========================
+HWP_SIGNATURE = b"HWP Document File"
+FLAG_COMPRESSED = 0x01
+FLAG_PASSWORD = 0x02
+FLAG_DISTRIBUTION = 0x04       # 배포용 문서 (BodyText 대신 암호화된 ViewText 사용)
+
+HWPTAG_BEGIN = 0x010
+HWPTAG_PARA_HEADER = HWPTAG_BEGIN + 50   # 66
+HWPTAG_PARA_TEXT = HWPTAG_BEGIN + 51     # 67
+
+# PARA_HEADER 단 나누기 종류 (bit flag)
+BREAK_SECTION = 0x01
+BREAK_PAGE = 0x04
+
+# PARA_TEXT 제어 문자: char 컨트롤은 1 WCHAR, inline/extended 컨트롤은 8 WCHAR(16 bytes) 차지
+CHAR_CONTROLS = {0, 10, 13, 24, 25, 26, 27, 28, 29, 30, 31}
+INLINE_CONTROLS = {4, 5, 6, 7, 8, 9, 19, 20}
+EXTENDED_CONTROLS = {1, 2, 3, 11, 12, 14, 15, 16, 17, 18, 21, 22, 23}
+CONTROL_TEXT = {9: "\t", 10: "\n", 13: "\n", 24: "-", 30: " ", 31: " "}
+
+
+class HwpFormatError(Exception):
+    """HWP 5.x 본문을 직접 읽을 수 없는 문서 (HWP 3.x, 암호/배포용 문서 등)"""
+
+
+# =========================
+# Record / Text Decoding
+# =========================
+def iter_records(data: bytes) -> Iterator[Tuple[int, int, bytes]]:
+    """BodyText 스트림 -> (tag_id, level, payload)"""
+    pos, end = 0, len(data)
+    while pos + 4 <= end:
+        header, = struct.unpack_from("<I", data, pos)
+        pos += 4
+        tag_id = header & 0x3FF
+        level = (header >> 10) & 0x3FF
+        size = (header >> 20) & 0xFFF
+        if size == 0xFFF:  # 확장 크기
+            size, = struct.unpack_from("<I", data, pos)
+            pos += 4
+        yield tag_id, level, data[pos:pos + size]
+        pos += size
+
+
+def decode_para_text(payload: bytes) -> str:
+    """PARA_TEXT payload(UTF-16LE) -> 문자열 (컨트롤 영역은 건너뛰고 탭/줄바꿈 등만 남김)"""
+    chars = []
+    n = len(payload) // 2
+    codes = struct.unpack_from(f"<{n}H", payload)
+    i = 0
+    while i < n:
+        code = codes[i]
+        if code >= 32:
+            chars.append(chr(code))
+            i += 1
+        elif code in CHAR_CONTROLS:
+            chars.append(CONTROL_TEXT.get(code, ""))
+            i += 1
+        elif code in INLINE_CONTROLS or code in EXTENDED_CONTROLS:
+            chars.append(CONTROL_TEXT.get(code, ""))
+            i += 8
+        else:
+            i += 1
+
+    # UTF-16 surrogate pair 복원
+    return "".join(chars).encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+def parse_section(data: bytes) -> List[str]:
+    """
+    Section 스트림 하나 -> 페이지 텍스트 리스트.
+    HWP는 레이아웃 결과(실제 쪽 나눔)를 저장하지 않으므로 본문(level 0) 문단의
+    쪽/구역 나누기 플래그를 페이지 경계로 사용.
+    """
+    pages, current = [], []
+    for tag_id, level, payload in iter_records(data):
+        if tag_id == HWPTAG_PARA_HEADER and level == 0 and len(payload) >= 12:
+            break_type = payload[11]
+            if break_type & (BREAK_PAGE | BREAK_SECTION) and current:
+                pages.append(current)
+                current = []
+        elif tag_id == HWPTAG_PARA_TEXT:
+            text = decode_para_text(payload).strip()
+            if text:
+                current.append(text)
+    if current:
+        pages.append(current)
+    return ["\n".join(lines) for lines in pages]
+
+
+# =========================
+# OLE Container
+# =========================
+def read_file_header(ole: olefile.OleFileIO) -> int:
+    header = ole.openstream("FileHeader").read()
+    if not header.startswith(HWP_SIGNATURE):
+        raise HwpFormatError("Not an HWP 5.x document")
+    flags, = struct.unpack_from("<I", header, 36)
+    if flags & FLAG_PASSWORD:
+        raise HwpFormatError("Password-protected document")
+    if flags & FLAG_DISTRIBUTION:
+        raise HwpFormatError("Distribution document (encrypted ViewText)")
+    return flags
+
+
+def section_streams(ole: olefile.OleFileIO) -> List[str]:
+    sections = [
+        "/".join(entry) for entry in ole.listdir()
+        if len(entry) == 2 and entry[0] == "BodyText" and entry[1].startswith("Section")
+    ]
+    return sorted(sections, key=lambda name: int(name.rsplit("Section", 1)[1]))
+
+
+def extract_hwp_pages(hwp_path: Path) -> List[Dict]:
+    """HWP 파일 -> 파싱 결과 페이지 스키마 리스트"""
+    if not olefile.isOleFile(str(hwp_path)):
+        raise HwpFormatError("Not an OLE container (HWP 3.x or HWPX)")
+
+    texts = []
+    with olefile.OleFileIO(str(hwp_path)) as ole:
+        flags = read_file_header(ole)
+        for name in section_streams(ole):
+            data = ole.openstream(name).read()
+            if flags & FLAG_COMPRESSED:
+                data = zlib.decompress(data, -15)
+            texts.extend(parse_section(data))
+
+    source = hwp_path.name
+    return [
+        {
+            "page": i,
+            "content": text,
+            "metadata": {
+                "page": i,
+                "global_page": i,
+                "source_pdf": source,
+                "parser": "hwp5",
+            },
+            "source_pdf": source,
+        }
+        for i, text in enumerate(texts, start=1)
+    ]
+
+
+# =========================
+# Batch Runner
+# =========================
+def process_hwp_file(hwp_path: Path, out_path: Path) -> Tuple[str, int, float, Optional[str]]:
+    t0 = time.perf_counter()
+    try:
+        pages = extract_hwp_pages(hwp_path)
+    except Exception as e:
+        return hwp_path.name, -1, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+
+    write_page_store(out_path, pages)
+    return hwp_path.name, len(pages), time.perf_counter() - t0, None
+
+
+def _process_hwp_task(args: Tuple[Path, Path]) -> Tuple[str, int, float, Optional[str]]:
+    return process_hwp_file(*args)
+
+
+def run_hwp_extraction(input_dir: str, output_dir: str, workers: Optional[int] = None) -> List[Path]:
+    """
+    input_dir 의 .hwp 를 직접 읽어 output_dir/{stem}_parsed.pages 로 저장 (PDF 변환/Upstage 파싱 생략).
+    실패한 HWP 파일 목록을 반환 (COM 백엔드로 PDF 변환 후 파싱하는 경로로 처리 가능).
+    """
+    in_dir = Path(input_dir)
+    out_dir = Path(output_dir)
+
+    if not in_dir.exists():
+        print(f"[Error] Input directory not found: {input_dir}")
+        return []
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    for hwp_file in sorted(in_dir.glob("*.hwp")):
+        if find_parsed_file(out_dir, hwp_file.stem):
+            print(f"⏩ Skipping (Already parsed): {hwp_file.name}")
+            continue
+        tasks.append((hwp_file, page_store_path(out_dir, hwp_file.stem)))
+
+    if not tasks:
+        print(f"[HWP Reader] No .hwp files to extract in {input_dir}")
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    print(f"[HWP Reader] Extracting {len(tasks)} HWP files (workers={workers})...")
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [_process_hwp_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_process_hwp_task, tasks))
+
+    failed = []
+    for (hwp_file, _), (name, n_pages, secs, error) in zip(tasks, results):
+        if error:
+            print(f"❌ Failed: {name} → {error}")
+            failed.append(hwp_file)
+
+    n_ok = len(results) - len(failed)
+    total_pages = sum(n for _, n, _, _ in results if n > 0)
+    print(f"[HWP Reader] Done: {n_ok}/{len(results)} files, {total_pages} pages in {time.perf_counter() - t0:.2f}s")
+    return failed
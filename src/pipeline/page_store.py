@@ -0,0 +1,197 @@
+"""
+파싱 결과(페이지 리스트) 저장 포맷.
+
+    {stem}_parsed.pages
+    ┌──────────────┬──────────────────────────────┬───────────────┬──────────────────────────┐
+    │ MAGIC (8B)   │ page record * N (zlib JSON)  │ index (N*16B) │ trailer (8B+4B+8B magic) │
+    └──────────────┴──────────────────────────────┴───────────────┴──────────────────────────┘
+    index entry : <page: uint32, offset: uint64, length: uint32>  (page 순 정렬)
+    trailer     : <index_offset: uint64, count: uint32> + INDEX_MAGIC
+
+페이지 하나 = {page, content, metadata, ...} dict 하나 (기존 _parsed.json 배열 원소와 동일).
+리더는 trailer -> index 만 읽고, 필요한 페이지 레코드만 seek 해서 풀기 때문에
+문서 전체를 파싱하지 않고 스트리밍 / page range 조회가 가능.
+기존 _parsed.json (JSON 배열) 도 같은 API로 읽을 수 있음.
+"""
+import os
+import sys
+import json
+import zlib
+import struct
+import bisect
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+MAGIC = b"RFPPAGE1"
+INDEX_MAGIC = b"RFPIDX01"
+INDEX_ENTRY = struct.Struct("<IQI")
+TRAILER = struct.Struct("<QI8s")
+
+PAGE_STORE_SUFFIX = "_parsed.pages"
+LEGACY_SUFFIX = "_parsed.json"
+COMPRESS_LEVEL = 6
+
+
+def page_number(item: Dict) -> int:
+    # page: global page (top-level) 를 우선 사용
+    return int(item.get("page") or item.get("metadata", {}).get("global_page") or 0)
+
+
+# =========================
+# Writer
+# =========================
+def write_page_store(path: Path, pages: List[Dict]) -> Path:
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    index = []
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        for item in sorted(pages, key=page_number):
+            record = zlib.compress(
+                json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), COMPRESS_LEVEL
+            )
+            index.append((page_number(item), f.tell(), len(record)))
+            f.write(record)
+
+        index_offset = f.tell()
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(TRAILER.pack(index_offset, len(index), INDEX_MAGIC))
+    os.replace(tmp_path, path)
+    return path
+
+
+# =========================
+# Reader
+# =========================
+class PageStoreReader:
+    """
+    with open_pages(path) as reader:
+        for item in reader.iter_pages(start=3, end=10): ...
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f = None
+        self._legacy: Optional[List[Dict]] = None
+
+        if self.path.name.endswith(LEGACY_SUFFIX) or self.path.suffix == ".json":
+            # 기존 JSON 배열 포맷: 통째로 읽을 수밖에 없음
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._legacy = sorted(json.load(f), key=page_number)
+            self._index = [(page_number(item), i, 0) for i, item in enumerate(self._legacy)]
+        else:
+            self._f = open(self.path, "rb")
+            if self._f.read(len(MAGIC)) != MAGIC:
+                self.close()
+                raise ValueError(f"Not a page store file: {self.path}")
+            self._f.seek(-TRAILER.size, os.SEEK_END)
+            index_offset, count, magic = TRAILER.unpack(self._f.read(TRAILER.size))
+            if magic != INDEX_MAGIC:
+                self.close()
+                raise ValueError(f"Corrupted page store (missing index): {self.path}")
+            self._f.seek(index_offset)
+            raw = self._f.read(count * INDEX_ENTRY.size)
+            self._index = [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(count)]
+
+        self._pages = [entry[0] for entry in self._index]
+
+    def __len__(self):
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    @property
+    def page_numbers(self) -> List[int]:
+        return list(self._pages)
+
+    def _read(self, pos: int) -> Dict:
+        _, offset, length = self._index[pos]
+        if self._legacy is not None:
+            return self._legacy[offset]
+        self._f.seek(offset)
+        return json.loads(zlib.decompress(self._f.read(length)))
+
+    def iter_pages(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[Dict]:
+        """page 번호 기준 [start, end] 범위의 페이지를 순서대로 하나씩 반환 (None이면 끝까지)"""
+        lo = 0 if start is None else bisect.bisect_left(self._pages, start)
+        hi = len(self._pages) if end is None else bisect.bisect_right(self._pages, end)
+        for pos in range(lo, hi):
+            yield self._read(pos)
+
+    def read_page(self, page: int) -> Optional[Dict]:
+        pos = bisect.bisect_left(self._pages, page)
+        if pos < len(self._pages) and self._pages[pos] == page:
+            return self._read(pos)
+        return None
+
+
+def open_pages(path: Path) -> PageStoreReader:
+    return PageStoreReader(path)
+
+
+def read_all_pages(path: Path) -> List[Dict]:
+    with open_pages(path) as reader:
+        return list(reader.iter_pages())
+
+
+# =========================
+# Directory helpers
+# =========================
+def parsed_stem(path: Path) -> str:
+    """'X_parsed.pages' / 'X_parsed.json' -> 'X'"""
+    name = Path(path).name
+    for suffix in (PAGE_STORE_SUFFIX, LEGACY_SUFFIX):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return Path(path).stem
+
+
+def page_store_path(output_dir: Path, stem: str) -> Path:
+    return Path(output_dir) / f"{stem}{PAGE_STORE_SUFFIX}"
+
+
+def find_parsed_file(parsed_dir: Path, stem: str) -> Optional[Path]:
+    """문서 하나의 파싱 결과 (새 포맷 우선, 없으면 기존 _parsed.json)"""
+    for suffix in (PAGE_STORE_SUFFIX, LEGACY_SUFFIX):
+        path = Path(parsed_dir) / f"{stem}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def list_parsed_files(parsed_dir: Path) -> List[Path]:
+    """디렉토리의 파싱 결과 목록 (같은 문서가 두 포맷으로 있으면 새 포맷만)"""
+    parsed_dir = Path(parsed_dir)
+    by_stem = {parsed_stem(p): p for p in parsed_dir.glob(f"*{LEGACY_SUFFIX}")}
+    by_stem.update({parsed_stem(p): p for p in parsed_dir.glob(f"*{PAGE_STORE_SUFFIX}")})
+    return [by_stem[stem] for stem in sorted(by_stem)]
+
+
+def convert_legacy_dir(parsed_dir: Path, remove: bool = False):
+    """기존 _parsed.json 파일을 page store 포맷으로 변환"""
+    parsed_dir = Path(parsed_dir)
+    before = after = 0
+    legacy_files = sorted(parsed_dir.glob(f"*{LEGACY_SUFFIX}"))
+    for legacy in legacy_files:
+        out_path = write_page_store(page_store_path(parsed_dir, parsed_stem(legacy)), read_all_pages(legacy))
+        before += legacy.stat().st_size
+        after += out_path.stat().st_size
+        if remove:
+            legacy.unlink()
+
+    print(f"[Page Store] Converted {len(legacy_files)} files: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    # python -m src.pipeline.page_store data/parsed_json [--remove]
+    convert_legacy_dir(sys.argv[1] if len(sys.argv) > 1 else "data/parsed_json", remove="--remove" in sys.argv)
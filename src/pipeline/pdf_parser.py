@@ -1,171 +1,514 @@
 import os
+import re
 import json
 import time
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 import fitz  # PyMuPDF
-from langchain_upstage import UpstageDocumentParseLoader
+import requests
+
+from src.pipeline.chunker import remove_decorative_lines, BOUNDARY_RE, DOT_RATIO_TH
+from src.pipeline.page_store import write_page_store, page_store_path, find_parsed_file
 
 # ======================
 # 설정
 # ======================
-MAX_PAGES_PER_CHUNK = 90
-OUTPUT_FORMAT = "markdown"   # or "raw"
-SPLIT_MODE = "page"
-CHUNK_SIZE_CANDIDATES = [90, 60, 45, 30]
-
-def parse_pdf_with_adaptive_chunking(
-    pdf_path: Path,
-    output_dir: Path,
-    api_key: str
-):
-    os.environ["UPSTAGE_API_KEY"] = api_key # Set env var for loader
-
-    for chunk_size in CHUNK_SIZE_CANDIDATES:
-        print(f"\n🔁 Trying chunk_size={chunk_size} for {pdf_path.name}")
-
-        try:
-            return parse_large_pdf_with_upstage(
-                pdf_path=pdf_path,
-                output_dir=output_dir,
-                chunk_size=chunk_size,
-            )
-
-        except Exception as e:
-            msg = str(e)
-            if "too_many_requests" in msg or "429" in msg:
-                wait = 5
-                print(f"⏳ Rate limit with chunk={chunk_size}, wait {wait}s")
-                time.sleep(wait)
-                continue
-            
-            # 그 외 에러는 바로 중단
-            raise e
-
-    raise RuntimeError("All chunk size attempts failed")
+UPSTAGE_API_URL = "https://api.upstage.ai/v1/document-digitization"
+UPSTAGE_MODEL = "document-parse"
+OUTPUT_FORMAT = "markdown"   # or "text", "html"
+PAGES_PER_REQUEST = 10       # 요청 1건당 페이지 수 (langchain_upstage 로더 기본값과 동일)
+PARSE_WORKERS = 4            # 동시에 처리 중인 요청 수
+REQUESTS_PER_SECOND = 1.0    # 토큰 버킷 충전 속도 (전체 워커 공유)
+BURST = 2                    # 토큰 버킷 최대 용량
+MAX_INFLIGHT_BUFFERS = 4     # 동시에 메모리에 올려둘 range PDF 바이트 수
+MAX_RETRIES = 5
+REQUEST_TIMEOUT = 300
+
+# 텍스트 레이어 fast path (로컬 추출 vs Upstage 판단 기준)
+MIN_TEXT_CHARS = 80          # 공백 제외 글자 수가 이보다 적고 이미지가 있으면 스캔 페이지로 판단
+MAX_GARBLED_RATIO = 0.02     # 깨진 글자(U+FFFD, 사용자 정의 영역, 제어문자) 비율 상한
+MAX_IMAGE_COVERAGE = 0.3     # 페이지 면적 대비 이미지 면적 비율 상한
+MAX_TABLE_LINES = 20         # 선/사각형 드로잉 수가 이보다 많으면 표 중심 페이지로 판단
+
+# 파싱 전 페이지 triage (chunker 정제 단계와 같은 기준으로 버릴 페이지는 API에 보내지 않음)
+FORM_MARKERS = ("[ 서식", "[서식", "서식 [")   # RAG_LLM 로더가 걸러내는 서식(양식) 페이지 표시
+FORM_MARKER_LINES = 3        # 서식 표시로 시작하는 줄을 페이지 상단 몇 줄에서만 확인 (본문 속 "[서식 1] 참조"는 유지)
+TRIAGE_DIR_NAME = "_triage"  # {stem}_triage.json 저장 위치 (parsed_json/*.json glob과 섞이지 않게 하위 폴더)
+# 페이지 단위 목차 판정은 chunker is_toc_chunk 보다 보수적으로: 숫자 비율만으로는 버리지 않음 (예산/일정 표 페이지 보호)
+TOC_HEADINGS = ("목차", "차례")
+TOC_HEADING_LINES = 3        # 목차 제목은 페이지 상단 몇 줄에서만 확인
+DOT_LEADER_RE = re.compile(r"(?:[·.…‥]\s*){3,}\s*\d+\s*$")   # "사업 개요 ······ 3"
+
+
+class TokenBucket:
+    """
+    스레드 간 공유 토큰 버킷.
+    - acquire(): 토큰이 생길 때까지 대기 후 1개 소비
+    - pause(seconds): 429 Retry-After 동안 모든 워커의 요청을 멈춤
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+def parse_retry_after(value, default: float) -> float:
+    """Retry-After 헤더 (초 또는 HTTP-date) -> 대기 초"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
 
 
 # ======================
 # 1️⃣ PDF 분할
 # ======================
-def split_pdf_by_pages(
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def plan_page_ranges(page_indices, chunk_size: int = PAGES_PER_REQUEST):
+    """
+    Upstage로 보낼 페이지 번호(0-based)들을 연속 구간으로 묶고 chunk_size 단위로 분할.
+    [(start, end), ...] (end 미포함)
+    """
+    ranges = []
+    for idx in sorted(page_indices):
+        if ranges and ranges[-1][1] == idx and idx - ranges[-1][0] < chunk_size:
+            ranges[-1][1] = idx + 1
+        else:
+            ranges.append([idx, idx + 1])
+    return [tuple(r) for r in ranges]
+
+
+def is_garbled_char(ch: str) -> bool:
+    code = ord(ch)
+    return ch == "\ufffd" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\n\t\r")
+
+
+def image_coverage(page) -> float:
+    page_area = abs(page.rect) or 1.0
+    return sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info()) / page_area
+
+
+def is_toc_page(text: str) -> bool:
+    """
+    목차 페이지: 상단에 '목차' 제목이 있거나 점선 리더(…… 페이지 번호) 줄이 대부분.
+    리더 없는 섹션 제목 줄(chunker BOUNDARY_RE)이 함께 있으면 목차 끝 + 본문 시작 페이지 -> 유지
+    """
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    if not lines:
+        return False
+    if any(re.sub(r"\s+", "", l) in TOC_HEADINGS for l in lines[:TOC_HEADING_LINES]):
+        return True
+    leaders = [bool(DOT_LEADER_RE.search(l)) for l in lines]
+    if sum(leaders) / len(lines) <= DOT_RATIO_TH:
+        return False
+    return not any(BOUNDARY_RE.match(l) for l, leader in zip(lines, leaders) if not leader)
+
+
+def triage_page(text: str, has_images: bool):
+    """
+    파싱 전 페이지 판정 -> (skip 여부, 사유)
+    텍스트 레이어가 없는 스캔 페이지는 판단할 수 없으므로 항상 파싱.
+    짧은 페이지는 버리지 않음: chunker 가 페이지를 넘어 텍스트를 합치므로 제목만 있는 페이지도 다음 섹션의 시작
+    """
+    cleaned = remove_decorative_lines(text)
+    if not cleaned:
+        return (False, "no_text_layer") if has_images else (True, "blank")
+
+    head = cleaned.splitlines()[:FORM_MARKER_LINES]
+    if any(line.strip().startswith(FORM_MARKERS) for line in head):
+        return True, "form"
+    if is_toc_page(cleaned):
+        return True, "toc"
+    return False, "ok"
+
+
+def classify_page(page, text: str = None) -> str:
+    """
+    'local'  : 텍스트 레이어가 온전하고 레이아웃이 단순 -> PyMuPDF로 직접 추출
+    'upstage': 스캔/이미지 위주, 깨진 텍스트, 표 중심 페이지 -> Upstage로 전송
+    """
+    if text is None:
+        text = page.get_text("text")
+    chars = [ch for ch in text if not ch.isspace()]
+
+    page_area = abs(page.rect) or 1.0
+    image_area = image_coverage(page) * page_area
+    if image_area / page_area > MAX_IMAGE_COVERAGE:
+        return "upstage"
+
+    if len(chars) < MIN_TEXT_CHARS:
+        # 이미지도 없으면 빈 페이지/짧은 페이지 -> 로컬 추출로 충분
+        return "upstage" if image_area > 0 else "local"
+
+    if sum(map(is_garbled_char, chars)) / len(chars) > MAX_GARBLED_RATIO:
+        return "upstage"
+
+    if is_table_page(page):
+        return "upstage"
+
+    return "local"
+
+
+def is_table_page(page) -> bool:
+    """선/사각형 드로잉이 많으면 표 중심 페이지"""
+    lines = sum(
+        1 for d in page.get_drawings() for item in d["items"] if item[0] in ("l", "re")
+    )
+    return lines > MAX_TABLE_LINES
+
+
+def plan_pdf(
     pdf_path: Path,
-    chunk_size: int = 90,
-    work_dir: Path = None
+    chunk_size: int = PAGES_PER_REQUEST,
+    text_fast_path: bool = True,
+    page_triage: bool = True,
 ):
-    work_dir.mkdir(parents=True, exist_ok=True)
-
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
-    # print(f'total_pages : {total_pages}')
+    """
+    페이지 triage + 분류 후 (로컬 추출 페이지 레코드 리스트, Upstage page range 리스트, triage 리포트) 반환
+    """
+    local_pages, upstage_indices, skipped = [], [], []
+    with fitz.open(pdf_path) as doc:
+        total_pages = len(doc)
+        for idx, page in enumerate(doc):
+            text = page.get_text("text")
+            if page_triage:
+                skip, reason = triage_page(text, bool(page.get_image_info()))
+                if skip and reason == "toc" and is_table_page(page):
+                    # 점선 리더가 있는 금액/일정 표는 목차가 아님 -> classify_page 와 같은 기준으로 유지
+                    skip = False
+                if skip:
+                    skipped.append({"page": idx + 1, "reason": reason})
+                    continue
+            if text_fast_path and classify_page(page, text) == "local":
+                local_pages.append(local_page_record(idx + 1, text.strip(), pdf_path.name))
+            else:
+                upstage_indices.append(idx)
+
+    report = {
+        "source_pdf": pdf_path.name,
+        "total_pages": total_pages,
+        "local_pages": len(local_pages),
+        "upstage_pages": len(upstage_indices),
+        "skipped_pages": len(skipped),
+        "skipped": skipped,
+    }
+    return local_pages, plan_page_ranges(upstage_indices, chunk_size), report
+
+
+def save_triage_report(pdf_path: Path, report, output_dir: Path) -> Path:
+    triage_dir = output_dir / TRIAGE_DIR_NAME
+    triage_dir.mkdir(parents=True, exist_ok=True)
+    out_path = triage_dir / f"{pdf_path.stem}_triage.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return out_path
 
-    chunks = []
-    for start in range(0, total_pages, chunk_size):
-        end = min(start + chunk_size, total_pages)
 
-        chunk_doc = fitz.open()
+def slice_pdf_range(pdf_path: Path, start: int, end: int) -> bytes:
+    """page range를 임시 파일 없이 메모리에서 잘라 PDF 바이트로 반환"""
+    with fitz.open(pdf_path) as doc, fitz.open() as chunk_doc:
         chunk_doc.insert_pdf(doc, from_page=start, to_page=end - 1)
+        return chunk_doc.tobytes(garbage=3, deflate=True)
+
+
+class ParseCache:
+    """
+    (PDF 내용 해시, page range) 단위 파싱 결과(elements) 디스크 캐시.
+    - 실패 후 재실행 시 이미 받은 range는 API를 다시 호출하지 않음
+    - 이름만 바뀐 동일 PDF도 해시로 인식
+    """
 
-        chunk_path = work_dir / f"{pdf_path.stem}_{start+1:04d}_{end:04d}.pdf"
-        chunk_doc.save(chunk_path)
-        chunk_doc.close()
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
 
-        chunks.append((chunk_path, start))  # start = page_offset
+    def _path(self, pdf_hash: str, start: int, end: int) -> Path:
+        return self.cache_dir / pdf_hash / f"{start+1:04d}_{end:04d}_{UPSTAGE_MODEL}_{OUTPUT_FORMAT}.json"
 
-    doc.close()
-    return chunks
+    def get(self, pdf_hash: str, start: int, end: int):
+        path = self._path(pdf_hash, start, end)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, pdf_hash: str, start: int, end: int, elements):
+        path = self._path(pdf_hash, start, end)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(elements, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
 
 
 # ======================
-# 2️⃣ Upstage 파싱 (chunk 단위)
+# 2️⃣ Upstage 파싱 (page range 단위)
 # ======================
-def parse_pdf_chunk(
-    pdf_chunk_path: Path,
+def request_document_parse(
+    pdf_bytes: bytes,
+    filename: str,
+    api_key: str,
+    bucket: TokenBucket,
+    api_url: str = UPSTAGE_API_URL,
+    max_retries: int = MAX_RETRIES,
 ):
-    loader = UpstageDocumentParseLoader(
-        str(pdf_chunk_path),
-        split=SPLIT_MODE,
-        output_format=OUTPUT_FORMAT,
-        coordinates=False,
-    )
-    docs = loader.load()
-    return docs
+    """
+    Document Parse API 호출 (page range 1건). elements 리스트 반환.
+    429 응답 시 Retry-After 만큼 버킷 전체를 멈춘 뒤 같은 range만 재시도.
+    """
+    headers = {"Authorization": f"Bearer {api_key}"}
+    data = {
+        "model": UPSTAGE_MODEL,
+        "ocr": "auto",
+        "output_formats": f"['{OUTPUT_FORMAT}']",
+        "coordinates": False,
+    }
 
-def parse_pdf_chunk_with_retry(pdf_chunk_path, max_retries=5):
     for attempt in range(1, max_retries + 1):
-        try:
-            return parse_pdf_chunk(pdf_chunk_path)
-
-        except Exception as e:
-            msg = str(e)
-            if "too_many_requests" in msg or "429" in msg:
-                wait = 2 ** attempt
-                print(f"⏳ Rate limit hit. Retry in {wait}s (attempt {attempt})")
-                time.sleep(wait)
-            else:
-                raise e
+        bucket.acquire()
+        resp = requests.post(
+            api_url,
+            headers=headers,
+            files={"document": (filename, pdf_bytes, "application/pdf")},
+            data=data,
+            timeout=REQUEST_TIMEOUT,
+        )
+
+        if resp.status_code == 429 or resp.status_code >= 500:
+            wait = parse_retry_after(resp.headers.get("Retry-After"), default=2 ** attempt)
+            print(f"⏳ HTTP {resp.status_code} for {filename}. Retry in {wait:.1f}s (attempt {attempt})")
+            bucket.pause(wait)
+            continue
+
+        resp.raise_for_status()
+        return resp.json().get("elements", [])
 
     raise RuntimeError("Max retries exceeded due to rate limit")
 
+
+def elements_to_pages(elements, page_offset: int, source_pdf: str):
+    """elements를 페이지별로 묶어 {page, content, metadata} 리스트로 변환"""
+    by_page = {}
+    for el in elements:
+        by_page.setdefault(el["page"], []).append(el)
+
+    pages = []
+    for local_page in sorted(by_page):
+        global_page_index = page_offset + local_page  # 1-based
+        content = " ".join(el.get("content", {}).get(OUTPUT_FORMAT, "") for el in by_page[local_page])
+        pages.append({
+            "page": global_page_index,
+            "content": content,
+            "metadata": {
+                "page": local_page,
+                "global_page": global_page_index,
+                "source_pdf": source_pdf,
+                "parser": "upstage",
+            },
+            "source_pdf": source_pdf # Root level for easy access
+        })
+    return pages
+
+
+def local_page_record(global_page: int, content: str, source_pdf: str):
+    """PyMuPDF로 직접 추출한 페이지 (elements_to_pages와 같은 스키마)"""
+    return {
+        "page": global_page,
+        "content": content,
+        "metadata": {
+            "page": 1,
+            "global_page": global_page,
+            "source_pdf": source_pdf,
+            "parser": "pymupdf",
+        },
+        "source_pdf": source_pdf,
+    }
+
+
+def save_parsed_pages(pdf_path: Path, pages, output_dir: Path) -> Path:
+    # {base_name}_parsed.pages (page_store 포맷: 페이지별 압축 레코드 + offset index)
+    return write_page_store(page_store_path(output_dir, pdf_path.stem), pages)
+
+
 # ======================
-# 3️⃣ 전체 파이프라인
+# 3️⃣ 전체 파이프라인 (여러 PDF의 page range를 동시에 처리)
 # ======================
-def parse_large_pdf_with_upstage(
-    pdf_path: Path,
+def parse_pdfs_concurrently(
+    pdf_paths,
     output_dir: Path,
-    chunk_size: int = 90
+    api_key: str,
+    workers: int = PARSE_WORKERS,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    burst: int = BURST,
+    pages_per_request: int = PAGES_PER_REQUEST,
+    api_url: str = UPSTAGE_API_URL,
+    cache_dir: Path = None,
+    max_inflight: int = None,
+    text_fast_path: bool = True,
+    page_triage: bool = True,
 ):
+    """
+    모든 PDF를 page range 작업으로 나눠 스레드 풀에서 동시에 파싱하고,
+    PDF별로 모든 range가 끝나면 페이지 순서대로 재조립하여 저장.
+    range 결과는 (PDF 해시, range) 캐시에 저장되어 재실행 시 빠진 range만 요청.
+    text_fast_path=True 이면 텍스트 레이어가 온전한 페이지는 로컬에서 추출하고
+    스캔/표 중심 페이지의 연속 구간만 Upstage로 전송.
+    page_triage=True 이면 목차/빈 페이지/서식 페이지는 파싱 전에 제외하고
+    output_dir/_triage/{stem}_triage.json 에 사유를 기록.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
+    pdf_paths = list(pdf_paths)
+    cache = ParseCache(cache_dir or output_dir / "_cache")
+    bucket = TokenBucket(requests_per_second, burst)
+
+    # 1) 페이지 분류 (로컬 추출) + PDF 해시 + Upstage page range 작업 목록
+    jobs = []
+    results = {}
+    n_local = n_skipped = 0
+    for pdf_path in list(pdf_paths):
+        try:
+            local_pages, ranges, report = plan_pdf(pdf_path, pages_per_request, text_fast_path, page_triage)
+            save_triage_report(pdf_path, report, output_dir)
+            pdf_hash = file_sha256(pdf_path) if ranges else None
+        except Exception as e:
+            print(f"❌ Failed: {pdf_path.name} → {e}")
+            pdf_paths.remove(pdf_path)
+            continue
+        # 로컬 추출 페이지도 page offset(0-based) 키로 넣어두고 range 결과와 함께 정렬
+        results[pdf_path] = {page["page"] - 1: [page] for page in local_pages}
+        n_local += len(local_pages)
+        n_skipped += report["skipped_pages"]
+        for start, end in ranges:
+            jobs.append((pdf_path, pdf_hash, start, end))
+
+    remaining = {pdf: 0 for pdf in pdf_paths}
+    for pdf_path, _, _, _ in jobs:
+        remaining[pdf_path] += 1
+    failed = {}
+    saved = []
+    counts = {"api": 0, "cache": 0}
+    counts_lock = threading.Lock()
+    # range PDF 바이트는 업로드가 끝나면 바로 버리므로, 동시에 존재하는 버퍼 수만 제한
+    buffer_slots = threading.BoundedSemaphore(max_inflight or MAX_INFLIGHT_BUFFERS)
+
+    def parse_range(pdf_path, pdf_hash, start, end):
+        elements = cache.get(pdf_hash, start, end)
+        if elements is None:
+            with buffer_slots:
+                pdf_bytes = slice_pdf_range(pdf_path, start, end)
+                elements = request_document_parse(
+                    pdf_bytes, f"{pdf_path.stem}_{start+1:04d}_{end:04d}.pdf", api_key, bucket, api_url=api_url
+                )
+                del pdf_bytes
+            cache.put(pdf_hash, start, end, elements)
+            source = "api"
+        else:
+            source = "cache"
+        with counts_lock:
+            counts[source] += 1
+        return elements_to_pages(elements, start, pdf_path.name)
+
+    def finish(pdf_path):
+        # PDF의 모든 range 완료 -> 순서대로 재조립 후 저장
+        if pdf_path in failed:
+            print(f"❌ Failed: {pdf_path.name} → {failed[pdf_path]}")
+            return
+        ranges = results.pop(pdf_path)
+        pages = [page for offset in sorted(ranges) for page in ranges[offset]]
+        out_path = save_parsed_pages(pdf_path, pages, output_dir)
+        print(f"✅ Saved: {out_path}")
+        saved.append(out_path)
+
+    print(
+        f"[PDF Parser] {len(pdf_paths)} PDFs -> {n_skipped} pages skipped by triage, {n_local} pages extracted locally, "
+        f"{len(jobs)} page ranges to Upstage (workers={workers}, {requests_per_second} req/s)"
+    )
 
-    work_dir = output_dir / "_chunks"
-    work_dir.mkdir(exist_ok=True)
-
-    print(f"\n📄 Processing: {pdf_path.name}")
-
-    # 1) PDF 분할
-    chunks = split_pdf_by_pages(pdf_path, chunk_size, work_dir)
-
-    all_pages = []
+    # Upstage로 보낼 페이지가 없는 PDF는 바로 저장
+    for pdf_path in pdf_paths:
+        if remaining[pdf_path] == 0:
+            finish(pdf_path)
 
-    # 2) chunk별 Upstage 파싱
-    for chunk_path, page_offset in tqdm(chunks, desc=f"Parsing chunks ({pdf_path.name})", unit="chunk"):
-        
-        docs = parse_pdf_chunk_with_retry(chunk_path)
+    # 2) range별 Upstage 파싱
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(parse_range, *job): job for job in jobs}
 
-        # 3) 페이지 번호 보정
-        for i, doc in enumerate(docs):
-            global_page_index = page_offset + i + 1  # 1-based
-            doc.metadata["global_page"] = global_page_index
-            doc.metadata["source_pdf"] = pdf_path.name
-            
-            # HTML/Markdown Content clean up if needed
-            content = doc.page_content
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Parsing ranges", unit="range"):
+            pdf_path, _, page_offset, _ = futures[future]
+            try:
+                results[pdf_path][page_offset] = future.result()
+            except Exception as e:
+                failed.setdefault(pdf_path, e)
 
-            all_pages.append({
-                "page": global_page_index,
-                "content": content,
-                "metadata": doc.metadata,
-                "source_pdf": pdf_path.name # Root level for easy access
-            })
+            remaining[pdf_path] -= 1
+            if remaining[pdf_path] == 0:
+                finish(pdf_path)
 
-        time.sleep(1.0)  # rate limit 완화
+    print(f"[PDF Parser] Ranges: API {counts['api']}, cache {counts['cache']} / Saved {len(saved)}, failed {len(failed)}")
+    return saved
 
-    # 4) 결과 저장
-    # user_code expects {base_name}_parsed.json
-    out_path = output_dir / f"{pdf_path.stem}_parsed.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(all_pages, f, ensure_ascii=False, indent=2)
 
-    print(f"✅ Saved: {out_path}")
-    return out_path
+def parse_large_pdf_with_upstage(
+    pdf_path: Path,
+    output_dir: Path,
+    api_key: str = None,
+    chunk_size: int = PAGES_PER_REQUEST
+):
+    """단일 PDF 파싱 (parse_pdfs_concurrently 래퍼)"""
+    saved = parse_pdfs_concurrently(
+        [pdf_path], output_dir, api_key or os.environ["UPSTAGE_API_KEY"], pages_per_request=chunk_size
+    )
+    return saved[0] if saved else None
 
 # ======================
 # 4️⃣ 배치 실행 (외부 호출용)
 # ======================
-def run_pdf_parsing(raw_pdf_dir: str, output_json_dir: str, api_key: str):
+def run_pdf_parsing(raw_pdf_dir: str, output_json_dir: str, api_key: str, parse_config: dict = None):
     pdf_dir = Path(raw_pdf_dir)
     output_dir = Path(output_json_dir)
-    
+    parse_config = parse_config or {}
+
     if not pdf_dir.exists():
         print(f"[Error] PDF 폴더가 없습니다: {pdf_dir}")
         return
@@ -175,14 +518,28 @@ def run_pdf_parsing(raw_pdf_dir: str, output_json_dir: str, api_key: str):
     pdf_files = sorted(list(pdf_dir.glob("*.pdf")))
     print(f"[PDF Parser] Found {len(pdf_files)} PDF files in {pdf_dir}")
 
+    targets = []
     for pdf in pdf_files:
-        try:
-            # Check if already parsed
-            out_file = output_dir / f"{pdf.stem}_parsed.json"
-            if out_file.exists():
-                print(f"⏩ Create Skipping (Already valid): {pdf.name}")
-                continue
-                
-            parse_pdf_with_adaptive_chunking(pdf, output_dir, api_key)
-        except Exception as e:
-            print(f"❌ Failed: {pdf.name} → {e}")
+        # Check if already parsed
+        if find_parsed_file(output_dir, pdf.stem):
+            print(f"⏩ Create Skipping (Already valid): {pdf.name}")
+            continue
+        targets.append(pdf)
+
+    if not targets:
+        return
+
+    parse_pdfs_concurrently(
+        targets,
+        output_dir,
+        api_key,
+        workers=parse_config.get('workers', PARSE_WORKERS),
+        requests_per_second=parse_config.get('requests_per_second', REQUESTS_PER_SECOND),
+        burst=parse_config.get('burst', BURST),
+        pages_per_request=parse_config.get('pages_per_request', PAGES_PER_REQUEST),
+        api_url=os.getenv("UPSTAGE_API_URL") or parse_config.get('api_url', UPSTAGE_API_URL),
+        cache_dir=parse_config.get('cache_dir'),
+        max_inflight=parse_config.get('max_inflight_buffers'),
+        text_fast_path=parse_config.get('text_fast_path', True),
+        page_triage=parse_config.get('page_triage', True),
+    )
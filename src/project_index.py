@@ -0,0 +1,110 @@
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.sparse_index import SparseIndex
+
+# =========================
+# 프로젝트 단위 인덱스 (2단계 검색의 1단계)
+#   사업명 + 발주 기관 + 사업 요약 -> 임베딩 1개 + BM25 문서 1개 (프로젝트당)
+#   질의 -> 상위 project_k 개 사업 -> 청크 검색은 해당 사업 안에서만
+# =========================
+PROJECT_K = 10              # 1단계에서 고르는 사업 수
+PROJECT_BM25_WEIGHT = 0.5   # 1단계 점수 = 의미 유사도 * (1 - w) + BM25 * w (둘 다 0~1 정규화)
+PROJECT_TEXT_FIELDS = ("project_name", "organization", "summary")
+
+
+def project_text(project: dict) -> str:
+    """ProjectTable 항목 -> 프로젝트 검색용 텍스트"""
+    parts = [str(project.get(name, "")) for name in PROJECT_TEXT_FIELDS]
+    return "\n".join(part for part in parts if part and part not in ("nan", "Unknown"))
+
+
+def _unit_scale(scores: np.ndarray) -> np.ndarray:
+    """min-max 정규화 (모두 같은 값이면 0)"""
+    if scores.size == 0:
+        return scores
+    low, high = float(scores.min()), float(scores.max())
+    if high - low <= 1e-12:
+        return np.zeros_like(scores)
+    return (scores - low) / (high - low)
+
+
+class ProjectIndex:
+    """project_id 순서의 정규화 임베딩 행렬 + 프로젝트 텍스트 BM25"""
+
+    def __init__(self, project_ids: List[str], texts: List[str], vectors: np.ndarray):
+        self.project_ids = list(project_ids)
+        self.texts = list(texts)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # 저장 시점에 L2 정규화 -> 질의 시 내적 = 코사인 유사도
+        self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        self.sparse = SparseIndex(
+            Document(page_content=text, metadata={"chunk_id": pid}) for pid, text in zip(self.project_ids, self.texts)
+        ) if self.project_ids else None
+
+    def __len__(self):
+        return len(self.project_ids)
+
+    def search(self, query: str, query_embedding, k: int = PROJECT_K,
+               bm25_weight: float = PROJECT_BM25_WEIGHT, allowed: Optional[set] = None):
+        """상위 k개 (project_id, 점수). allowed 가 주어지면 그 사업들 중에서만 선택"""
+        if not self.project_ids:
+            return []
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        query_vec = query_vec / max(float(np.linalg.norm(query_vec)), 1e-12)
+        dense = self.vectors @ query_vec
+        sparse = self.sparse.get_scores(query)
+
+        candidates = np.arange(len(self.project_ids))
+        if allowed is not None:
+            candidates = np.array([i for i, pid in enumerate(self.project_ids) if pid in allowed], dtype=np.int64)
+            if candidates.size == 0:
+                return []
+
+        scores = _unit_scale(dense[candidates]) * (1 - bm25_weight) + _unit_scale(sparse[candidates]) * bm25_weight
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(self.project_ids[candidates[i]], float(scores[i])) for i in order]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            project_ids=np.asarray(self.project_ids, dtype=str),
+            texts=np.asarray(self.texts, dtype=str),
+            vectors=self.vectors,
+        )
+        os.replace(tmp_path, path)
+
+
+def build_project_index(project_table, embeddings, config, previous: Optional[ProjectIndex] = None) -> ProjectIndex:
+    """
+    ProjectTable -> 프로젝트 텍스트 임베딩 (색인용 임베딩 캐시 사용) -> path.project_index 에 저장.
+    previous: 증분 색인 시 기존 인덱스. 텍스트가 같은 사업은 기존 벡터를 그대로 사용
+    """
+    t0 = time.perf_counter()
+    project_ids = list(project_table.projects)
+    texts = [project_text(project_table.get(pid)) for pid in project_ids]
+    known = dict(zip(previous.texts, previous.vectors)) if previous is not None else {}
+    missing = list(dict.fromkeys(text for text in texts if text not in known))
+    if missing:
+        known.update(zip(missing, np.asarray(embeddings.embed_documents(missing), dtype=np.float32)))
+    vectors = [known[text] for text in texts]
+
+    index = ProjectIndex(project_ids, texts, np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1))
+    path = config['path']['project_index']
+    index.save(path)
+    print(f"[Project Index] saved: {path} ({len(index)} projects, embedded {len(missing)}, {time.perf_counter() - t0:.1f}s)")
+    return index
+
+
+def load_project_index(config):
+    path = config.get('path', {}).get('project_index')
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return ProjectIndex(data["project_ids"].tolist(), data["texts"].tolist(), data["vectors"])
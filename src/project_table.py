@@ -0,0 +1,75 @@
+import os
+import json
+
+from langchain_core.documents import Document
+
+# 청크(Document) 메타데이터에 남기는 필드: 프로젝트 참조 + Chroma 필터 / 출처 표시에 필요한 것만
+CHUNK_FIELDS = ("project_id", "source", "organization", "budget", "round", "pub_date", "deadline", "pub_date_ts", "deadline_ts")
+
+
+def assign_project_ids(announcement_ids, base_names):
+    """
+    프로젝트 키: 공고 번호. 공고 번호가 없거나('nan') CSV 안에서 중복되면 파일명(확장자 제외)으로 대체.
+    """
+    counts = {}
+    for aid in announcement_ids:
+        counts[aid] = counts.get(aid, 0) + 1
+
+    return [
+        aid if aid not in ("", "nan", "Unknown") and counts[aid] == 1 else base_name
+        for aid, base_name in zip(announcement_ids, base_names)
+    ]
+
+
+class ProjectTable:
+    """
+    project_id -> 프로젝트 메타데이터 (사업명, 요약, 일정 등) 를 한 번만 보관.
+    청크에는 project_id 와 필터 필드만 두고, 프롬프트에 넣을 때 hydrate() 로 다시 합침.
+    """
+
+    def __init__(self, projects: dict = None):
+        self.projects = projects or {}
+
+    def __len__(self):
+        return len(self.projects)
+
+    def add(self, project_id: str, metadata: dict):
+        self.projects[project_id] = metadata
+
+    def get(self, project_id: str) -> dict:
+        return self.projects.get(project_id, {})
+
+    def hydrate(self, doc: Document) -> Document:
+        """청크 Document + 프로젝트 메타데이터 (청크 필드가 우선)"""
+        project = self.get(doc.metadata.get("project_id"))
+        if not project:
+            return doc
+        return Document(page_content=doc.page_content, metadata={**project, **doc.metadata}, id=doc.id)
+
+    def hydrate_all(self, docs):
+        return [self.hydrate(doc) for doc in docs]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.projects, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def compact_metadata(metadata: dict) -> dict:
+    return {key: metadata[key] for key in CHUNK_FIELDS if key in metadata}
+
+
+def save_project_table(table: ProjectTable, config):
+    path = config['path']['project_table']
+    table.save(path)
+    print(f"[Project Table] saved: {path} ({len(table)} projects)")
+
+
+def load_project_table(config):
+    path = config.get('path', {}).get('project_table')
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return ProjectTable(json.load(f))
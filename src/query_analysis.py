@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+from pydantic import BaseModel, Field
+from langchain_core.runnables import RunnableLambda
+from langchain_openai import ChatOpenAI
+
+from src.currency import parse_krw
+
+# 1. 스키마 확장
+class SearchQuery(BaseModel):
+    query: str = Field(..., description="검색할 핵심 키워드")
+    organization: Optional[str] = Field(None, description="발주 기관명")
+    min_budget: Optional[float] = Field(None, description="최소 예산 (원)")
+    max_budget: Optional[float] = Field(None, description="최대 예산 (원)")
+    min_budget_exclusive: Optional[bool] = Field(None, description="최소 예산이 '초과'(경계 미포함)이면 True, '이상'이면 None")
+    max_budget_exclusive: Optional[bool] = Field(None, description="최대 예산이 '미만'(경계 미포함)이면 True, '이하'이면 None")
+    deadline_after: Optional[str] = Field(None, description="이 날짜 이후에 마감되는 사업 (YYYY-MM-DD)")
+
+    # [추가] 재공고 필터링용
+    is_rebid: Optional[bool] = Field(None, description="재공고(공고차수 1 이상)인 경우 True, 아니면 None")
+
+    # [추가] 최근 공고 필터링용
+    pub_date_after: Optional[str] = Field(None, description="이 날짜 이후에 공개된 사업 (YYYY-MM-DD)")
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 정규화: NFKC + 공백 정리"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# =========================
+# Rule-based Extractor (LLM 호출 없이 처리 가능한 패턴)
+# =========================
+NUM = r"\d[\d,]*(?:\.\d+)?"
+AMOUNT_RE = re.compile(
+    # "예산이 1억 초과인" 처럼 앞의 주어/뒤의 서술격 조사까지 함께 제거 (남은 질의에 "인 사업" 같은 잔여물 방지)
+    r"(?:(?:예산|사업비|사업\s*금액|금액)\s*(?:이|가|은|는)?\s*)?"
+    r"(?P<amount>" + NUM + r"\s*(?:억|천만|백만|만)(?:\s*" + NUM + r"\s*(?:천만|백만|만|천))?\s*원?|" + NUM + r"\s*원)"
+    r"\s*(?P<op>이상|초과|넘는|이하|미만|까지)(?:인|의|이고|이며)?"
+)
+MIN_OPS = {"이상": False, "초과": True, "넘는": True}   # op -> 경계 미포함 여부
+MAX_OPS = {"이하": False, "까지": False, "미만": True}
+DATE_RE = re.compile(
+    r"(?P<y>20\d{2})\s*(?:[-./]|년)\s*(?P<m>\d{1,2})\s*(?:(?:[-./]|월)\s*(?:(?P<d>\d{1,2})\s*일?)?)?"
+    r"\s*(?P<op>이후|부터)"
+)
+REBID_RE = re.compile(r"\[?재공고\]?(?:\s*(?:된|난|인|한|의)(?=\s|$))?")
+
+# 규칙으로 처리하지 못한 조건 표현이 남아 있으면 LLM에 맡김 (부정/제외, OR 조건 포함)
+UNHANDLED_CUE_RE = re.compile(
+    r"이상|이하|초과|미만|이후|이전|부터|까지|사이|넘는|"
+    r"아닌|아니|제외|말고|빼고|또는|혹은|"
+    r"\d\s*(?:억|천만|백만|만)|\d\s*원|\d{1,2}\s*월|\d{4}\s*[-./]\s*\d|"
+    r"오늘|어제|내일|최근|올해|작년|내년|(?:이번|지난|다음)\s*(?:달|주|해)"
+)
+REQUEST_SUFFIX_RE = re.compile(
+    r"\s*(?:을|를)?\s*(?:알려\s*주세요|알려\s*줘|보여\s*주세요|보여\s*줘|찾아\s*주세요|찾아\s*줘|"
+    r"뭐야|뭔가요|무엇인가요|인가요|있나요|있어)?\s*[?？.!]*$"
+)
+PUB_DATE_CUES = ("공개", "게시", "공고된", "올라온", "등록")
+# 조건을 떼어낸 뒤 이것만 남으면 규칙 결과를 버림 (조사/서술격 조사 잔여물)
+PARTICLE_TOKENS = {"이", "가", "은", "는", "을", "를", "의", "에", "만", "도", "인", "인데", "이고", "이며", "중", "것", "건"}
+
+
+def extract_search_query(text: str) -> Optional[SearchQuery]:
+    """
+    예산("10억 이상"), 날짜("2024-10-01 이후 마감"), "재공고" 패턴을 로컬에서 추출.
+    처리하지 못한 조건 표현이 남아 있으면 None (-> LLM 호출).
+    """
+    text = normalize_query(text)
+    fields = {}
+    rest = text
+
+    for m in AMOUNT_RE.finditer(text):
+        amount = parse_krw(m.group("amount"))
+        if amount is None:
+            return None
+        op = m.group("op")
+        key = "min_budget" if op in MIN_OPS else "max_budget"
+        if key in fields:
+            return None
+        fields[key] = amount
+        if MIN_OPS.get(op) or MAX_OPS.get(op):
+            fields[key + "_exclusive"] = True
+        rest = rest.replace(m.group(0), " ")
+
+    # 모순된 범위 ("10억 이상 1억 이하")는 규칙으로 판단하지 않음
+    low, high = fields.get("min_budget"), fields.get("max_budget")
+    if low is not None and high is not None:
+        if low > high or (low == high and (fields.get("min_budget_exclusive") or fields.get("max_budget_exclusive"))):
+            return None
+
+    for m in DATE_RE.finditer(text):
+        if "마감" in text:
+            key = "deadline_after"
+        elif any(cue in text for cue in PUB_DATE_CUES):
+            key = "pub_date_after"
+        else:
+            return None  # 마감일/공개일 어느 쪽인지 모호
+        if key in fields:
+            return None
+        fields[key] = f"{int(m.group('y')):04d}-{int(m.group('m')):02d}-{int(m.group('d') or 1):02d}"
+        rest = rest.replace(m.group(0), " ")
+
+    if REBID_RE.search(rest):
+        fields["is_rebid"] = True
+        rest = REBID_RE.sub(" ", rest)
+
+    if UNHANDLED_CUE_RE.search(rest):
+        return None
+
+    keywords = normalize_query(REQUEST_SUFFIX_RE.sub("", rest))
+    if not any(token not in PARTICLE_TOKENS for token in keywords.split()):
+        return None
+    return SearchQuery(query=keywords, **fields)
+
+
+# =========================
+# Persistent LRU Cache (정규화 질의 -> SearchQuery)
+# =========================
+class QueryCache:
+    def __init__(self, cache_path: Optional[str], max_size: int = 1000, model: str = ""):
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.model = model
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # LLM 모델이 바뀌면 이전 분석 결과는 사용하지 않음
+                if data.get("model") == model:
+                    self._entries = OrderedDict(data.get("entries", []))
+            except Exception as e:
+                print(f"[Warning] 질의 캐시 로드 실패 ({cache_path}): {e}")
+
+    def get(self, key: str) -> Optional[SearchQuery]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return SearchQuery(**self._entries[key])
+
+    def put(self, key: str, value: SearchQuery):
+        with self._lock:
+            self._entries[key] = value.model_dump()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "entries": list(self._entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+
+def build_query_analyzer(config, with_lookup: bool = False):
+    """
+    질의 -> SearchQuery 변환 Runnable 생성 (invoke / ainvoke 모두 지원).
+    순서: 캐시 조회 -> 규칙 기반 추출(확신할 때만) -> LLM structured output (결과 캐시)
+    with_lookup=True: (Runnable, lookup) 반환. lookup(question) 은 LLM 없이 얻을 수 있는 결과 또는 None
+    """
+    process_cfg = config.get('process', {})
+    llm = ChatOpenAI(
+        model=config['model']['llm'],
+        temperature=0
+    ).with_structured_output(SearchQuery)
+
+    cache = QueryCache(
+        config.get('path', {}).get('query_cache'),
+        max_size=process_cfg.get('query_cache_size', 1000),
+        model=config['model']['llm'],
+    )
+    use_local = process_cfg.get('local_query_parser', True)
+
+    def lookup(question: str) -> Optional[SearchQuery]:
+        """LLM 호출 없이 얻을 수 있는 결과 (캐시 / 규칙 기반)"""
+        cached = cache.get(normalize_query(question))
+        if cached is not None:
+            print("\n[Query Analysis] cache hit")
+            return cached
+
+        if use_local:
+            local = extract_search_query(question)
+            if local is not None:
+                print("\n[Query Analysis] rule-based")
+                return local
+        return None
+
+    def analyze(question) -> SearchQuery:
+        if not isinstance(question, str):
+            return llm.invoke(question)
+
+        result = lookup(question)
+        if result is None:
+            result = llm.invoke(question)
+            cache.put(normalize_query(question), result)
+        return result
+
+    async def aanalyze(question) -> SearchQuery:
+        # evaluate.py / 동시 세션: structured output 호출을 이벤트 루프에서 비동기로 대기
+        if not isinstance(question, str):
+            return await llm.ainvoke(question)
+
+        result = lookup(question)
+        if result is None:
+            result = await llm.ainvoke(question)
+            cache.put(normalize_query(question), result)
+        return result
+
+    analyzer = RunnableLambda(analyze, afunc=aanalyze)
+    return (analyzer, lookup) if with_lookup else analyzer
@@ -1,48 +1,96 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+import time
+import asyncio
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
 from rank_bm25 import BM25Okapi
-import datetime
 
-def tokenize(text: str):
-    # Character Bi-gram Tokenizer for better Korean recall
-    # e.g., "버스예산" -> ["버스", "스예", "예산"]
-    text = text.replace(" ", "")
-    return [text[i:i+2] for i in range(len(text)-1)]
-# 1. 스키마 확장
-class SearchQuery(BaseModel):
-    query: str = Field(..., description="검색할 핵심 키워드")
-    organization: Optional[str] = Field(None, description="발주 기관명")
-    min_budget: Optional[float] = Field(None, description="최소 예산 (원)")
-    max_budget: Optional[float] = Field(None, description="최대 예산 (원)")
-    deadline_after: Optional[str] = Field(None, description="이 날짜 이후에 마감되는 사업 (YYYY-MM-DD)")
-    
-    # [추가] 재공고 필터링용
-    is_rebid: Optional[bool] = Field(None, description="재공고(공고차수 1 이상)인 경우 True, 아니면 None")
-    
-    # [추가] 최근 공고 필터링용
-    pub_date_after: Optional[str] = Field(None, description="이 날짜 이후에 공개된 사업 (YYYY-MM-DD)")
+from src.query_analysis import SearchQuery, build_query_analyzer
+from src.sparse_index import tokenize, doc_key, match_filter, load_sparse_index
+from src.project_table import load_project_table
+from src.section_index import detect_section_intent, load_section_index, normalize_title
+from src.metadata_index import to_epoch, load_metadata_index
+from src.agency_index import load_agency_index
+from src.project_index import PROJECT_K, PROJECT_BM25_WEIGHT, load_project_index
+
+SEARCH_WORKERS = 20   # 비동기 검색 시 Chroma 질의 동시 실행 스레드 수 (evaluate.py 동시성과 동일)
+SPECULATIVE_FETCH_FACTOR = 3   # 추측 검색 후보 수 = retrieval_k * 3 (필터 사후 적용 후에도 retrieval_k 건 확보)
 
 def get_advanced_retriever(vectorstore, config):
-    llm = ChatOpenAI(
-        model=config['model']['llm'], 
-        temperature=0
-    ).with_structured_output(SearchQuery)
+    # 질의 분석: 캐시 -> 규칙 기반 추출 -> LLM structured output
+    analyze_query, lookup_query = build_query_analyzer(config, with_lookup=True)
+
+    # 비동기 경로(ainvoke): Chroma 검색은 전용 스레드 풀에서, 질의 임베딩은 aembed_query 로 실행
+    search_pool = ThreadPoolExecutor(
+        max_workers=config.get('process', {}).get('search_workers', SEARCH_WORKERS),
+        thread_name_prefix="chroma-search",
+    )
+
+    # 코퍼스 전체 BM25 인덱스 (pipeline.py --step index 에서 생성). 없으면 후보군 내 BM25로 동작
+    sparse_index = load_sparse_index(config)
+    if sparse_index is None:
+        print("[Retriever] BM25 인덱스가 없습니다. 의미 검색 후보 내에서만 BM25 리랭킹을 수행합니다.")
+
+    # 프로젝트 테이블: 최종 문서에만 사업명/요약 등 프로젝트 메타데이터를 다시 붙임
+    project_table = load_project_table(config)
+    if project_table is None:
+        print("[Retriever] 프로젝트 테이블이 없습니다. 청크 메타데이터만 사용합니다.")
+
+    # 섹션 인덱스: 예산/일정/평가 질의는 해당 섹션 청크를 후보에 추가하고 점수 가중
+    section_index = load_section_index(config)
+
+    # 발주 기관 별칭 인덱스: "평택시" -> "경기도 평택시" 처럼 질의 기관명을 organization 값으로 변환
+    agency_index = load_agency_index(config) if config.get('process', {}).get('agency_filter', True) else None
+
+    # 컬럼형 메타데이터 인덱스: 필터 선택도를 추정해 허용 ID 목록 / 사후 필터 / Chroma where 중 선택
+    metadata_index = load_metadata_index(config)
+    if metadata_index is None:
+        print("[Retriever] 메타데이터 인덱스가 없습니다. 필터는 Chroma where 로만 처리합니다.")
+
+    # 2단계 검색 (retrieval_mode: two_stage): 프로젝트 인덱스로 상위 사업을 먼저 고르고, 청크 검색은 그 사업 안에서만
+    project_index = None
+    if config.get('process', {}).get('retrieval_mode', 'flat') == 'two_stage':
+        project_index = load_project_index(config)
+        if project_index is None:
+            print("[Retriever] 프로젝트 인덱스가 없습니다. 전체 청크 대상 검색(flat)으로 동작합니다.")
+
+    def fetch_chunks(chunk_ids):
+        if sparse_index is not None:
+            return sparse_index.get_documents(chunk_ids)
+        return vectorstore.get_by_ids(chunk_ids) if chunk_ids else []
 
     def create_chroma_filter(search_query: SearchQuery):
         filters = []
         
-        # [변경] 기관명 필터 제거 (유저 질의와 DB 메타데이터 간 정확한 일치가 어려워 검색 누락 발생)
-        # if search_query.organization:
-        #     filters.append({"organization": {"$eq": search_query.organization}})
+        # 기관명: 질의 표기("평택시")와 메타데이터("경기도 평택시")가 달라 별칭 인덱스로 변환 후 필터
+        # (인덱스가 없거나 기관을 특정할 수 없으면 필터 없이 전체 검색)
+        if agency_index is not None:
+            if search_query.organization:
+                organizations = agency_index.resolve(search_query.organization)
+            else:
+                organizations = agency_index.find_in_text(search_query.query)
+            if len(organizations) == 1:
+                filters.append({"organization": {"$eq": organizations[0]}})
+            elif organizations:
+                filters.append({"organization": {"$in": organizations}})
 
+        # 초과/미만은 경계 미포함 ($gt/$lt)
         if search_query.min_budget is not None:
-            filters.append({"budget": {"$gte": search_query.min_budget}})
+            op = "$gt" if search_query.min_budget_exclusive else "$gte"
+            filters.append({"budget": {op: search_query.min_budget}})
         if search_query.max_budget is not None:
-            filters.append({"budget": {"$lte": search_query.max_budget}})
+            op = "$lt" if search_query.max_budget_exclusive else "$lte"
+            filters.append({"budget": {op: search_query.max_budget}})
+        # 날짜는 epoch 숫자 필드로 비교 (문자열 $gte 는 Chroma 에서 동작하지 않음)
         if search_query.deadline_after:
-            filters.append({"deadline": {"$gte": search_query.deadline_after}})
+            deadline_ts = to_epoch(search_query.deadline_after)
+            if deadline_ts is None:
+                print(f"[Query Analysis] ⚠️ 마감일을 해석할 수 없어 날짜 필터를 생략합니다: {search_query.deadline_after!r}")
+            else:
+                filters.append({"deadline_ts": {"$gte": deadline_ts}})
             
         # [추가] 재공고 필터 (round > 0)
         if search_query.is_rebid:
@@ -50,47 +98,251 @@ def get_advanced_retriever(vectorstore, config):
             
         # [추가] 공개일 기준 검색 (예: 2024-12-01 이후 공개된 것)
         if search_query.pub_date_after:
-            filters.append({"pub_date": {"$gte": search_query.pub_date_after}})
+            pub_date_ts = to_epoch(search_query.pub_date_after)
+            if pub_date_ts is None:
+                print(f"[Query Analysis] ⚠️ 공개일을 해석할 수 없어 날짜 필터를 생략합니다: {search_query.pub_date_after!r}")
+            else:
+                filters.append({"pub_date_ts": {"$gte": pub_date_ts}})
             
         if not filters: return None
         elif len(filters) == 1: return filters[0]
         else: return {"$and": filters}
 
-    def retriever_func(inputs):
+    def prepare(inputs):
         chroma_filter = create_chroma_filter(inputs)
-        
+
         today = datetime.date.today().isoformat()
         print(f"\n[Query Analysis] (Today: {today})")
         print(f" - 검색어: '{inputs.query}'")
         print(f" - 필터: {chroma_filter}")
+        return chroma_filter
 
-        
+    def project_scope(query, chroma_filter, query_embedding):
+        """1단계: 사업명/요약 기준 상위 project_k 개 사업 -> {"project_id": {"$in": [...]}} (선택 못 하면 None)"""
+        t0 = time.perf_counter()
+        # 기관/예산/날짜 필터를 통과하는 청크가 있는 사업 중에서만 선택
+        allowed = metadata_index.distinct("project_id", chroma_filter) if metadata_index is not None else None
+        hits = project_index.search(
+            query, query_embedding,
+            k=config.get('process', {}).get('project_k', PROJECT_K),
+            bm25_weight=config.get('process', {}).get('project_bm25_weight', PROJECT_BM25_WEIGHT),
+            allowed=allowed,
+        )
+        if not hits:
+            return None
+
+        names = [project_table.get(pid).get('project_name', pid) if project_table is not None else pid for pid, _ in hits[:3]]
+        print(f" - 사업 선택: 상위 {len(hits)}/{len(project_index)}개 ({(time.perf_counter() - t0) * 1000:.1f}ms) | {names}")
+        return {"project_id": {"$in": [pid for pid, _ in hits]}}
+
+    def with_scope(chroma_filter, scope):
+        """청크 필터에 사업 범위 조건을 AND 로 추가"""
+        if scope is None:
+            return chroma_filter
+        if chroma_filter is None:
+            return scope
+        if "$and" in chroma_filter:
+            return {"$and": chroma_filter["$and"] + [scope]}
+        return {"$and": [chroma_filter, scope]}
+
+    def semantic_search(query, chroma_filter=None, query_embedding=None, fetch_k=None):
         # 1. Semantic Search (Fetch Candidates)
         # Fetch larger candidate set (retrieval_k = 50)
+        if fetch_k is None:
+            fetch_k = config.get('process', {}).get('retrieval_k', 50)
+        if query_embedding is None:
+            query_embedding = vectorstore.embeddings.embed_query(query)
+        search = vectorstore.similarity_search_by_vector_with_relevance_scores
+
+        plan = metadata_index.plan(chroma_filter, fetch_k, config) if metadata_index is not None and chroma_filter else None
+        if plan is None or plan.mode in ("none", "chroma"):
+            return search(query_embedding, k=fetch_k, filter=chroma_filter)
+
+        print(f" - 필터 계획: {plan.mode} (통과 {plan.matches}/{len(metadata_index)}청크 = {plan.selectivity:.1%}, {plan.filter_ms:.3f}ms)")
+        if plan.mode == "empty":
+            return []
+        if plan.mode == "allow_list":
+            return search(query_embedding, k=plan.fetch_k, ids=plan.ids)
+        # post_filter
+        return metadata_index.keep(plan, search(query_embedding, k=plan.fetch_k))[:fetch_k]
+
+    async def asemantic_search(query, chroma_filter=None, query_embedding=None):
+        # 질의 임베딩(async HTTP) -> Chroma 검색(전용 스레드 풀)
+        if query_embedding is None:
+            query_embedding = await vectorstore.embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(search_pool, partial(semantic_search, query, chroma_filter, query_embedding))
+
+    def retriever_func(inputs):
+        chroma_filter = prepare(inputs)
+        query_embedding = None
+        if project_index is not None:
+            query_embedding = vectorstore.embeddings.embed_query(inputs.query)
+            chroma_filter = with_scope(chroma_filter, project_scope(inputs.query, chroma_filter, query_embedding))
+        semantic_docs = semantic_search(inputs.query, chroma_filter, query_embedding)
+        return fuse_candidates(inputs, chroma_filter, semantic_docs)
+
+    async def aretriever_func(inputs):
+        chroma_filter = prepare(inputs)
+        query_embedding = None
+        if project_index is not None:
+            query_embedding = await vectorstore.embeddings.aembed_query(inputs.query)
+            chroma_filter = with_scope(chroma_filter, project_scope(inputs.query, chroma_filter, query_embedding))
+        semantic_docs = await asemantic_search(inputs.query, chroma_filter, query_embedding)
+
+        # 2~4. BM25 / 섹션 / 점수 결합은 CPU 작업 -> 이벤트 루프를 막지 않도록 executor 에서 실행
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fuse_candidates, inputs, chroma_filter, semantic_docs)
+
+    # --- 추측 검색 (speculative_retrieval) ---
+    # LLM 질의 분석과 동시에 원문 질의로 의미 검색을 시작하고, 분석이 끝나면 필터를 후보에 사후 적용.
+    # 추측 모드에서는 의미 검색/1단계(사업 선택)를 항상 원문 질의 임베딩으로 수행 (캐시/규칙 분석 경로, 재검색 경로 포함)
+    #   -> 같은 질문은 첫 호출(추측 재사용)과 이후 캐시 호출의 검색 결과가 같음. 질의 임베딩은 질문당 1회
+    # 재사용 조건: 분석 필터를 반영한 사업 범위가 추측 범위와 같고, 필터 통과 후보가 일반 경로와 같은 retrieval_k 건 이상
+    #   (추측 검색은 speculative_fetch_k 건을 가져오므로 필터 사후 적용 후에도 상위 retrieval_k 건을 채울 수 있음)
+    # BM25 는 분석된 검색어 기준이므로 분석 후 fuse_candidates 에서 수행
+    spec_lock = threading.Lock()
+    spec_stats = {"reused": 0, "refetched": 0}
+
+    def question_filter(question, chroma_filter, query_embedding):
+        """추측 모드의 청크 필터 -> (필터, 사업 범위 조건 또는 None). two_stage 면 원문 질의로 1단계 수행"""
+        if project_index is None:
+            return chroma_filter, None
+        scope = project_scope(question, chroma_filter, query_embedding)
+        return with_scope(chroma_filter, scope), scope
+
+    def speculative_search(question, query_embedding=None):
+        """-> (semantic_docs, 질의 임베딩, 사업 범위 조건 또는 None)"""
+        if query_embedding is None:
+            query_embedding = vectorstore.embeddings.embed_query(question)
+        chroma_filter, scope = question_filter(question, None, query_embedding)
+        retrieval_k = config.get('process', {}).get('retrieval_k', 50)
+        spec_k = config.get('process', {}).get('speculative_fetch_k', retrieval_k * SPECULATIVE_FETCH_FACTOR)
+        return semantic_search(question, chroma_filter, query_embedding, fetch_k=spec_k), query_embedding, scope
+
+    async def aspeculative_search(question):
+        query_embedding = await vectorstore.embeddings.aembed_query(question)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(search_pool, speculative_search, question, query_embedding)
+
+    def resolve_speculation(question, chroma_filter, speculation):
+        """추측 후보에 분석 필터 적용 -> (최종 필터, 의미 후보 또는 None=재검색 필요, 질의 임베딩)"""
+        semantic_docs, query_embedding, scope = speculation
+        chroma_filter, final_scope = question_filter(question, chroma_filter, query_embedding)
+        retrieval_k = config.get('process', {}).get('retrieval_k', 50)
+        spec_k = config.get('process', {}).get('speculative_fetch_k', retrieval_k * SPECULATIVE_FETCH_FACTOR)
+
+        kept = [(doc, dist) for doc, dist in semantic_docs if match_filter(doc.metadata, chroma_filter)]
+        # 추측 검색이 범위 전체를 가져왔으면(spec_k 미만) 통과 후보가 적어도 그것이 전부
+        reused = final_scope == scope and (len(kept) >= retrieval_k or len(semantic_docs) < spec_k)
+        with spec_lock:
+            spec_stats["reused" if reused else "refetched"] += 1
+            total = spec_stats["reused"] + spec_stats["refetched"]
+            rate = spec_stats["reused"] / total * 100
+        reason = "" if final_scope == scope else ", 사업 범위 변경"
+        print(f" - 추측 검색: {'재사용' if reused else '재검색'} (필터 통과 {len(kept)}/{len(semantic_docs)}건 / 기준 {retrieval_k}건{reason}, "
+              f"누적 재사용 {spec_stats['reused']}/{total} = {rate:.0f}%)")
+        return chroma_filter, (kept[:retrieval_k] if reused else None), query_embedding
+
+    def speculative_func(question):
+        if not isinstance(question, str):
+            return retriever_func(analyze_query.invoke(question))
+
+        # 캐시/규칙 기반으로 바로 분석되는 질의는 추측할 필요 없음 (검색 기준은 추측 경로와 동일)
+        quick = lookup_query(question)
+        if quick is not None:
+            query_embedding = vectorstore.embeddings.embed_query(question)
+            chroma_filter, _ = question_filter(question, prepare(quick), query_embedding)
+            return fuse_candidates(quick, chroma_filter, semantic_search(question, chroma_filter, query_embedding))
+
+        future = search_pool.submit(speculative_search, question)
+        inputs = analyze_query.invoke(question)
+        chroma_filter, semantic_docs, query_embedding = resolve_speculation(question, prepare(inputs), future.result())
+        if semantic_docs is None:
+            semantic_docs = semantic_search(question, chroma_filter, query_embedding)
+        return fuse_candidates(inputs, chroma_filter, semantic_docs)
+
+    async def aspeculative_func(question):
+        if not isinstance(question, str):
+            return await aretriever_func(await analyze_query.ainvoke(question))
+
+        loop = asyncio.get_running_loop()
+        quick = lookup_query(question)
+        if quick is not None:
+            query_embedding = await vectorstore.embeddings.aembed_query(question)
+            chroma_filter, _ = question_filter(question, prepare(quick), query_embedding)
+            semantic_docs = await asemantic_search(question, chroma_filter, query_embedding)
+            return await loop.run_in_executor(None, fuse_candidates, quick, chroma_filter, semantic_docs)
+
+        speculation = asyncio.ensure_future(aspeculative_search(question))
+        try:
+            inputs = await analyze_query.ainvoke(question)
+        except BaseException:
+            speculation.cancel()
+            raise
+        chroma_filter, semantic_docs, query_embedding = resolve_speculation(question, prepare(inputs), await speculation)
+        if semantic_docs is None:
+            semantic_docs = await asemantic_search(question, chroma_filter, query_embedding)
+        return await loop.run_in_executor(None, fuse_candidates, inputs, chroma_filter, semantic_docs)
+
+    def fuse_candidates(inputs, chroma_filter, semantic_docs):
         fetch_k = config.get('process', {}).get('retrieval_k', 50)
         final_k = config.get('process', {}).get('final_k', 10)
         bm25_weight = config.get('process', {}).get('rerank_weight', 0.5)
-        
-        semantic_docs = vectorstore.similarity_search_with_score(
-            inputs.query, k=fetch_k, filter=chroma_filter
-        )
-        
+
+        # 2. Sparse Search (Corpus-wide BM25) -> 의미 검색 후보와 합집합
+        if sparse_index is not None:
+            sparse_k = config.get('process', {}).get('sparse_k', fetch_k)
+            sparse_hits = sparse_index.search(inputs.query, k=sparse_k, where=chroma_filter)
+
+            seen = {doc_key(doc) for doc, _ in semantic_docs}
+            # 의미 검색에 걸리지 않은 키워드 적중 문서는 의미 후보 중 가장 먼 거리로 간주
+            tail_dist = max((dist for _, dist in semantic_docs), default=1.0)
+            sparse_only = 0
+            for doc, _ in sparse_hits:
+                if doc_key(doc) not in seen:
+                    seen.add(doc_key(doc))
+                    semantic_docs.append((doc, tail_dist))
+                    sparse_only += 1
+            print(f" - 후보: 의미 검색 {len(semantic_docs) - sparse_only}건 + BM25 단독 {sparse_only}건")
+
+        # 2-1. Section Index: 상위 프로젝트의 의도 섹션(예: 예산/사업비/추정가격) 청크 추가
+        target_sections = detect_section_intent(inputs) if section_index is not None else ()
+        section_boost = config.get('process', {}).get('section_boost', 0.3)
+        if target_sections and semantic_docs:
+            section_projects = config.get('process', {}).get('section_projects', 5)
+            project_ids = list(dict.fromkeys(doc.metadata.get('project_id') for doc, _ in semantic_docs))[:section_projects]
+            seen = {doc_key(doc) for doc, _ in semantic_docs}
+            missing = [
+                cid for pid in project_ids for cid in section_index.chunk_ids(pid, target_sections)
+                if cid not in seen
+            ]
+            tail_dist = max(dist for _, dist in semantic_docs)
+            added = [doc for doc in fetch_chunks(missing) if match_filter(doc.metadata, chroma_filter)]
+            semantic_docs.extend((doc, tail_dist) for doc in added)
+            print(f" - 섹션 우선: {target_sections} (상위 {len(project_ids)}개 사업, 추가 {len(added)}건)")
+
         if not semantic_docs:
             return []
-            
-        # 2. BM25 Reranking
-        # Prepare corpus from fetched docs
-        docs_content = [doc.page_content for doc, _ in semantic_docs]
-        tokenized_corpus = [tokenize(content) for content in docs_content]
-        
-        if not tokenized_corpus: # In case of empty content
-             return [doc for doc, _ in semantic_docs[:final_k]]
-             
-        bm25 = BM25Okapi(tokenized_corpus)
-        tokenized_query = tokenize(inputs.query)
-        bm25_scores = bm25.get_scores(tokenized_query)
+
+        # 3. BM25 Scoring
+        if sparse_index is not None:
+            # 코퍼스 전체 IDF 기준 점수 (질의마다 인덱스를 다시 만들지 않음)
+            bm25_scores = sparse_index.score_documents(inputs.query, [doc for doc, _ in semantic_docs])
+        else:
+            # Prepare corpus from fetched docs
+            docs_content = [doc.page_content for doc, _ in semantic_docs]
+            tokenized_corpus = [tokenize(content) for content in docs_content]
+
+            if not tokenized_corpus: # In case of empty content
+                 docs = [doc for doc, _ in semantic_docs[:final_k]]
+                 return project_table.hydrate_all(docs) if project_table is not None else docs
+
+            bm25 = BM25Okapi(tokenized_corpus)
+            tokenized_query = tokenize(inputs.query)
+            bm25_scores = bm25.get_scores(tokenized_query)
         
-        # 3. Combine Scores & Sort
+        # 4. Combine Scores & Sort
         # Semantic Score is distance (lower is better, typically 0.0~1.5)
         # BM25 Score is similarity (higher is better, typically 0~20+)
         # We need to invert Semantic Score or Normalize.
@@ -118,6 +370,8 @@ def get_advanced_retriever(vectorstore, config):
             
             # Hybrid Score
             hybrid_score = (sem_score * (1 - bm25_weight)) + (bm25_score * bm25_weight)
+            if target_sections and normalize_title(doc.metadata.get('section_title')) in target_sections:
+                hybrid_score *= 1 + section_boost
             
             reranked_results.append({
                 "doc": doc,
@@ -139,6 +393,10 @@ def get_advanced_retriever(vectorstore, config):
 
         # Return just the docs
         final_docs = [item['doc'] for item in reranked_results[:final_k]]
+        if project_table is not None:
+            final_docs = project_table.hydrate_all(final_docs)
         return final_docs
 
-    return llm | RunnableLambda(retriever_func)
\ No newline at end of file
+    if config.get('process', {}).get('speculative_retrieval', False):
+        return RunnableLambda(speculative_func, afunc=aspeculative_func)
+    return analyze_query | RunnableLambda(retriever_func, afunc=aretriever_func)
\ No newline at end of file
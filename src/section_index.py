@@ -0,0 +1,105 @@
+import os
+import re
+import json
+
+# 질의 의도 -> (질의 단서, 해당 내용이 들어있는 chunker 섹션 제목)
+# 섹션 제목은 chunker SECTION_TITLE_PATTERNS 가 붙이는 이름 기준, 공백을 제거한 형태로 비교
+#   ("소요 예산" / "소요예산", "추진 일정" / "추진일정" 이 같은 섹션)
+SECTION_INTENTS = {
+    "budget": {
+        "cues": ("예산", "사업비", "사업 금액", "사업금액", "금액", "추정가격", "비용", "얼마"),
+        "sections": ("예산", "소요예산", "사업비", "추정가격"),
+    },
+    "schedule": {
+        "cues": ("일정", "기간", "마감", "언제", "납기"),
+        "sections": ("일정", "추진일정", "수행일정"),
+    },
+    "evaluation": {
+        "cues": ("평가", "배점", "심사"),
+        "sections": ("평가기준", "평가방법"),
+    },
+}
+
+
+def normalize_title(title) -> str:
+    """섹션 제목 비교용: 공백 제거"""
+    return re.sub(r"\s+", "", title or "")
+
+
+def detect_section_intent(search_query) -> tuple:
+    """SearchQuery -> 우선할 섹션 제목들 (의도가 없으면 빈 tuple)"""
+    text = search_query.query or ""
+    sections = []
+    for name, intent in SECTION_INTENTS.items():
+        budget_filter = name == "budget" and (
+            search_query.min_budget is not None or search_query.max_budget is not None
+        )
+        if budget_filter or any(cue in text for cue in intent["cues"]):
+            sections.extend(normalize_title(title) for title in intent["sections"])
+    return tuple(sections)
+
+
+class SectionIndex:
+    """project_id -> section_title (공백 제거) -> [chunk_id, ...]"""
+
+    def __init__(self, sections: dict = None):
+        self.sections = {}
+        # 이전 형식(원문 제목 키)으로 저장된 인덱스도 정규화해서 읽음
+        for project_id, titles in (sections or {}).items():
+            project = self.sections.setdefault(project_id, {})
+            for title, chunk_ids in titles.items():
+                project.setdefault(normalize_title(title), []).extend(chunk_ids)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def add(self, doc):
+        title = normalize_title(doc.metadata.get("section_title"))
+        if not title:
+            return
+        project = self.sections.setdefault(doc.metadata.get("project_id", ""), {})
+        project.setdefault(title, []).append(doc.metadata["chunk_id"])
+
+    def remove(self, chunk_ids):
+        """chunk_id 삭제 (증분 색인). 비는 섹션/프로젝트는 함께 제거"""
+        stale = set(chunk_ids)
+        for project_id in list(self.sections):
+            titles = {title: [cid for cid in ids if cid not in stale] for title, ids in self.sections[project_id].items()}
+            titles = {title: ids for title, ids in titles.items() if ids}
+            if titles:
+                self.sections[project_id] = titles
+            else:
+                del self.sections[project_id]
+
+    def chunk_ids(self, project_id: str, section_titles) -> list:
+        project = self.sections.get(project_id, {})
+        titles = dict.fromkeys(normalize_title(title) for title in section_titles)
+        return [cid for title in titles for cid in project.get(title, [])]
+
+
+def save_section_index(index: SectionIndex, config):
+    path = config['path']['section_index']
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index.sections, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    n_chunks = sum(len(ids) for project in index.sections.values() for ids in project.values())
+    print(f"[Section Index] saved: {path} ({len(index)} projects, {n_chunks} chunks with section titles)")
+
+
+def build_section_index(docs, config):
+    index = SectionIndex()
+    for doc in docs:
+        index.add(doc)
+    save_section_index(index, config)
+    return index
+
+
+def load_section_index(config):
+    path = config.get('path', {}).get('section_index')
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return SectionIndex(json.load(f))
@@ -0,0 +1,300 @@
+import io
+import os
+import json
+import math
+import mmap
+import pickle
+from array import array
+from collections import Counter, defaultdict
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.metadata_index import MetadataIndex
+
+# BM25 파라미터 (rank_bm25 BM25Okapi 기본값)
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+
+def tokenize(text: str):
+    # Character Bi-gram Tokenizer for better Korean recall
+    # e.g., "버스예산" -> ["버스", "스예", "예산"]
+    text = text.replace(" ", "")
+    return [text[i:i+2] for i in range(len(text)-1)]
+
+
+def doc_key(doc) -> str:
+    """Chroma 결과와 BM25 결과를 합칠 때 쓰는 문서 식별 키"""
+    return doc.metadata.get('chunk_id') or doc.page_content
+
+
+def match_filter(metadata: dict, where) -> bool:
+    """Chroma where 필터(create_chroma_filter 형식)를 메타데이터 dict에 적용"""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(match_filter(metadata, w) for w in where["$and"])
+    if "$or" in where:
+        return any(match_filter(metadata, w) for w in where["$or"])
+
+    for field, cond in where.items():
+        value = metadata.get(field)
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        for op, target in cond.items():
+            if op == "$eq" and not value == target: return False
+            if op == "$ne" and not value != target: return False
+            if op == "$in" and value not in target: return False
+            if op == "$nin" and value in target: return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                try:
+                    if op == "$gt" and not value > target: return False
+                    if op == "$gte" and not value >= target: return False
+                    if op == "$lt" and not value < target: return False
+                    if op == "$lte" and not value <= target: return False
+                except TypeError:
+                    return False
+    return True
+
+
+class SparseIndex:
+    """
+    전체 코퍼스(모든 청크) 대상 BM25 인덱스.
+    - IDF는 코퍼스 전체 기준으로 한 번만 계산 (rank_bm25 BM25Okapi 와 같은 식 / 기본값)
+    - 토큰별 posting list로 저장하여 질의 시 질의 토큰에 해당하는 문서만 스코어링
+    - 문서 본문/메타데이터는 메모리에 두지 않고 JSONL 레코드(행마다 {"id", "text", "metadata"})로 기록,
+      결과 문서만 offset 으로 잘라 읽음. where 필터는 컬럼형 MetadataIndex 마스크로 처리
+    """
+
+    def __init__(self, docs, docs_file=None, k1: float = BM25_K1, b: float = BM25_B, epsilon: float = BM25_EPSILON):
+        # docs 는 리스트 또는 Document 제너레이터 (한 번만 순회).
+        # docs_file: 레코드를 쓸 바이너리 파일 (None 이면 메모리 버퍼 -> 프로젝트 인덱스처럼 작은 코퍼스용)
+        self.k1, self.b, self.epsilon = k1, b, epsilon
+        out = docs_file if docs_file is not None else io.BytesIO()
+        self.metadata = MetadataIndex()
+        self.keys = []
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.postings = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._append(docs, out)
+        self.docs_path = None
+        self._buffer = out.getvalue() if docs_file is None else None
+        self._docs_file = None
+        self._docs = self._buffer
+
+    def _append(self, docs, out):
+        """docs 를 기존 문서 뒤에 추가 (레코드는 out 에 이어 씀) -> posting / 문서 길이 / IDF 갱신"""
+        start = len(self.keys)
+        offsets = [int(self._offsets[-1])]
+        doc_len = []
+        postings = defaultdict(lambda: (array("i"), array("f")))
+
+        for i, doc in enumerate(docs, start):
+            tokens = tokenize(doc.page_content)
+            doc_len.append(len(tokens))
+            # 문서별 빈도는 바로 posting 에 누적 (문서별 Counter 를 보관하지 않음)
+            for token, tf in Counter(tokens).items():
+                ids, tfs = postings[token]
+                ids.append(i)
+                tfs.append(tf)
+
+            key = doc_key(doc)
+            line = json.dumps({"id": key, "text": doc.page_content, "metadata": doc.metadata}, ensure_ascii=False).encode("utf-8") + b"\n"
+            out.write(line)
+            offsets.append(offsets[-1] + len(line))
+            self.keys.append(key)
+            self.metadata.add(Document(page_content="", metadata={**doc.metadata, "chunk_id": key}))
+
+        self.doc_len = np.concatenate([self.doc_len, np.array(doc_len, dtype=np.float32)])
+        self.avgdl = float(self.doc_len.sum() / len(self.doc_len)) if len(self.doc_len) else 0.0
+        for token, (ids, tfs) in postings.items():
+            ids, tfs = np.frombuffer(ids, dtype=np.int32), np.frombuffer(tfs, dtype=np.float32)
+            if token in self.postings:
+                old_ids, old_tfs = self.postings[token]
+                ids, tfs = np.concatenate([old_ids, ids]), np.concatenate([old_tfs, tfs])
+            self.postings[token] = (ids, tfs)
+        self.idf = self._calc_idf(len(self.doc_len))
+        self.key_to_pos = {key: i for i, key in enumerate(self.keys)}
+        self._offsets = np.concatenate([self._offsets, np.array(offsets[1:], dtype=np.int64)])
+
+    def update(self, removed_keys, docs, docs_file=None):
+        """
+        증분 색인: removed_keys 문서 삭제 후 docs 추가.
+        남은 문서의 레코드는 docs_file 로 바이트 그대로 복사하고 posting 은 위치만 다시 매김 (재토큰화 없음)
+        """
+        removed = set(removed_keys)
+        keep = np.array([key not in removed for key in self.keys], dtype=bool)
+        remap = np.full(len(self.keys), -1, dtype=np.int32)
+        remap[keep] = np.arange(int(keep.sum()), dtype=np.int32)
+
+        out = docs_file if docs_file is not None else io.BytesIO()
+        starts, ends = self._offsets[:-1][keep], self._offsets[1:][keep]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            out.write(self._docs[start:end])
+        self.close()
+
+        self._offsets = np.concatenate([[0], np.cumsum(ends - starts)]).astype(np.int64)
+        self.keys = [key for key, kept in zip(self.keys, keep.tolist()) if kept]
+        self.doc_len = self.doc_len[keep]
+        self.metadata.remove(removed)
+        postings = {}
+        for token, (ids, tfs) in self.postings.items():
+            kept = keep[ids]
+            if kept.any():
+                postings[token] = (remap[ids[kept]], tfs[kept])
+        self.postings = postings
+
+        self._append(docs, out)
+        self.docs_path = None
+        self._buffer = out.getvalue() if docs_file is None else None
+        self._docs = self._buffer
+        return self
+
+    def _calc_idf(self, corpus_size: int) -> dict:
+        """BM25Okapi._calc_idf 와 동일: 음수 IDF(절반 이상 문서에 등장)는 epsilon * 평균 IDF"""
+        idf = {
+            token: math.log(corpus_size - len(ids) + 0.5) - math.log(len(ids) + 0.5)
+            for token, (ids, _) in self.postings.items()
+        }
+        if idf:
+            eps = self.epsilon * (sum(idf.values()) / len(idf))
+            for token, value in idf.items():
+                if value < 0:
+                    idf[token] = eps
+        return idf
+
+    # ---------- 문서 레코드 ----------
+    def attach(self, docs_path: str):
+        """디스크 레코드 파일 연결 (mmap). 크기가 offset 과 다르면 인덱스와 짝이 맞지 않는 파일"""
+        self.close()
+        size = os.path.getsize(docs_path)
+        if size != int(self._offsets[-1]):
+            raise ValueError(f"[Sparse Index] 문서 파일 크기가 인덱스와 다릅니다: {docs_path} ({size} != {int(self._offsets[-1])})")
+        self.docs_path = docs_path
+        if size:
+            self._docs_file = open(docs_path, "rb")
+            self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._docs_file is not None:
+            self._docs.close()
+            self._docs_file.close()
+            self._docs_file, self._docs = None, self._buffer
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_docs_file"], state["_docs"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        if "docs" in state:
+            # 이전 형식 (Document 리스트를 통째로 pickle) -> 메모리 레코드로 다시 구성
+            state = SparseIndex(state["docs"], k1=state["k1"], b=state["b"]).__dict__
+        self.__dict__.update(state)
+        self._docs_file, self._docs = None, self._buffer
+
+    def _document(self, pos: int) -> Document:
+        start, end = int(self._offsets[pos]), int(self._offsets[pos + 1])
+        record = json.loads(self._docs[start:end])
+        return Document(page_content=record["text"], metadata=record["metadata"])
+
+    def get_documents(self, keys) -> list:
+        """doc_key(chunk_id) 목록 -> Document 목록 (인덱스에 없는 키는 건너뜀)"""
+        return [self._document(self.key_to_pos[key]) for key in keys if key in self.key_to_pos]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """BM25Okapi.get_scores와 동일한 점수 (posting list 기반)"""
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)
+        for token in tokenize(query):
+            if token not in self.postings:
+                continue
+            ids, tfs = self.postings[token]
+            scores[ids] += self.idf.get(token, 0.0) * (tfs * (self.k1 + 1) / (tfs + norm[ids]))
+        return scores
+
+    def score_documents(self, query: str, docs) -> np.ndarray:
+        """주어진 후보 문서들의 (코퍼스 IDF 기준) BM25 점수. 인덱스에 없는 문서는 0점."""
+        all_scores = self.get_scores(query)
+        return np.array([
+            all_scores[self.key_to_pos[doc_key(doc)]] if doc_key(doc) in self.key_to_pos else 0.0
+            for doc in docs
+        ], dtype=np.float32)
+
+    def search(self, query: str, k: int, where=None):
+        """상위 k개 (Document, BM25 점수) 반환. 0점 문서는 제외."""
+        scores = self.get_scores(query)
+        # 컬럼 인덱스로 처리 가능한 필터는 마스크로 한 번에, 아니면 레코드를 읽어 match_filter
+        mask = self.metadata.mask(where) if where else None
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        order = np.argsort(-scores, kind="stable")
+
+        results = []
+        for i in order:
+            if scores[i] <= 0 or len(results) >= k:
+                break
+            doc = self._document(i)
+            if mask is not None or match_filter(doc.metadata, where):
+                results.append((doc, float(scores[i])))
+        return results
+
+
+def sparse_docs_path(index_path: str) -> str:
+    return index_path + ".docs.jsonl"
+
+
+def _write_sparse_index(index_path: str, write_docs):
+    """write_docs(레코드 파일) -> SparseIndex. 임시 파일에 쓴 뒤 교체 (pickle + 문서 JSONL)"""
+    docs_path = sparse_docs_path(index_path)
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+
+    with open(docs_path + ".tmp", "wb") as f:
+        index = write_docs(f)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(docs_path + ".tmp", docs_path)
+    os.replace(tmp_path, index_path)
+    index.attach(docs_path)
+    return index
+
+
+def build_sparse_index(docs, config):
+    """문서 스트림 -> posting list (pickle) + 문서 레코드 (JSONL). 본문은 파일로 바로 쓰므로 메모리에 쌓이지 않음"""
+    index_path = config['path']['sparse_index']
+    index = _write_sparse_index(index_path, lambda f: SparseIndex(docs, docs_file=f))
+    print(f"[Sparse Index] BM25 index saved: {index_path} ({len(index)} chunks, {len(index.postings)} tokens)")
+    return index
+
+
+def update_sparse_index(index: SparseIndex, removed_keys, docs, config):
+    """증분 색인: 바뀐/삭제된 소스의 청크만 반영해 같은 경로에 다시 저장"""
+    index_path = config['path']['sparse_index']
+    n_before = len(index)
+    removed_keys = list(removed_keys)
+    index = _write_sparse_index(index_path, lambda f: index.update(removed_keys, docs, docs_file=f))
+    print(f"[Sparse Index] BM25 index updated: {index_path} ({n_before} -> {len(index)} chunks, "
+          f"removed {len(removed_keys)}, {len(index.postings)} tokens)")
+    return index
+
+
+def load_sparse_index(config):
+    index_path = config.get('path', {}).get('sparse_index')
+    if not index_path or not os.path.exists(index_path):
+        return None
+
+    with open(index_path, "rb") as f:
+        index = pickle.load(f)
+    if index._buffer is None:
+        try:
+            index.attach(sparse_docs_path(index_path))
+        except (OSError, ValueError) as e:
+            print(f"[Sparse Index] ⚠️ 문서 파일을 열 수 없습니다 ({e}). --step index 로 다시 구축하세요.")
+            return None
+    return index
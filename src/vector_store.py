@@ -0,0 +1,61 @@
+import os
+
+from langchain_chroma import Chroma
+
+# =========================
+# 벡터 저장소 백엔드 선택 (config vector_store.backend)
+#   chroma: langchain_chroma.Chroma (SQLite + HNSW, 기본값)
+#   faiss : src/faiss_store.FaissVectorStore (프로세스 내 HNSW / IVF-PQ, mmap 로드) -> faiss-cpu 필요
+# 두 백엔드 모두 같은 persist 디렉터리(path.vector_db)와 index_manifest.json 을 사용
+# =========================
+VECTOR_BACKEND = "chroma"
+
+
+def vector_backend(config) -> str:
+    backend = config.get('vector_store', {}).get('backend', VECTOR_BACKEND)
+    if backend not in ("chroma", "faiss"):
+        raise ValueError(f"[Vector Store] 알 수 없는 backend: {backend} (chroma | faiss)")
+    return backend
+
+
+def open_vector_store(config, embeddings):
+    """색인용: 설정된 백엔드의 저장소를 열거나 새로 만듦"""
+    db_path = config['path']['vector_db']
+    if vector_backend(config) == "faiss":
+        # faiss-cpu 는 이 백엔드를 쓸 때만 import
+        from src.faiss_store import FaissVectorStore
+        return FaissVectorStore(db_path, embeddings, config.get('vector_store', {}))
+    return Chroma(persist_directory=db_path, embedding_function=embeddings)
+
+
+def load_vector_store(config, embeddings):
+    """검색용: 저장소가 없으면 None"""
+    db_path = config['path']['vector_db']
+    if not os.path.exists(db_path):
+        return None
+    store = open_vector_store(config, embeddings)
+    if vector_backend(config) == "faiss" and not store.exists():
+        return None
+    return store
+
+
+def upsert_vectors(store, ids, embeddings, metadatas, documents):
+    """이미 계산된 임베딩을 chunk_id 기준으로 upsert"""
+    if hasattr(store, "upsert_vectors"):
+        store.upsert_vectors(ids, embeddings, metadatas, documents)
+    else:
+        store._collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+
+def count_vectors(store) -> int:
+    return len(store) if hasattr(store, "upsert_vectors") else store._collection.count()
+
+
+def writes_are_durable(store) -> bool:
+    """Chroma: upsert 즉시 디스크 반영 / FAISS: persist() 에서 한 번에 반영"""
+    return not hasattr(store, "upsert_vectors")
+
+
+def persist_vector_store(store):
+    if hasattr(store, "upsert_vectors"):
+        store.persist()
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from src.agency_index import agency_aliases, build_agency_index, load_agency_index, normalize_agency
+
+AGENCIES = [
+    "경기도 평택시", "경기도 수원시", "서울특별시", "서울특별시 여성가족재단", "고려대학교", "서울대학교",
+    "남서울대학교", "한국철도공사 (용역)", "한국수자원공사", "(재)경기도경제과학진흥원", "부산광역시 해운대구",
+]
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("agency")
+    pd.DataFrame({"발주 기관": AGENCIES + ["경기도 평택시", None]}).to_csv(tmp / "data_list.csv", index=False)
+    config = {"path": {"csv_file": str(tmp / "data_list.csv"), "agency_index": str(tmp / "agency_index.json")}}
+    build_agency_index(config)
+    return load_agency_index(config)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("경기도 평택시", "경기도평택시"),
+    ("한국철도공사 (용역)", "한국철도공사"),
+    ("(재)경기도경제과학진흥원", "경기도경제과학진흥원"),
+    ("주식회사 코이카", "코이카"),
+    ("KOICA 입찰공고", "koica"),
+    ("ＫＯＩＣＡ", "koica"),          # 전각 -> NFKC
+    ("  서울 · 대학교 ", "서울대학교"),
+])
+def test_normalize_agency(name, expected):
+    assert normalize_agency(name) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("경기도 평택시", {"경기도평택시", "경기도평택", "평택시", "평택", "경기평택시", "경기평택"}),
+    ("서울특별시 여성가족재단", {"서울특별시여성가족재단", "여성가족재단", "서울시여성가족재단", "서울여성가족재단"}),
+    ("고려대학교", {"고려대학교", "고려대"}),
+    ("한국철도공사 (용역)", {"한국철도공사", "철도공사", "코레일", "korail"}),
+])
+def test_agency_aliases(name, expected):
+    assert agency_aliases(name) == expected
+
+
+def test_load_missing_returns_none(tmp_path):
+    assert load_agency_index({"path": {"agency_index": str(tmp_path / "missing.json")}}) is None
+    assert load_agency_index({"path": {}}) is None
+
+
+def test_build_dedups_and_sorts(index):
+    assert index.agencies == sorted(AGENCIES)
+
+
+RESOLVE_CASES = [
+    # 정확 일치 (정식 명칭 / 약칭) -> 필터 사용
+    ("평택시", True, ["경기도 평택시"]),
+    ("평택", True, ["경기도 평택시"]),
+    ("코레일", True, ["한국철도공사 (용역)"]),
+    ("수자원공사", True, ["한국수자원공사"]),
+    ("서울시", True, ["서울특별시"]),
+    ("해운대구", True, ["부산광역시 해운대구"]),
+    ("서울대", True, ["서울대학교"]),
+    # 토큰 경계 부분 일치 -> exact_only 에서는 제외
+    ("경기도", True, []),
+    ("경기도", False, ["경기도 수원시", "경기도 평택시"]),
+    ("경기도 평택시 버스정보시스템", False, ["경기도 평택시"]),    # 기관명 전체가 질의 안에 토큰 단위로
+    # 어절 중간 일치("남서울대학교" 안의 "서울대학교")는 부분 일치로 보지 않음 -> 정확 일치만
+    ("서울대학교", True, ["서울대학교"]),
+    # 오타 -> bigram 유사도 (필터에는 사용하지 않음)
+    ("고려대학", False, ["고려대학교"]),
+    ("고려대학", True, []),
+    ("없는 기관", False, []),
+    ("", False, []),
+]
+
+
+@pytest.mark.parametrize("name, exact_only, expected", RESOLVE_CASES)
+def test_resolve(index, name, exact_only, expected):
+    assert index.resolve(name, exact_only=exact_only) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("평택시의 버스정보시스템 사업 예산은?", ["경기도 평택시"]),
+    ("코레일 유지보수 사업", ["한국철도공사 (용역)"]),
+    ("남서울대학교 학사 시스템", ["남서울대학교"]),      # 가장 긴 별칭 기준 (서울대학교 아님)
+    ("서울대학교 학사 시스템", ["서울대학교"]),
+    ("서울여성가족재단 홈페이지", ["서울특별시 여성가족재단"]),
+    ("수원 지역 사업", []),                               # MIN_TEXT_ALIAS_LEN 미만 별칭은 본문에서 찾지 않음
+    ("클라우드 전환 사업", []),
+])
+def test_find_in_text(index, text, expected):
+    assert index.find_in_text(text) == expected
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.currency import parse_krw, parse_krw_series
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARSE_CASES = [
+    # 숫자 / 쉼표 / 원
+    ("150000000", 150_000_000),
+    ("150,000,000원", 150_000_000),
+    ("1,234", 1_234),
+    ("0원", 0),
+    (120_000_000, 120_000_000),
+    (3.0, 3),
+    # 큰 단위 + 자리 묶음
+    ("3.5억", 350_000_000),
+    ("10억원", 1_000_000_000),
+    ("1억 5천만원", 150_000_000),
+    ("1억5,000만원", 150_000_000),
+    ("5천만원", 50_000_000),
+    ("2백만원", 2_000_000),
+    ("12만 3천원", 123_000),
+    ("십만원", 100_000),
+    ("억원", 100_000_000),
+    ("1조 2천억", 1_200_000_000_000),
+    ("1억 2천", 100_002_000),
+    # 앞뒤 표기
+    ("약 3억원 (부가세 포함)", 300_000_000),
+    ("금 5천만원정", 50_000_000),
+    # 해석 불가
+    ("", None),
+    ("미정", None),
+    ("abc", None),
+    ("금 일억원정", None),
+    (None, None),
+    (float("nan"), None),
+]
+
+
+@pytest.mark.parametrize("value, expected", PARSE_CASES)
+def test_parse_krw(value, expected):
+    assert parse_krw(value) == expected
+
+
+def test_parse_krw_series_matches_scalar():
+    # 문자열 컬럼 (object dtype) 경로: 숫자형 값은 제외
+    values = pd.Series([v for v, _ in PARSE_CASES if not isinstance(v, (int, float)) or pd.isna(v)], dtype=object)
+    result = parse_krw_series(values)
+    expected = [np.nan if parse_krw(v) is None else parse_krw(v) for v in values]
+    np.testing.assert_array_equal(result.to_numpy(), np.asarray(expected, dtype=float))
+    assert result.index.equals(values.index)
+
+
+def test_parse_krw_series_numeric_column():
+    result = parse_krw_series(pd.Series([1, 2, None]))
+    assert result.dtype == float
+    assert result.iloc[:2].tolist() == [1.0, 2.0] and np.isnan(result.iloc[2])
+
+
+def test_rag_llm_copy_is_in_sync():
+    """RAG_LLM 은 자체 src 패키지를 쓰므로 사본을 둠 -> 줄바꿈 외에는 같아야 함"""
+    with open(os.path.join(ROOT, "src", "currency.py"), encoding="utf-8") as f:
+        original = f.read()
+    with open(os.path.join(ROOT, "RAG_LLM", "src", "currency.py"), encoding="utf-8") as f:
+        copy = f.read()
+    assert copy == original
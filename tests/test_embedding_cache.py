@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.embedding_cache import CachedEmbeddings, embedding_key
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """embed_documents 에 실제로 넘어간 텍스트를 기록"""
+    calls: list = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def make_cache(tmp_path, model="text-embedding-3-small"):
+    inner = CountingEmbeddings(size=8, calls=[])
+    return CachedEmbeddings(inner, str(tmp_path / "cache" / "embeddings.sqlite3"), model), inner
+
+
+def test_embedding_key_depends_on_model_and_text():
+    assert embedding_key("m", "a") == embedding_key("m", "a")
+    assert embedding_key("m", "a") != embedding_key("m2", "a")
+    assert embedding_key("m", "ab") != embedding_key("ma", "b")
+
+
+def test_hits_skip_api_and_duplicates_are_embedded_once(tmp_path):
+    cache, inner = make_cache(tmp_path)
+    first = cache.embed_documents(["가", "나", "가"])
+    assert inner.calls == [["가", "나"]]
+    assert first[0] == first[2]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    second = cache.embed_documents(["나", "다", "가"])
+    assert inner.calls[-1] == ["다"]
+    assert second[0] == first[1] and second[2] == first[0]
+    assert cache.stats() == "hit 3 / miss 3 (hit rate 50.0%)"
+    cache.close()
+
+
+def test_cached_vectors_are_float32_and_persist(tmp_path):
+    cache, inner = make_cache(tmp_path)
+    fresh = cache.embed_documents(["사업 개요"])[0]
+    expected = np.asarray(inner.embed_query("사업 개요"), dtype=np.float32)
+    np.testing.assert_array_equal(np.asarray(fresh, dtype=np.float32), expected)
+    cache.close()
+
+    # 첫 실행(API)과 재실행(캐시)의 결과가 비트 단위로 같아야 함
+    reopened, inner = make_cache(tmp_path)
+    again = reopened.embed_documents(["사업 개요"])[0]
+    assert inner.calls == []
+    assert again == fresh
+    reopened.close()
+
+
+def test_model_change_misses_cache(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    cache.embed_documents(["가"])
+    cache.close()
+
+    other, inner = make_cache(tmp_path, model="text-embedding-3-large")
+    other.embed_documents(["가"])
+    assert inner.calls == [["가"]]
+    other.close()
+
+
+def test_embed_query_is_not_cached(tmp_path):
+    cache, inner = make_cache(tmp_path)
+    assert cache.embed_query("질문") == inner.embed_query("질문")
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.close()
+
+
+def test_concurrent_batches(tmp_path):
+    cache, inner = make_cache(tmp_path)
+    batches = [[f"청크 {i}" for i in range(start, start + 50)] for start in range(0, 500, 25)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(cache.embed_documents, batches))
+
+    for batch, vectors in zip(batches, results):
+        expected = np.asarray([inner.embed_query(text) for text in batch], dtype=np.float32)
+        np.testing.assert_array_equal(np.asarray(vectors, dtype=np.float32), expected)
+    assert cache.hits + cache.misses == sum(len(b) for b in batches)
+    # 동시에 같은 텍스트를 놓칠 수는 있어도 모든 텍스트가 캐시에 들어가야 함
+    calls = len(inner.calls)
+    cache.embed_documents([f"청크 {i}" for i in range(525)])
+    assert len(inner.calls) == calls
+    cache.close()
@@ -0,0 +1,179 @@
+import os
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+pytest.importorskip("faiss")
+
+from src.faiss_store import STAGE_DOCS_FILE, FaissVectorStore, OFFSETS_FILE
+from src.sparse_index import match_filter
+from src.vector_store import (
+    count_vectors, load_vector_store, open_vector_store, persist_vector_store, upsert_vectors, vector_backend,
+    writes_are_durable,
+)
+
+N, DIM = 600, 16
+
+
+def make_rows(n=N, seed=0, prefix="c"):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, DIM)).astype(np.float32)
+    ids = [f"{prefix}{i:04d}" for i in range(n)]
+    metadatas = [
+        {"project_id": f"P{i % 20}", "round": i % 4, "budget": float(i * 1_000_000),
+         "section_title": "소요 예산" if i % 7 == 0 else "사업 개요"}
+        for i in range(n)
+    ]
+    texts = [f"청크 {cid} 본문" for cid in ids]
+    return ids, vectors, metadatas, texts
+
+
+def build_store(path, settings=None, rows=None):
+    ids, vectors, metadatas, texts = rows or make_rows()
+    store = FaissVectorStore(str(path), DeterministicFakeEmbedding(size=DIM), settings)
+    store.upsert_vectors(ids, vectors, metadatas, texts)
+    store.persist()
+    return store
+
+
+def brute_force(vectors, query, k, allowed=None):
+    dists = ((vectors - query) ** 2).sum(axis=1)
+    rows = np.arange(len(vectors)) if allowed is None else np.flatnonzero(allowed)
+    order = rows[np.argsort(dists[rows], kind="stable")][:k]
+    return order.tolist(), dists[order]
+
+
+def result_rows(hits):
+    return [int(doc.id[1:]) for doc, _ in hits]
+
+
+@pytest.mark.parametrize("index_type, min_recall", [("flat", 1.0), ("hnsw", 0.95), ("ivfpq", 0.8)])
+def test_search_matches_brute_force(tmp_path, index_type, min_recall):
+    ids, vectors, metadatas, texts = make_rows()
+    store = build_store(tmp_path / "db", {"index_type": index_type})
+    queries = np.random.default_rng(1).normal(size=(20, DIM)).astype(np.float32)
+
+    recall = []
+    for query in queries:
+        hits = store.similarity_search_by_vector_with_relevance_scores(query, k=10)
+        expected, expected_dists = brute_force(vectors, query, 10)
+        recall.append(len(set(result_rows(hits)) & set(expected)) / 10)
+        if index_type == "flat":
+            assert result_rows(hits) == expected
+            np.testing.assert_allclose([score for _, score in hits], expected_dists, rtol=1e-4)
+    assert np.mean(recall) >= min_recall
+
+    doc = store.get_by_ids(["c0007"])[0]
+    assert (doc.page_content, doc.metadata, doc.id) == (texts[7], metadatas[7], "c0007")
+
+
+@pytest.mark.parametrize("where", [
+    {"project_id": "P3"},                                            # 선택도 5% -> 해당 행만 정확 검색
+    {"round": {"$gte": 1}},                                          # 선택도 75% -> ID selector + ANN
+    {"$and": [{"round": 0}, {"budget": {"$lt": 300_000_000}}]},
+    {"section_title": "소요 예산"},                                   # 메타데이터 인덱스에 없는 필드 -> match_filter
+    {"project_id": "없는 사업"},
+])
+@pytest.mark.parametrize("index_type", ["hnsw", "flat"])
+def test_filtered_search(tmp_path, where, index_type):
+    ids, vectors, metadatas, texts = make_rows()
+    store = build_store(tmp_path / "db", {"index_type": index_type})
+    allowed = np.array([match_filter(m, where) for m in metadatas])
+    for query in np.random.default_rng(2).normal(size=(5, DIM)).astype(np.float32):
+        hits = store.similarity_search_by_vector_with_relevance_scores(query, k=10, filter=where)
+        assert all(match_filter(doc.metadata, where) for doc, _ in hits)
+        expected, _ = brute_force(vectors, query, 10, allowed)
+        if index_type == "flat" or allowed.mean() <= 0.1:
+            assert result_rows(hits) == expected
+        else:
+            assert len(set(result_rows(hits)) & set(expected)) >= 9
+
+
+def test_ids_restrict_search(tmp_path):
+    ids, vectors, _, _ = make_rows()
+    store = build_store(tmp_path / "db")
+    chosen = ids[100:130] + ["missing"]
+    query = vectors[5]
+    hits = store.similarity_search_by_vector_with_relevance_scores(query, k=5, ids=chosen, filter={"round": 1})
+    allowed = np.zeros(N, dtype=bool)
+    allowed[100:130] = True
+    allowed &= np.arange(N) % 4 == 1
+    assert result_rows(hits) == brute_force(vectors, query, 5, allowed)[0]
+
+
+def test_staged_writes_apply_on_persist_and_reload(tmp_path, capsys):
+    ids, vectors, metadatas, texts = make_rows()
+    path = tmp_path / "db"
+    store = build_store(path)
+
+    # c0000 교체, c0001 삭제, n0000 추가
+    new_ids, new_vectors, new_metadatas, new_texts = make_rows(1, seed=5, prefix="n")
+    store.upsert_vectors(["c0000"], vectors[:1] + 100, [{"round": 9}], ["수정된 본문"])
+    store.upsert_vectors(new_ids, new_vectors, new_metadatas, new_texts)
+    store.delete(["c0001"])
+    assert len(store) == N                                 # persist() 전에는 검색 결과 그대로
+    assert store.get_by_ids(["c0000"])[0].page_content == texts[0]
+    assert os.path.exists(path / STAGE_DOCS_FILE)
+
+    store.persist()
+    assert len(store) == N and not os.path.exists(path / STAGE_DOCS_FILE)
+    assert "600 vectors" in capsys.readouterr().out
+
+    reloaded = FaissVectorStore(str(path), DeterministicFakeEmbedding(size=DIM))
+    assert reloaded.get_by_ids(["c0001"]) == []
+    assert reloaded.get_by_ids(["c0000"])[0].page_content == "수정된 본문"
+    hits = reloaded.similarity_search_by_vector_with_relevance_scores(vectors[0] + 100, k=1, filter={"round": 9})
+    assert [doc.id for doc, _ in hits] == ["c0000"]
+    hits = reloaded.similarity_search_by_vector_with_relevance_scores(new_vectors[0], k=1)
+    assert [doc.id for doc, _ in hits] == ["n0000"]
+
+    # 변경이 없으면 persist() 는 아무것도 하지 않음
+    mtime = os.path.getmtime(path / OFFSETS_FILE)
+    reloaded.persist()
+    assert os.path.getmtime(path / OFFSETS_FILE) == mtime
+
+
+def test_unfinished_staging_is_discarded(tmp_path):
+    path = tmp_path / "db"
+    build_store(path, rows=make_rows(50))
+    store = FaissVectorStore(str(path), DeterministicFakeEmbedding(size=DIM))
+    store.upsert_vectors(*make_rows(3, prefix="x"))
+    del store                                              # persist() 없이 종료
+
+    reopened = FaissVectorStore(str(path), DeterministicFakeEmbedding(size=DIM))
+    assert not os.path.exists(path / STAGE_DOCS_FILE)
+    assert len(reopened) == 50 and reopened.get_by_ids(["x0000"]) == []
+
+
+def test_row_count_mismatch_is_reported(tmp_path):
+    path = tmp_path / "db"
+    build_store(path, rows=make_rows(50))
+    np.save(path / OFFSETS_FILE, np.zeros(10, dtype=np.int64))
+    with pytest.raises(RuntimeError, match="--step index"):
+        FaissVectorStore(str(path), DeterministicFakeEmbedding(size=DIM))
+
+
+def test_text_api_and_backend_helpers(tmp_path):
+    config = {"path": {"vector_db": str(tmp_path / "db")}, "vector_store": {"backend": "faiss", "index_type": "flat"}}
+    embeddings = DeterministicFakeEmbedding(size=DIM)
+    assert load_vector_store(config, embeddings) is None
+
+    store = open_vector_store(config, embeddings)
+    assert isinstance(store, FaissVectorStore) and store.settings["index_type"] == "flat"
+    assert not writes_are_durable(store)
+    texts = ["클라우드 전환 사업", "학사 행정 시스템", "버스정보시스템 고도화"]
+    store.add_texts(texts, [{"round": i} for i in range(3)], ids=["a", "b", "c"])
+    upsert_vectors(store, ["d"], embeddings.embed_documents(["민원 포털"]), [{"round": 0}], ["민원 포털"])
+    persist_vector_store(store)
+
+    loaded = load_vector_store(config, embeddings)
+    assert count_vectors(loaded) == 4
+    assert loaded.similarity_search("학사 행정 시스템", k=1)[0].id == "b"
+    assert [doc.id for doc in loaded.similarity_search("민원 포털", k=4, filter={"round": 0})][0] == "d"
+    # 제곱 L2 거리 -> Chroma 와 같은 relevance 변환
+    assert loaded.similarity_search_with_relevance_scores("클라우드 전환 사업", k=1)[0][1] == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        vector_backend({"vector_store": {"backend": "pinecone"}})
+    assert vector_backend({}) == "chroma"
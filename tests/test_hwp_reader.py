@@ -0,0 +1,123 @@
+import re
+import struct
+import unicodedata
+from pathlib import Path
+
+import olefile
+import pytest
+
+from src.pipeline.hwp_reader import (
+    FLAG_COMPRESSED, HWPTAG_PARA_HEADER, HWPTAG_PARA_TEXT, BREAK_PAGE, HwpFormatError,
+    decode_para_text, extract_hwp_pages, iter_records, parse_section, read_file_header, run_hwp_extraction,
+)
+from src.pipeline.page_store import find_parsed_file, read_all_pages
+
+EXAMPLE_HWP = Path(__file__).parent / "fixtures" / "example.hwp"
+
+
+def record(tag_id, payload, level=0):
+    size = len(payload)
+    if size >= 0xFFF:
+        return struct.pack("<II", tag_id | (level << 10) | (0xFFF << 20), size) + payload
+    return struct.pack("<I", tag_id | (level << 10) | (size << 20)) + payload
+
+
+def wchars(*codes):
+    return struct.pack(f"<{len(codes)}H", *codes)
+
+
+def text(s):
+    return s.encode("utf-16-le")
+
+
+def para_header(break_type=0):
+    payload = bytearray(22)
+    payload[11] = break_type
+    return record(HWPTAG_PARA_HEADER, bytes(payload))
+
+
+def test_iter_records_normal_and_extended_size():
+    big = b"x" * 5000
+    data = record(HWPTAG_PARA_TEXT, b"ab", level=2) + record(HWPTAG_PARA_HEADER, big)
+    assert list(iter_records(data)) == [(HWPTAG_PARA_TEXT, 2, b"ab"), (HWPTAG_PARA_HEADER, 0, big)]
+
+
+DECODE_CASES = [
+    (text("사업 개요"), "사업 개요"),
+    # 줄바꿈(10) / 문단 끝(13): char 컨트롤 1 WCHAR
+    (text("가") + wchars(10) + text("나") + wchars(13), "가\n나\n"),
+    # 탭(9): inline 컨트롤 8 WCHAR -> "\t" 하나만 남김
+    (text("A") + wchars(9, 0, 0, 0, 0, 0, 0, 9) + text("B"), "A\tB"),
+    # 표/그림(11): extended 컨트롤 8 WCHAR 전체를 건너뜀 (안쪽 값이 글자로 새지 않음)
+    (text("앞") + wchars(11, 0x6C74, 0x6274, 0, 0, 0, 0, 11) + text("뒤"), "앞뒤"),
+    # 묶음 빈칸(30) / 고정폭 빈칸(31) / 하이픈(24)
+    (text("1") + wchars(30) + text("2") + wchars(24) + text("3") + wchars(31), "1 2-3 "),
+    # surrogate pair
+    (text("😀"), "😀"),
+]
+
+
+@pytest.mark.parametrize("payload, expected", DECODE_CASES)
+def test_decode_para_text(payload, expected):
+    assert decode_para_text(payload) == expected
+
+
+def test_parse_section_splits_on_page_break():
+    data = (
+        para_header() + record(HWPTAG_PARA_TEXT, text("1쪽 첫 문단") + wchars(13))
+        + para_header() + record(HWPTAG_PARA_TEXT, text("1쪽 둘째 문단") + wchars(13))
+        + para_header(BREAK_PAGE) + record(HWPTAG_PARA_TEXT, text("2쪽") + wchars(13))
+        # 표 안 문단(level 1)의 쪽 나누기 플래그는 무시
+        + record(HWPTAG_PARA_HEADER, bytes(11) + bytes([BREAK_PAGE]) + bytes(10), level=1)
+        + record(HWPTAG_PARA_TEXT, text("표 셀") + wchars(13), level=2)
+    )
+    assert parse_section(data) == ["1쪽 첫 문단\n1쪽 둘째 문단", "2쪽\n표 셀"]
+
+
+def test_rejects_non_ole_file(tmp_path):
+    path = tmp_path / "old.hwp"
+    path.write_bytes(b"HWP Document File V3.00 \x1a\x01\x02\x03\x04\x05")
+    with pytest.raises(HwpFormatError):
+        extract_hwp_pages(path)
+
+
+# ---------- 실제 HWP 5.x 문서 ----------
+def test_real_hwp_header_is_compressed():
+    with olefile.OleFileIO(str(EXAMPLE_HWP)) as ole:
+        assert read_file_header(ole) & FLAG_COMPRESSED
+
+
+def test_real_hwp_text_matches_preview():
+    pages = extract_hwp_pages(EXAMPLE_HWP)
+    assert len(pages) == 1
+    page = pages[0]
+    assert page["page"] == 1 and page["source_pdf"] == "example.hwp" and page["metadata"]["parser"] == "hwp5"
+
+    content = page["content"]
+    assert content.startswith("HWP test file\nPurpose: Provide example of this file type\n")
+    assert content.endswith("Feel free to use and share the file according to the license above.")
+    assert not [c for c in content if unicodedata.category(c) == "Cc" and c not in "\n\t"]
+
+    # 한글이 저장한 미리보기 텍스트(PrvText, 앞부분 약 1KB)와 본문 추출 결과가 같아야 함
+    with olefile.OleFileIO(str(EXAMPLE_HWP)) as ole:
+        preview = ole.openstream("PrvText").read().decode("utf-16-le")
+    normalize = lambda s: re.sub(r"[<>\s]+", " ", s).strip()
+    preview = normalize(preview)[:-20]   # 미리보기는 문장 중간에서 잘림
+    assert normalize(content).startswith(preview)
+
+
+def test_run_hwp_extraction_writes_page_store(tmp_path):
+    in_dir, out_dir = tmp_path / "raw", tmp_path / "parsed"
+    in_dir.mkdir()
+    (in_dir / "example.hwp").write_bytes(EXAMPLE_HWP.read_bytes())
+    (in_dir / "broken.hwp").write_bytes(b"not an ole file")
+
+    failed = run_hwp_extraction(str(in_dir), str(out_dir), workers=1)
+    assert failed == [in_dir / "broken.hwp"]
+    stored = find_parsed_file(out_dir, "example")
+    assert stored is not None
+    assert read_all_pages(stored) == extract_hwp_pages(EXAMPLE_HWP)
+
+    # 이미 추출된 파일은 건너뜀
+    assert run_hwp_extraction(str(in_dir), str(out_dir), workers=1) == [in_dir / "broken.hwp"]
+
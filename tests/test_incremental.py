@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import pipeline
+import src.indexer as indexer
+from src.indexer import load_manifest, manifest_diff, SIDE_MANIFEST_NAME
+from src.metadata_index import load_metadata_index
+from src.section_index import load_section_index
+from src.sparse_index import load_sparse_index
+from src.vector_store import load_vector_store
+
+SECTIONS = ["사업 개요", "소요 예산", "추진 일정", None]
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    def __init__(self, model=None):
+        super().__init__(size=16)
+
+
+def write_clean(folder, base_name, texts):
+    with open(os.path.join(folder, f"{base_name}_clean.jsonl"), "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            metadata = {"chunk_id": f"{base_name}__c{i:03d}", "section_title": SECTIONS[i % len(SECTIONS)]}
+            f.write(json.dumps({"content": text, "page": i + 1, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+
+def make_data(root, n_sources=5):
+    clean = os.path.join(root, "clean_json")
+    os.makedirs(clean, exist_ok=True)
+    rows = []
+    for s in range(n_sources):
+        base_name = f"rfp_{s}"
+        rows.append({
+            "공고 번호": f"2024-{s:04d}", "공고 차수": s % 2, "사업명": f"사업 {s} 정보시스템 구축",
+            "사업 금액": f"{s + 1}억원", "발주 기관": f"기관 {s % 3}", "공개 일자": "2024-05-01",
+            "입찰 참여 시작일": "2024-05-02", "입찰 참여 마감일": "2024-06-01",
+            "사업 요약": f"요약 {s}", "파일형식": "pdf", "파일명": f"{base_name}.pdf", "텍스트": f"CSV 본문 {s}",
+        })
+        write_clean(clean, base_name, [f"사업 {s} 과업 {i} 데이터 플랫폼 유지보수 {s * i}" for i in range(4)])
+    pd.DataFrame(rows).to_csv(os.path.join(root, "data_list.csv"), index=False)
+
+
+def make_config(data_root, out_root):
+    out = lambda name: os.path.join(out_root, name)
+    return {
+        "model": {"embedding": "fake"},
+        "process": {"load_workers": 2},
+        "index": {},
+        "vector_store": {"backend": "chroma"},
+        "path": {
+            "csv_file": os.path.join(data_root, "data_list.csv"),
+            "clean_json": os.path.join(data_root, "clean_json"),
+            "vector_db": out("rfp_index"),
+            "sparse_index": out("bm25_index.pkl"),
+            "embedding_cache": out("embedding_cache.sqlite3"),
+            "project_table": out("project_table.json"),
+            "section_index": out("section_index.json"),
+            "metadata_index": out("metadata_index.npz"),
+            "agency_index": out("agency_index.json"),
+            "project_index": out("project_index.npz"),
+        },
+    }
+
+
+@pytest.fixture
+def run_index(monkeypatch):
+    monkeypatch.setattr(indexer, "OpenAIEmbeddings", FakeEmbeddings)
+
+    def run(config, incremental=False):
+        monkeypatch.setattr(pipeline, "load_config", lambda: config)
+        monkeypatch.setattr(sys, "argv", ["pipeline.py", "--step", "index"] + (["--incremental"] if incremental else []))
+        pipeline.main()
+    return run
+
+
+def side_state(config):
+    """사이드 인덱스 + 벡터 DB 내용을 순서와 무관하게 비교할 수 있는 형태로"""
+    sections = {pid: {title: sorted(ids) for title, ids in titles.items()}
+                for pid, titles in load_section_index(config).sections.items()}
+
+    metadata = load_metadata_index(config)
+    rows = {}
+    for i, cid in enumerate(metadata.chunk_ids.tolist()):
+        rows[cid] = tuple(
+            metadata.categories[name][col[i]] if name in metadata.categories else col[i].item()
+            for name, col in sorted(metadata.columns.items())
+        )
+
+    sparse = load_sparse_index(config)
+    texts = {doc.metadata["chunk_id"]: doc.page_content for doc in sparse.get_documents(sparse.keys)}
+    scores = {}
+    for query in ("데이터 플랫폼", "사업 3 과업", "유지보수 12"):
+        for key, score in zip(sparse.keys, sparse.get_scores(query).tolist()):
+            scores[(query, key)] = round(score, 4)
+    sparse.close()
+
+    store = load_vector_store(config, FakeEmbeddings())
+    vector_ids = sorted(store.get()["ids"])
+    return {"sections": sections, "metadata": rows, "texts": texts, "scores": scores, "vector_ids": vector_ids}
+
+
+def test_manifest_diff():
+    old = {"a": {"hash": "1", "chunk_ids": ["a1", "a2"]}, "b": {"hash": "2", "chunk_ids": ["b1"]},
+           "c": {"hash": "3", "chunk_ids": ["c1"]}}
+    new = {"a": {"hash": "1", "chunk_ids": ["a1", "a2"]}, "b": {"hash": "9", "chunk_ids": ["b1", "b2"]},
+           "d": {"hash": "4", "chunk_ids": ["d1"]}}
+    changed, stale_ids = manifest_diff(old, new)
+    assert changed == {"b", "d"}
+    assert sorted(stale_ids) == ["b1", "c1"]
+    assert manifest_diff(new, new) == (set(), [])
+
+
+def test_incremental_side_indexes_match_full_rebuild(tmp_path, run_index, capsys):
+    data = str(tmp_path / "data")
+    make_data(data)
+    incremental = make_config(data, str(tmp_path / "incremental"))
+    run_index(incremental)
+    assert load_manifest(incremental["path"]["vector_db"], SIDE_MANIFEST_NAME)
+
+    # 변경: rfp_0 본문 수정 (청크 수 감소), rfp_1 정제 파일 삭제, rfp_5 추가
+    clean = incremental["path"]["clean_json"]
+    write_clean(clean, "rfp_0", ["수정된 사업 0 데이터 플랫폼", "새 과업 설명"])
+    os.remove(os.path.join(clean, "rfp_1_clean.jsonl"))
+    df = pd.read_csv(incremental["path"]["csv_file"])
+    new_row = df.iloc[[2]].assign(**{"공고 번호": "2024-0005", "파일명": "rfp_5.pdf"})
+    pd.concat([df, new_row]).to_csv(incremental["path"]["csv_file"], index=False)
+    write_clean(clean, "rfp_5", ["신규 사업 5 클라우드 전환", "사업 5 데이터 이관"])
+    capsys.readouterr()
+
+    run_index(incremental, incremental=True)
+    out = capsys.readouterr().out
+    assert "사이드 인덱스 증분 갱신: 변경 소스 2건, 제거 청크 8건" in out
+    assert "BM25 index updated" in out
+
+    full = make_config(data, str(tmp_path / "full"))
+    run_index(full)
+
+    got, expected = side_state(incremental), side_state(full)
+    assert got == expected
+    # 삭제된 정제 파일은 CSV 본문으로 대체되지 않음
+    assert not any(cid.startswith("rfp_1") for cid in got["vector_ids"])
+    assert set(got["texts"]) == set(got["vector_ids"])
+
+
+def test_incremental_without_changes_keeps_side_indexes(tmp_path, run_index, capsys):
+    data = str(tmp_path / "data")
+    make_data(data, n_sources=3)
+    config = make_config(data, str(tmp_path / "out"))
+    run_index(config)
+    before = side_state(config)
+    mtime = os.path.getmtime(config["path"]["sparse_index"])
+    capsys.readouterr()
+
+    run_index(config, incremental=True)
+    assert "변경 소스 0건, 제거 청크 0건" in capsys.readouterr().out
+    assert os.path.getmtime(config["path"]["sparse_index"]) == mtime
+    assert side_state(config) == before
+
+
+def test_incremental_without_side_manifest_rebuilds(tmp_path, run_index, capsys):
+    data = str(tmp_path / "data")
+    make_data(data, n_sources=3)
+    config = make_config(data, str(tmp_path / "out"))
+    run_index(config)
+    os.remove(os.path.join(config["path"]["vector_db"], SIDE_MANIFEST_NAME))
+    capsys.readouterr()
+
+    run_index(config, incremental=True)
+    out = capsys.readouterr().out
+    assert "증분 갱신" not in out and "BM25 index saved" in out
+    assert load_manifest(config["path"]["vector_db"], SIDE_MANIFEST_NAME) == load_manifest(config["path"]["vector_db"])
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.documents import Document
+
+import src.metadata_index as metadata_module
+from src.metadata_index import MISSING_TS, MetadataIndex, epoch_series, load_metadata_index, save_metadata_index, to_epoch
+
+# 2024-10-15 00:00:00 (타임존 없는 현지 시각 그대로)
+DAY = 1728950400
+
+EPOCH_CASES = [
+    ("2024-10-15", DAY),
+    ("2024-10-15 17:00:00", DAY + 17 * 3600),
+    ("2024-10-15 17:00", DAY + 17 * 3600),
+    ("2024/10/15", DAY),
+    ("20241015", DAY),
+    (pd.Timestamp("2024-10-15"), DAY),
+    ("1970-01-01", 0),
+    # 해석 불가 -> None (필터 생략)
+    ("", None),
+    ("미정", None),
+    ("다음 주", None),
+    ("2024-13-45", None),
+    (None, None),
+    (float("nan"), None),
+]
+
+
+@pytest.mark.parametrize("value, expected", EPOCH_CASES)
+def test_to_epoch(value, expected):
+    assert to_epoch(value) == expected
+
+
+def test_epoch_series_uses_missing_ts_for_unparseable():
+    values = pd.Series(["2024-10-15", "2024-10-15 17:00:00", "미정", None, ""])
+    result = epoch_series(values)
+    assert result.dtype == np.int64
+    assert result.tolist() == [DAY, DAY + 17 * 3600, MISSING_TS, MISSING_TS, MISSING_TS]
+
+
+def make_docs(n=100):
+    return [
+        Document(page_content="", metadata={
+            "chunk_id": f"c{i:03d}", "project_id": f"P{i // 10}", "organization": f"기관 {i % 4}",
+            "budget": float((i // 10 + 1) * 100_000_000), "round": i % 2,
+            "deadline_ts": DAY + (i // 10) * 86400, "pub_date_ts": None,
+        })
+        for i in range(n)
+    ]
+
+
+def make_index(docs):
+    index = MetadataIndex()
+    for doc in docs:
+        index.add(doc)
+    return index
+
+
+def reference_mask(docs, predicate):
+    return np.array([predicate(doc.metadata) for doc in docs])
+
+
+MASK_CASES = [
+    ({"round": 1}, lambda m: m["round"] == 1),
+    ({"budget": {"$gt": 500_000_000}}, lambda m: m["budget"] > 500_000_000),
+    ({"budget": {"$gte": 200_000_000, "$lte": 300_000_000}}, lambda m: 200_000_000 <= m["budget"] <= 300_000_000),
+    ({"deadline_ts": {"$gte": DAY + 3 * 86400}}, lambda m: m["deadline_ts"] >= DAY + 3 * 86400),
+    ({"organization": {"$in": ["기관 1", "기관 3", "없는 기관"]}}, lambda m: m["organization"] in ("기관 1", "기관 3")),
+    ({"organization": {"$nin": ["기관 0"]}}, lambda m: m["organization"] != "기관 0"),
+    ({"project_id": {"$ne": "P1"}}, lambda m: m["project_id"] != "P1"),
+    ({"organization": "없는 기관"}, lambda m: False),
+    ({"$and": [{"round": {"$eq": 0}}, {"project_id": {"$in": ["P2", "P3"]}}]},
+     lambda m: m["round"] == 0 and m["project_id"] in ("P2", "P3")),
+    ({"$or": [{"budget": {"$lt": 200_000_000}}, {"organization": "기관 2"}]},
+     lambda m: m["budget"] < 200_000_000 or m["organization"] == "기관 2"),
+]
+
+
+@pytest.mark.parametrize("where, predicate", MASK_CASES)
+def test_mask_matches_python_filter(where, predicate):
+    docs = make_docs()
+    np.testing.assert_array_equal(make_index(docs).mask(where), reference_mask(docs, predicate))
+
+
+@pytest.mark.parametrize("where", [
+    {"section_title": "소요 예산"},                         # 인덱스에 없는 필드
+    {"organization": {"$gte": "기관 1"}},                   # 문자열 범위 비교
+    {"$and": [{"round": 1}, {"source": "a.pdf"}]},
+])
+def test_mask_unsupported_returns_none(where):
+    assert make_index(make_docs()).mask(where) is None
+
+
+PLAN_CASES = [
+    (None, "none", 10),
+    ({"section_title": "소요 예산"}, "chroma", 10),
+    ({"organization": "없는 기관"}, "empty", 0),
+    ({"round": 1}, "post_filter", 24),                       # 선택도 0.5 -> ceil(10 / 0.5 * 1.2)
+    ({"project_id": "P3"}, "allow_list", 10),                # 10건 (선택도 0.1)
+    ({"$and": [{"project_id": "P3"}, {"round": 1}]}, "allow_list", 5),   # fetch_k = min(k, 통과 수)
+]
+
+
+@pytest.mark.parametrize("where, mode, fetch_k", PLAN_CASES)
+def test_plan_modes(where, mode, fetch_k):
+    plan = make_index(make_docs()).plan(where, k=10)
+    assert (plan.mode, plan.fetch_k) == (mode, fetch_k)
+    if mode == "allow_list":
+        assert len(plan.ids) == plan.matches and all(cid.startswith("c03") for cid in plan.ids)
+
+
+def test_plan_config_overrides():
+    index = make_index(make_docs())
+    # 허용 목록 상한보다 많이 통과하면 Chroma where
+    assert index.plan({"project_id": "P3"}, k=10, config={"process": {"allow_list_max": 5}}).mode == "chroma"
+    # 사후 필터 fetch_k 상한
+    plan = index.plan({"round": 1}, k=10, config={"process": {"post_filter_max_fetch": 15}})
+    assert (plan.mode, plan.fetch_k) == ("post_filter", 15)
+    # 선택도 기준을 높이면 같은 조건이 허용 목록으로
+    assert index.plan({"round": 1}, k=10, config={"process": {"post_filter_min_ratio": 0.9}}).mode == "allow_list"
+
+
+def test_distinct_and_keep():
+    docs = make_docs()
+    index = make_index(docs)
+    assert index.distinct("project_id", {"budget": {"$gte": 900_000_000}}) == {"P8", "P9"}
+    assert index.distinct("organization", None) == {"기관 0", "기관 1", "기관 2", "기관 3"}
+    assert index.distinct("budget", None) is None
+    assert index.distinct("project_id", {"section_title": "x"}) is None
+
+    plan = index.plan({"round": 1}, k=10)
+    hits = [(doc, float(i)) for i, doc in enumerate(docs[:6])]
+    hits.append((Document(page_content="", metadata={"chunk_id": "unknown"}), 9.0))
+    assert [doc.metadata["chunk_id"] for doc, _ in index.keep(plan, hits)] == ["c001", "c003", "c005"]
+
+
+def test_freeze_in_batches_keeps_codes_consistent(monkeypatch):
+    monkeypatch.setattr(metadata_module, "PENDING_MAX", 7)
+    docs = make_docs(50)
+    batched = make_index(docs)
+    assert len(batched) == 50 and len(batched.chunk_ids) == 49   # 7개씩 변환, 마지막 1개는 대기 중
+
+    monkeypatch.setattr(metadata_module, "PENDING_MAX", 10_000)
+    single = make_index(docs)
+    for where, _ in MASK_CASES:
+        np.testing.assert_array_equal(batched.mask(where), single.mask(where))
+    assert batched.categories["organization"].tolist() == ["기관 0", "기관 1", "기관 2", "기관 3"]
+
+    # 변환 후에 추가된 청크도 기존 코드표를 이어서 사용
+    batched.add(Document(page_content="", metadata={"chunk_id": "new", "organization": "기관 9", "project_id": "P1"}))
+    assert batched.distinct("organization", {"project_id": "P1"}) == {"기관 1", "기관 2", "기관 3", "기관 0", "기관 9"}
+    assert batched.row_of("new") == 50
+
+
+def test_remove_returns_keep_mask():
+    docs = make_docs(20)
+    index = make_index(docs)
+    keep = index.remove([f"c{i:03d}" for i in range(5)] + ["missing"])
+    assert keep.tolist() == [False] * 5 + [True] * 15
+    assert len(index) == 15 and index.row_of("c000") is None and index.row_of("c005") == 0
+    np.testing.assert_array_equal(index.mask({"round": 1}), reference_mask(docs[5:], lambda m: m["round"] == 1))
+
+
+def test_save_and_load(tmp_path, capsys):
+    config = {"path": {"metadata_index": str(tmp_path / "sub" / "metadata_index.npz")}}
+    assert load_metadata_index(config) is None
+    docs = make_docs()
+    index = make_index(docs)
+    save_metadata_index(index, config)
+    assert "100 chunks" in capsys.readouterr().out
+
+    loaded = load_metadata_index(config)
+    assert loaded.chunk_ids.tolist() == index.chunk_ids.tolist()
+    for where, predicate in MASK_CASES:
+        np.testing.assert_array_equal(loaded.mask(where), reference_mask(docs, predicate))
+    assert not list((tmp_path / "sub").glob("*.tmp*"))
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from src.pipeline.page_store import (
+    MAGIC, convert_legacy_dir, find_parsed_file, list_parsed_files, open_pages, page_number, page_store_path,
+    parsed_stem, read_all_pages, write_page_store,
+)
+
+
+def make_pages(numbers):
+    return [
+        {"page": n, "content": f"{n}쪽 본문 " * 20, "metadata": {"page": 1, "global_page": n, "source_pdf": "a.pdf"},
+         "source_pdf": "a.pdf"}
+        for n in numbers
+    ]
+
+
+def test_page_number_prefers_top_level_page():
+    assert page_number({"page": 3, "metadata": {"global_page": 9}}) == 3
+    assert page_number({"metadata": {"global_page": 9}}) == 9
+    assert page_number({}) == 0
+
+
+def test_write_and_read_sorted(tmp_path):
+    pages = make_pages([3, 1, 7, 2])
+    path = write_page_store(page_store_path(tmp_path, "a"), pages)
+    assert path.name == "a_parsed.pages" and not list(tmp_path.glob("*.tmp"))
+    assert read_all_pages(path) == sorted(pages, key=page_number)
+
+
+def test_range_and_single_page_reads(tmp_path):
+    path = write_page_store(tmp_path / "a_parsed.pages", make_pages([1, 2, 3, 5, 8]))
+    with open_pages(path) as reader:
+        assert len(reader) == 5 and reader.page_numbers == [1, 2, 3, 5, 8]
+        assert [p["page"] for p in reader.iter_pages(start=2, end=5)] == [2, 3, 5]
+        assert [p["page"] for p in reader.iter_pages(start=4)] == [5, 8]
+        assert [p["page"] for p in reader.iter_pages(end=1)] == [1]
+        assert list(reader.iter_pages(start=9)) == []
+        assert reader.read_page(5)["content"].startswith("5쪽")
+        assert reader.read_page(4) is None
+
+
+def test_empty_store(tmp_path):
+    path = write_page_store(tmp_path / "empty_parsed.pages", [])
+    assert read_all_pages(path) == []
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    other = tmp_path / "x_parsed.pages"
+    other.write_bytes(b"PK\x03\x04 not a page store")
+    with pytest.raises(ValueError, match="Not a page store"):
+        open_pages(other)
+
+    path = write_page_store(tmp_path / "a_parsed.pages", make_pages([1, 2]))
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="Corrupted"):
+        open_pages(path)
+
+
+def test_legacy_json_is_readable_through_same_api(tmp_path):
+    pages = make_pages([2, 1])
+    legacy = tmp_path / "a_parsed.json"
+    legacy.write_text(json.dumps(pages, ensure_ascii=False), encoding="utf-8")
+    with open_pages(legacy) as reader:
+        assert reader.page_numbers == [1, 2]
+        assert reader.read_page(2) == pages[0]
+        assert list(reader.iter_pages(start=2)) == [pages[0]]
+
+
+def test_find_and_list_prefer_page_store(tmp_path):
+    (tmp_path / "a_parsed.json").write_text("[]", encoding="utf-8")
+    (tmp_path / "b_parsed.json").write_text("[]", encoding="utf-8")
+    write_page_store(tmp_path / "a_parsed.pages", [])
+    write_page_store(tmp_path / "c_parsed.pages", [])
+
+    assert find_parsed_file(tmp_path, "a").name == "a_parsed.pages"
+    assert find_parsed_file(tmp_path, "b").name == "b_parsed.json"
+    assert find_parsed_file(tmp_path, "z") is None
+    assert [p.name for p in list_parsed_files(tmp_path)] == ["a_parsed.pages", "b_parsed.json", "c_parsed.pages"]
+    assert parsed_stem(tmp_path / "rfp_2024_parsed.pages") == "rfp_2024"
+
+
+@pytest.mark.parametrize("remove", [False, True])
+def test_convert_legacy_dir(tmp_path, remove, capsys):
+    pages = make_pages(range(1, 31))
+    legacy = tmp_path / "a_parsed.json"
+    legacy.write_text(json.dumps(pages, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    convert_legacy_dir(tmp_path, remove=remove)
+    converted = tmp_path / "a_parsed.pages"
+    assert converted.read_bytes().startswith(MAGIC)
+    assert read_all_pages(converted) == pages
+    assert legacy.exists() != remove
+    assert converted.stat().st_size < len(legacy.read_bytes() if legacy.exists() else json.dumps(pages))
+    assert "Converted 1 files" in capsys.readouterr().out
@@ -0,0 +1,258 @@
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+import src.pipeline.pdf_parser as pdf_parser
+from src.pipeline.pdf_parser import (
+    ParseCache, TokenBucket, is_toc_page, parse_pdfs_concurrently, parse_retry_after, plan_pdf, plan_page_ranges,
+    request_document_parse, triage_page,
+)
+from src.pipeline.page_store import find_parsed_file, read_all_pages
+
+TOC_TEXT = "목 차\n1. 사업 개요 ······ 3\n2. 과업 범위 ······ 5\n3. 제안 요청 사항 ...... 9"
+LEADER_TEXT = "\n".join(f"{i}. 장 제목 {i} ··········· {i * 3}" for i in range(1, 12))
+# 표 셀이 한 줄씩 추출된 예산 페이지 (숫자 위주지만 목차가 아님)
+BUDGET_CELLS = "구분\n2024년\n2025년\n합계\n인건비\n120,000\n130,000\n250,000\n장비비\n50,000\n40,000\n90,000\n" * 3
+
+
+@pytest.mark.parametrize("text, has_images, expected", [
+    ("", False, (True, "blank")),
+    ("······\n- - -", False, (True, "blank")),
+    ("", True, (False, "no_text_layer")),
+    ("제1장 사업 개요", False, (False, "ok")),              # 제목만 있는 짧은 페이지
+    ("3", False, (False, "ok")),
+    ("[서식 1] 입찰참가신청서\n상호:", False, (True, "form")),
+    ("본문 중 [서식 1] 참조\n" * 3, False, (False, "ok")),
+    (TOC_TEXT, False, (True, "toc")),
+    (LEADER_TEXT, False, (True, "toc")),
+    (BUDGET_CELLS, False, (False, "ok")),
+])
+def test_triage_page(text, has_images, expected):
+    assert triage_page(text, has_images) == expected
+
+
+def test_toc_end_with_chapter_start_is_kept():
+    # 목차 마지막 페이지에 본문 첫 섹션 제목이 이어지는 경우
+    assert is_toc_page(LEADER_TEXT)
+    assert not is_toc_page(LEADER_TEXT + "\n사업 개요\n본 사업은 재난 통합 관리 시스템을 고도화한다.")
+
+
+def _write_pdf(path: Path, pages):
+    doc = fitz.open()
+    for lines, ruled in pages:
+        page = doc.new_page()
+        y = 60
+        for line in lines:
+            page.insert_text((50, y), line, fontname="korea")
+            if ruled:
+                page.draw_rect(fitz.Rect(40, y - 14, 520, y + 4))
+                page.draw_line((40, y + 4), (520, y + 4))
+            y += 20
+    doc.save(path)
+    return path
+
+
+def test_plan_pdf_keeps_heading_only_page(tmp_path):
+    pdf = _write_pdf(tmp_path / "sample.pdf", [
+        (["목 차", "1. 사업 개요 ······ 3", "2. 과업 범위 ······ 5"], False),
+        (["제1장 사업 개요"], False),                                            # 제목만 있는 페이지
+        (["본 사업은 재난 통합 관리 시스템 고도화를 목적으로 한다." * 2] * 6, False),
+        ([f"항목 {i} .......... {1000 * i}" for i in range(12)], True),          # 리더가 있는 금액 표
+        ([], False),
+    ])
+    local_pages, ranges, report = plan_pdf(pdf)
+
+    assert {item["page"]: item["reason"] for item in report["skipped"]} == {1: "toc", 5: "blank"}
+    assert [page["page"] for page in local_pages] == [2, 3]
+    assert "제1장 사업 개요" in local_pages[0]["content"]
+    assert ranges == [(3, 4)]   # 표 페이지는 Upstage 로
+
+
+def test_plan_page_ranges():
+    assert plan_page_ranges([0, 1, 2, 5, 6, 9], chunk_size=2) == [(0, 2), (2, 3), (5, 7), (9, 10)]
+    assert plan_page_ranges([]) == []
+
+
+# ---------- 토큰 버킷 / 재시도 ----------
+class FakeClock:
+    """sleep 하면 시간이 그만큼 흐르는 가짜 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(pdf_parser, "time", SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep, time=time.time))
+    return clock
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    start = clock.now
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == start          # 버스트 용량만큼은 대기 없음
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == pytest.approx(start + 1.0)
+
+    # 오래 쉬어도 용량 이상 쌓이지 않음
+    clock.now += 60
+    start = clock.now
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.now == pytest.approx(start + 0.5)
+
+
+def test_token_bucket_pause_blocks_all_acquires(clock):
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    start = clock.now
+    bucket.pause(5)
+    bucket.pause(1)                    # 더 짧은 pause 가 기존 대기를 줄이지 않음
+    bucket.acquire()
+    assert clock.now == pytest.approx(start + 5)
+    # pause 동안 찬 토큰은 버스트 용량까지만
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == pytest.approx(start + 6)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 7.0),
+    ("", 7.0),
+    ("3", 3.0),
+    ("1.5", 1.5),
+    ("-4", 0.0),
+    ("soon", 7.0),
+    (format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc)), 0.0),   # 지난 시각
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value, default=7.0) == expected
+
+
+def test_parse_retry_after_http_date_in_future():
+    future = format_datetime(datetime.fromtimestamp(time.time() + 30, timezone.utc))
+    assert 28 <= parse_retry_after(future, default=0) <= 30
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, elements=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._elements = elements or []
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return {"elements": self._elements}
+
+
+class RecordingBucket:
+    def __init__(self):
+        self.acquired = 0
+        self.pauses = []
+
+    def acquire(self):
+        self.acquired += 1
+
+    def pause(self, seconds):
+        self.pauses.append(seconds)
+
+
+def test_request_document_parse_retries_same_range(monkeypatch):
+    responses = iter([
+        FakeResponse(429, {"Retry-After": "12"}),
+        FakeResponse(503),
+        FakeResponse(200, elements=[{"page": 1, "content": {"markdown": "본문"}}]),
+    ])
+    uploads = []
+
+    def post(url, headers, files, data, timeout):
+        uploads.append(files["document"][1])
+        return next(responses)
+
+    monkeypatch.setattr(pdf_parser.requests, "post", post)
+    bucket = RecordingBucket()
+    elements = request_document_parse(b"%PDF range", "a_0001_0010.pdf", "key", bucket)
+
+    assert elements == [{"page": 1, "content": {"markdown": "본문"}}]
+    assert uploads == [b"%PDF range"] * 3
+    assert bucket.acquired == 3
+    assert bucket.pauses == [12.0, 4.0]   # Retry-After, 없으면 2 ** attempt
+
+
+def test_request_document_parse_gives_up(monkeypatch):
+    monkeypatch.setattr(pdf_parser.requests, "post", lambda *args, **kwargs: FakeResponse(429, {"Retry-After": "0"}))
+    bucket = RecordingBucket()
+    with pytest.raises(RuntimeError, match="Max retries"):
+        request_document_parse(b"", "a.pdf", "key", bucket, max_retries=3)
+    assert bucket.acquired == 3
+
+    monkeypatch.setattr(pdf_parser.requests, "post", lambda *args, **kwargs: FakeResponse(401))
+    with pytest.raises(RuntimeError, match="401"):
+        request_document_parse(b"", "a.pdf", "key", RecordingBucket())
+
+
+# ---------- range 파싱 캐시 ----------
+def test_parse_cache_roundtrip(tmp_path):
+    cache = ParseCache(tmp_path / "_cache")
+    elements = [{"page": 1, "content": {"markdown": "| 구분 | 금액 |"}}]
+    assert cache.get("abc", 0, 10) is None
+    cache.put("abc", 0, 10, elements)
+    assert cache.get("abc", 0, 10) == elements
+    # 해시/range 가 다르면 별도 항목
+    assert cache.get("abc", 10, 20) is None and cache.get("abd", 0, 10) is None
+    assert not list((tmp_path / "_cache").rglob("*.tmp"))
+
+
+def test_rerun_only_requests_missing_ranges(tmp_path, monkeypatch):
+    table = [f"항목 {i} .......... {1000 * i}" for i in range(12)]
+    pdf = _write_pdf(tmp_path / "budget.pdf", [(table, True)] * 3)
+    calls = []
+    failing = {"budget_0002_0002.pdf"}
+
+    def fake_parse(pdf_bytes, filename, api_key, bucket, api_url=None):
+        calls.append(filename)
+        if filename in failing:
+            raise RuntimeError("HTTP 500")
+        return [{"page": 1, "content": {"markdown": f"표 {filename}"}}]
+
+    monkeypatch.setattr(pdf_parser, "request_document_parse", fake_parse)
+    run = lambda: parse_pdfs_concurrently(
+        [pdf], tmp_path / "parsed", "key", workers=2, requests_per_second=100, pages_per_request=1,
+    )
+
+    assert run() == []                   # range 하나가 실패하면 PDF 저장 안 함
+    assert sorted(calls) == ["budget_0001_0001.pdf", "budget_0002_0002.pdf", "budget_0003_0003.pdf"]
+
+    calls.clear()
+    failing.clear()
+    saved = run()
+    assert calls == ["budget_0002_0002.pdf"]
+    pages = read_all_pages(find_parsed_file(tmp_path / "parsed", "budget"))
+    assert saved and [page["page"] for page in pages] == [1, 2, 3]
+    assert pages[1]["content"] == "표 budget_0002_0002.pdf"
+
+    # 같은 내용의 PDF 는 이름이 달라도 캐시 사용
+    calls.clear()
+    renamed = tmp_path / "budget_copy.pdf"
+    renamed.write_bytes(pdf.read_bytes())
+    parse_pdfs_concurrently([renamed], tmp_path / "parsed", "key", requests_per_second=100, pages_per_request=1)
+    assert calls == []
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.project_index import ProjectIndex, _unit_scale, build_project_index, load_project_index, project_text
+from src.project_table import ProjectTable
+
+PROJECTS = {
+    "P0": {"project_name": "버스정보시스템 고도화", "organization": "경기도 평택시", "summary": "BIS 단말기 교체"},
+    "P1": {"project_name": "학사 행정 시스템 구축", "organization": "고려대학교", "summary": "nan"},
+    "P2": {"project_name": "클라우드 전환 사업", "organization": "Unknown", "summary": "데이터센터 이관"},
+    "P3": {"project_name": "의료 정보 시스템 유지보수", "organization": "국립중앙의료원", "summary": ""},
+}
+
+
+class KeywordEmbeddings(Embeddings):
+    """키워드 등장 여부 벡터 + 호출된 텍스트 기록"""
+    KEYWORDS = ["버스", "학사", "클라우드", "의료", "시스템", "고도화"]
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(word in text) for word in self.KEYWORDS] + [0.1]
+
+
+def config_for(tmp_path):
+    return {"path": {"project_index": str(tmp_path / "project_index.npz")}}
+
+
+def test_project_text_skips_placeholders():
+    assert project_text(PROJECTS["P1"]) == "학사 행정 시스템 구축\n고려대학교"
+    assert project_text(PROJECTS["P2"]) == "클라우드 전환 사업\n데이터센터 이관"
+    assert project_text({}) == ""
+
+
+def test_unit_scale():
+    np.testing.assert_allclose(_unit_scale(np.array([2.0, 4.0, 3.0])), [0.0, 1.0, 0.5])
+    np.testing.assert_array_equal(_unit_scale(np.array([5.0, 5.0])), [0.0, 0.0])
+    assert _unit_scale(np.array([])).size == 0
+
+
+@pytest.fixture
+def index(tmp_path):
+    return build_project_index(ProjectTable(dict(PROJECTS)), KeywordEmbeddings(), config_for(tmp_path))
+
+
+@pytest.mark.parametrize("query, top", [
+    ("버스정보시스템 단말기", "P0"),
+    ("고려대 학사 시스템", "P1"),
+    ("클라우드 이관", "P2"),
+    ("의료원 유지보수", "P3"),
+])
+def test_search_ranks_matching_project_first(index, query, top):
+    hits = index.search(query, KeywordEmbeddings().embed_query(query), k=2)
+    assert len(hits) == 2 and hits[0][0] == top
+    assert hits[0][1] >= hits[1][1]
+
+
+def test_search_weights_and_allowed(index):
+    query = "학사 시스템"
+    emb = KeywordEmbeddings().embed_query(query)
+    # BM25 만 / 의미 유사도만 써도 점수는 0~1
+    for weight in (0.0, 1.0):
+        scores = [score for _, score in index.search(query, emb, k=4, bm25_weight=weight)]
+        assert max(scores) == pytest.approx(1.0) and min(scores) >= 0.0
+
+    assert [pid for pid, _ in index.search(query, emb, k=4, allowed={"P2", "P3"})][0] == "P3"
+    assert {pid for pid, _ in index.search(query, emb, k=10, allowed={"P2", "P3"})} == {"P2", "P3"}
+    assert index.search(query, emb, allowed={"P9"}) == []
+    assert ProjectIndex([], [], np.zeros((0, 7))).search(query, emb) == []
+
+
+def test_vectors_are_normalized_and_roundtrip(tmp_path, index):
+    np.testing.assert_allclose(np.linalg.norm(index.vectors, axis=1), 1.0, rtol=1e-6)
+    loaded = load_project_index(config_for(tmp_path))
+    assert loaded.project_ids == index.project_ids and loaded.texts == index.texts
+    np.testing.assert_allclose(loaded.vectors, index.vectors, rtol=1e-6)   # 로드 시 다시 정규화 (float32 오차)
+    emb = KeywordEmbeddings().embed_query("클라우드")
+    assert [pid for pid, _ in loaded.search("클라우드", emb)] == [pid for pid, _ in index.search("클라우드", emb)]
+    assert load_project_index({"path": {"project_index": str(tmp_path / "missing.npz")}}) is None
+
+
+def test_build_reuses_previous_vectors(tmp_path, index, capsys):
+    projects = dict(PROJECTS)
+    projects["P1"] = {**projects["P1"], "summary": "포털 연계"}          # 텍스트 변경
+    projects["P4"] = dict(PROJECTS["P0"])                                 # 같은 텍스트의 새 사업
+    projects["P5"] = {"project_name": "민원 포털 구축", "organization": "세종시"}
+    del projects["P3"]
+    capsys.readouterr()
+
+    embeddings = KeywordEmbeddings()
+    rebuilt = build_project_index(ProjectTable(projects), embeddings, config_for(tmp_path), previous=index)
+    assert sorted(embeddings.embedded) == sorted([project_text(projects["P1"]), project_text(projects["P5"])])
+    assert "embedded 2" in capsys.readouterr().out
+
+    fresh = build_project_index(ProjectTable(projects), KeywordEmbeddings(), config_for(tmp_path / "fresh"))
+    assert rebuilt.project_ids == fresh.project_ids
+    np.testing.assert_allclose(rebuilt.vectors, fresh.vectors, rtol=1e-6)
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import src.query_analysis as query_analysis
+from src.query_analysis import QueryCache, SearchQuery, build_query_analyzer, extract_search_query, normalize_query
+
+
+# 규칙 기반 추출 결과 (질의 -> 기대 필드). None 이면 LLM 으로 넘겨야 하는 질의
+RULE_CASES = [
+    ("10억 이상 사업 알려줘", {"query": "사업", "min_budget": 1e9}),
+    ("예산이 1억 초과인 사업", {"query": "사업", "min_budget": 1e8, "min_budget_exclusive": True}),
+    ("1억 넘는 도서관 사업", {"query": "도서관 사업", "min_budget": 1e8, "min_budget_exclusive": True}),
+    ("1억 5천만원 이하인 사업", {"query": "사업", "max_budget": 1.5e8}),
+    ("예산 5억 미만 교육 시스템 구축", {"query": "교육 시스템 구축", "max_budget": 5e8, "max_budget_exclusive": True}),
+    ("1억 이상 10억 이하 학사 시스템", {"query": "학사 시스템", "min_budget": 1e8, "max_budget": 1e9}),
+    ("2024-10-01 이후 마감되는 도서관 사업", {"query": "마감되는 도서관 사업", "deadline_after": "2024-10-01"}),
+    ("2024년 6월 이후 공개된 학사 시스템", {"query": "공개된 학사 시스템", "pub_date_after": "2024-06-01"}),
+    ("재공고 된 학사 시스템", {"query": "학사 시스템", "is_rebid": True}),
+    ("평가 기준 알려줘", {"query": "평가 기준"}),
+]
+
+LLM_CASES = [
+    "재공고가 아닌 사업만 알려줘",       # 부정
+    "재공고 제외 도서관 사업",            # 제외
+    "봉화군 말고 다른 기관 사업",
+    "10억 이상 또는 재공고 사업",         # OR 조건
+    "10억 이상 혹은 1억 이하",
+    "10억 이상 1억 이하 사업",            # 모순된 범위
+    "1억 초과 1억 이하 사업",             # 빈 범위
+    "1억 이상",                           # 조건만 있고 검색어 없음
+    "예산이 1억 초과인",
+    "2024-10-01 이후 사업",               # 마감일/공개일 모호
+    "최근 올라온 사업",                   # 상대 날짜
+]
+
+
+@pytest.mark.parametrize("question, expected", RULE_CASES)
+def test_rule_based_fields(question, expected):
+    result = extract_search_query(question)
+    assert result is not None
+    assert result.model_dump(exclude_none=True) == expected
+
+
+@pytest.mark.parametrize("question", LLM_CASES)
+def test_falls_back_to_llm(question):
+    assert extract_search_query(question) is None
+
+
+def test_normalize_query():
+    assert normalize_query("  10억　이상   사업 ") == "10억 이상 사업"
+    assert normalize_query("ＡＢＣ") == "ABC"
+
+
+# ---------- 질의 캐시 ----------
+def test_query_cache_lru_and_persistence(tmp_path):
+    path = str(tmp_path / "cache" / "query_cache.json")
+    cache = QueryCache(path, max_size=2, model="gpt-a")
+    cache.put("a", SearchQuery(query="a"))
+    cache.put("b", SearchQuery(query="b", is_rebid=True))
+    assert cache.get("a") == SearchQuery(query="a")     # a 를 최근 사용으로
+    cache.put("c", SearchQuery(query="c"))               # 가장 오래된 b 제거
+    assert cache.get("b") is None
+
+    reloaded = QueryCache(path, max_size=2, model="gpt-a")
+    assert reloaded.get("a") == SearchQuery(query="a") and reloaded.get("c") == SearchQuery(query="c")
+    # 모델이 바뀌면 이전 결과는 버림
+    assert QueryCache(path, model="gpt-b").get("a") is None
+
+
+def test_query_cache_ignores_corrupt_file(tmp_path, capsys):
+    path = tmp_path / "query_cache.json"
+    path.write_text("{not json", encoding="utf-8")
+    cache = QueryCache(str(path))
+    assert cache.get("a") is None and "질의 캐시 로드 실패" in capsys.readouterr().out
+    cache.put("a", SearchQuery(query="a"))
+    assert QueryCache(str(path)).get("a") == SearchQuery(query="a")
+
+
+class FakeChatOpenAI:
+    """structured output 호출 횟수만 세는 LLM"""
+    calls = []
+
+    def __init__(self, model, temperature):
+        self.model = model
+
+    def with_structured_output(self, schema):
+        def invoke(question):
+            self.calls.append(question)
+            return schema(query=f"llm:{question}")
+
+        async def ainvoke(question):
+            return invoke(question)
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+@pytest.fixture
+def analyzer_config(tmp_path, monkeypatch):
+    FakeChatOpenAI.calls = []
+    monkeypatch.setattr(query_analysis, "ChatOpenAI", FakeChatOpenAI)
+    return {"model": {"llm": "gpt-test"}, "path": {"query_cache": str(tmp_path / "query_cache.json")}, "process": {}}
+
+
+def test_analyzer_order_cache_rules_llm(analyzer_config, capsys):
+    analyzer, lookup = build_query_analyzer(analyzer_config, with_lookup=True)
+    assert analyzer.invoke("재공고 된 학사 시스템").is_rebid      # 규칙 기반 -> LLM 호출 없음
+    assert FakeChatOpenAI.calls == []
+
+    question = "재공고가 아닌 사업만 알려줘"
+    assert lookup(question) is None
+    assert analyzer.invoke(question).query == f"llm:{question}"
+    assert asyncio.run(analyzer.ainvoke("  재공고가 아닌   사업만 알려줘 ")).query == f"llm:{question}"  # 정규화 키로 캐시 적중
+    assert FakeChatOpenAI.calls == [question]
+    out = capsys.readouterr().out
+    assert "rule-based" in out and "cache hit" in out
+
+    # 캐시는 파일에 남아 다음 실행에서도 LLM 을 부르지 않음
+    assert build_query_analyzer(analyzer_config).invoke(question).query == f"llm:{question}"
+    assert FakeChatOpenAI.calls == [question]
+
+
+def test_analyzer_without_local_parser(analyzer_config):
+    analyzer_config["process"]["local_query_parser"] = False
+    analyzer = build_query_analyzer(analyzer_config)
+    asyncio.run(analyzer.ainvoke("재공고 된 학사 시스템"))
+    assert FakeChatOpenAI.calls == ["재공고 된 학사 시스템"]
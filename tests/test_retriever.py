@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+
+import numpy as np
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
+
+import src.retriever as retriever_module
+from src.metadata_index import MetadataIndex
+from src.project_index import ProjectIndex
+from src.query_analysis import SearchQuery
+from src.sparse_index import build_sparse_index, tokenize
+
+WORDS = ["시스템", "구축", "유지보수", "클라우드", "전환", "데이터", "플랫폼", "포털", "고도화", "보안",
+         "통합", "관제", "스마트", "행정", "교육", "학사", "의료", "정보", "인공지능", "민원"]
+
+
+class HashEmbeddings(Embeddings):
+    """문자 bigram 해시 벡터 (결정적, 네트워크 없음)"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vec = np.zeros(64, dtype=np.float32)
+        for token in tokenize(text):
+            vec[int(hashlib.md5(token.encode()).hexdigest(), 16) % 64] += 1.0
+        return (vec / max(float(np.linalg.norm(vec)), 1e-12)).tolist()
+
+
+def make_corpus():
+    rng = np.random.default_rng(0)
+    projects, docs = {}, []
+    for p in range(12):
+        pid = f"P{p:02d}"
+        name = " ".join(rng.choice(WORDS, 3, replace=False))
+        projects[pid] = name
+        for i in range(30):
+            text = f"{name} " + " ".join(rng.choice(WORDS, 8))
+            docs.append(Document(page_content=text, id=f"{pid}-{i}", metadata={
+                "chunk_id": f"{pid}-{i}", "project_id": pid,
+                "budget": (p + 1) * 100_000_000, "round": i % 3,
+            }))
+    return projects, docs
+
+
+# 질문 -> LLM 분석 결과 (검색어는 질문 그대로 -> speculative_retrieval: false 경로와도 비교 가능)
+ANALYSES = {
+    "클라우드 전환 플랫폼 구축": {},                                 # 필터 없음 -> 추측 후보 재사용
+    "재공고 보안 관제 시스템": {"is_rebid": True},                    # 청크 2/3 통과, 사업 범위 동일 -> 재사용
+    "데이터 포털 고도화 5억 이하": {"max_budget": 500_000_000},       # 사업 범위 변경 -> 재검색
+}
+
+
+@pytest.fixture(scope="module")
+def env(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("retriever")
+    projects, docs = make_corpus()
+    embeddings = HashEmbeddings()
+    vectorstore = Chroma(collection_name="test", embedding_function=embeddings, persist_directory=str(tmp / "db"))
+    vectorstore.add_documents(docs, ids=[doc.id for doc in docs])
+
+    config = {
+        "model": {"llm": "test"},
+        "path": {
+            "sparse_index": str(tmp / "bm25_index.pkl"),
+            "metadata_index": str(tmp / "metadata_index.npz"),
+            "project_index": str(tmp / "project_index.npz"),
+        },
+        "process": {
+            "retrieval_k": 40, "speculative_fetch_k": 120, "final_k": 15, "sparse_k": 20,
+            "rerank_weight": 0.5, "retrieval_mode": "two_stage", "project_k": 5,
+            "agency_filter": False, "search_workers": 4,
+        },
+    }
+    build_sparse_index(docs, config)
+    metadata_index = MetadataIndex()
+    for doc in docs:
+        metadata_index.add(doc)
+    metadata_index.save(config["path"]["metadata_index"])
+    texts = list(projects.values())
+    ProjectIndex(list(projects), texts, np.asarray(embeddings.embed_documents(texts))).save(config["path"]["project_index"])
+    return vectorstore, config
+
+
+def make_retriever(monkeypatch, env, speculative, analyses=ANALYSES):
+    vectorstore, config = env
+    cache = {}
+
+    def lookup(question):
+        return cache.get(question)
+
+    def analyze(question):
+        result = cache[question] = SearchQuery(query=question, **analyses[question])
+        return result
+
+    async def aanalyze(question):
+        return analyze(question)
+
+    monkeypatch.setattr(retriever_module, "build_query_analyzer",
+                        lambda config, with_lookup=False: (RunnableLambda(analyze, afunc=aanalyze), lookup))
+    config = {**config, "process": {**config["process"], "speculative_retrieval": speculative}}
+    return retriever_module.get_advanced_retriever(vectorstore, config)
+
+
+def ids(docs):
+    return [doc.metadata["chunk_id"] for doc in docs]
+
+
+@pytest.mark.parametrize("question", list(ANALYSES))
+def test_speculative_matches_cached_and_plain(monkeypatch, env, question):
+    plain = ids(make_retriever(monkeypatch, env, speculative=False).invoke(question))
+    retriever = make_retriever(monkeypatch, env, speculative=True)
+    first = ids(retriever.invoke(question))     # LLM 분석 + 추측 검색
+    cached = ids(retriever.invoke(question))    # 캐시 적중 -> 추측 없이 검색
+    assert plain and first == cached == plain
+
+
+@pytest.mark.parametrize("question", list(ANALYSES))
+def test_speculative_matches_cached_and_plain_async(monkeypatch, env, question):
+    plain = ids(asyncio.run(make_retriever(monkeypatch, env, speculative=False).ainvoke(question)))
+    retriever = make_retriever(monkeypatch, env, speculative=True)
+    first = ids(asyncio.run(retriever.ainvoke(question)))
+    cached = ids(asyncio.run(retriever.ainvoke(question)))
+    assert plain and first == cached == plain
+
+
+def test_speculation_reuses_and_refetches(monkeypatch, env, capsys):
+    retriever = make_retriever(monkeypatch, env, speculative=True)
+    for question in ANALYSES:
+        retriever.invoke(question)
+    decisions = [line.split("추측 검색: ")[1].split()[0] for line in capsys.readouterr().out.splitlines() if "추측 검색:" in line]
+    assert decisions == ["재사용", "재사용", "재검색"]
+
+
+DATE_QUESTION = "클라우드 전환 플랫폼 구축"
+
+
+@pytest.mark.parametrize("analysis, expect_empty, warning", [
+    ({"deadline_after": "미정"}, False, "마감일을 해석할 수 없어"),
+    ({"pub_date_after": "다음 주"}, False, "공개일을 해석할 수 없어"),
+    # 날짜 메타데이터가 없는 청크(MISSING_TS)는 실제 날짜 조건을 통과하지 못함
+    ({"deadline_after": "2024-05-01"}, True, None),
+])
+def test_unparseable_date_filter_is_dropped(monkeypatch, env, capsys, analysis, expect_empty, warning):
+    plain = ids(make_retriever(monkeypatch, env, speculative=False).invoke(DATE_QUESTION))
+    capsys.readouterr()
+    retriever = make_retriever(monkeypatch, env, speculative=False, analyses={DATE_QUESTION: analysis})
+    docs = ids(retriever.invoke(DATE_QUESTION))
+    out = capsys.readouterr().out
+    if expect_empty:
+        assert docs == [] and "해석할 수 없어" not in out
+    else:
+        assert docs == plain and warning in out
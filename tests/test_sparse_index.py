@@ -0,0 +1,142 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from rank_bm25 import BM25Okapi
+
+from src.sparse_index import (
+    SparseIndex, build_sparse_index, doc_key, load_sparse_index, match_filter, sparse_docs_path, tokenize,
+    update_sparse_index,
+)
+
+TEXTS = [
+    "클라우드 전환 사업 소요 예산 5억원",
+    "학사 행정 시스템 고도화 사업",
+    "의료 정보 시스템 유지보수",
+    "스마트 관제 플랫폼 구축 사업 예산",
+    "데이터 플랫폼 구축 및 클라우드 이관",
+    "민원 포털 고도화",
+]
+QUERIES = ["클라우드 예산", "시스템 고도화", "플랫폼 구축 사업", "없는 단어"]
+
+
+def make_docs(texts=TEXTS, prefix="d"):
+    return [
+        Document(page_content=text, metadata={
+            "chunk_id": f"{prefix}{i}", "project_id": f"P{i % 3}", "organization": f"기관 {i % 2}",
+            "budget": float((i + 1) * 100_000_000), "round": i % 2,
+        })
+        for i, text in enumerate(texts)
+    ]
+
+
+def config_for(tmp_path):
+    return {"path": {"sparse_index": str(tmp_path / "bm25_index.pkl")}}
+
+
+def test_tokenize_is_char_bigrams_without_spaces():
+    assert tokenize("사업 예산") == ["사업", "업예", "예산"]
+    assert tokenize("가") == [] and tokenize("  ") == []
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_scores_match_bm25okapi(query):
+    docs = make_docs()
+    expected = BM25Okapi([tokenize(doc.page_content) for doc in docs]).get_scores(tokenize(query))
+    np.testing.assert_allclose(SparseIndex(docs).get_scores(query), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_score_documents_uses_corpus_idf_and_zero_for_unknown():
+    index = SparseIndex(make_docs())
+    candidates = [make_docs()[3], Document(page_content="클라우드", metadata={"chunk_id": "unknown"})]
+    scores = index.score_documents("플랫폼 구축", candidates)
+    assert scores[0] == pytest.approx(index.get_scores("플랫폼 구축")[3]) and scores[1] == 0.0
+
+
+WHERE_CASES = [
+    (None, ["d4", "d0", "d3"]),
+    ({"organization": "기관 1"}, ["d3"]),
+    ({"budget": {"$gte": 400_000_000}}, ["d4", "d3"]),
+    ({"$and": [{"round": {"$eq": 0}}, {"project_id": {"$in": ["P0", "P1"]}}]}, ["d4", "d0"]),
+    # 메타데이터 인덱스에 없는 필드 -> 레코드를 읽어 match_filter
+    ({"chunk_id": {"$ne": "d0"}}, ["d4", "d3"]),
+]
+
+
+@pytest.mark.parametrize("where, expected", WHERE_CASES)
+def test_search_with_where(where, expected):
+    hits = SparseIndex(make_docs()).search("클라우드 예산 플랫폼", k=3, where=where)
+    assert [doc.metadata["chunk_id"] for doc, _ in hits] == expected
+    assert all(match_filter(doc.metadata, where) for doc, _ in hits)
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+
+def test_search_skips_zero_scores():
+    assert SparseIndex(make_docs()).search("없는 단어", k=5) == []
+
+
+def test_build_and_load_roundtrip(tmp_path):
+    config = config_for(tmp_path)
+    docs = make_docs()
+    built = build_sparse_index(iter(docs), config)
+    assert os.path.exists(sparse_docs_path(config["path"]["sparse_index"]))
+
+    loaded = load_sparse_index(config)
+    np.testing.assert_array_equal(loaded.get_scores("클라우드 예산"), built.get_scores("클라우드 예산"))
+    fetched = loaded.get_documents(["d4", "missing", "d1"])
+    assert [(doc.page_content, doc.metadata) for doc in fetched] == [
+        (docs[4].page_content, docs[4].metadata), (docs[1].page_content, docs[1].metadata)
+    ]
+    loaded.close()
+    built.close()
+
+
+def test_load_rejects_mismatched_docs_file(tmp_path, capsys):
+    config = config_for(tmp_path)
+    build_sparse_index(make_docs(), config).close()
+    with open(sparse_docs_path(config["path"]["sparse_index"]), "ab") as f:
+        f.write(b"{}\n")
+    assert load_sparse_index(config) is None
+    assert "--step index" in capsys.readouterr().out
+    assert load_sparse_index({"path": {"sparse_index": str(tmp_path / "missing.pkl")}}) is None
+
+
+def test_legacy_pickle_is_rebuilt():
+    """이전 형식: Document 리스트를 통째로 pickle"""
+    docs = make_docs()
+    legacy = object.__new__(SparseIndex)
+    legacy.__setstate__({"docs": docs, "k1": 1.5, "b": 0.75})
+    restored = pickle.loads(pickle.dumps(legacy))
+    np.testing.assert_allclose(restored.get_scores("클라우드"), SparseIndex(docs).get_scores("클라우드"))
+    assert [doc.page_content for doc in restored.get_documents(["d2"])] == [TEXTS[2]]
+
+
+def test_update_matches_full_build(tmp_path):
+    config = config_for(tmp_path)
+    old_docs = make_docs()
+    index = build_sparse_index(old_docs, config)
+
+    # d1 삭제, d3 내용 변경, n0/n1 추가
+    changed = make_docs(["스마트 관제 플랫폼 구축 2차 사업"], prefix="d")[0]
+    changed.metadata.update(chunk_id="d3", project_id="P0")
+    new_docs = [changed] + make_docs(["신규 클라우드 예산 사업", "포털 유지보수"], prefix="n")
+    updated = update_sparse_index(index, ["d1", "d3"], new_docs, config)
+
+    final_docs = [doc for doc in old_docs if doc_key(doc) not in ("d1", "d3")] + new_docs
+    reference = SparseIndex(final_docs)
+    assert sorted(updated.keys) == sorted(reference.keys)
+    for query in QUERIES + ["관제 플랫폼"]:
+        got = dict(zip(updated.keys, updated.get_scores(query).tolist()))
+        expected = dict(zip(reference.keys, reference.get_scores(query).tolist()))
+        assert got == pytest.approx(expected)
+    assert updated.search("관제", k=1, where={"project_id": "P0"})[0][0].page_content == changed.page_content
+    assert updated.metadata.row_of("d1") is None
+
+    # 파일 교체 후 다시 읽어도 같은 결과
+    updated.close()
+    reloaded = load_sparse_index(config)
+    assert reloaded.get_documents(["n0"])[0].page_content == "신규 클라우드 예산 사업"
+    assert len(reloaded) == len(final_docs)
+    reloaded.close()